@@ -0,0 +1,183 @@
+# benchmark_db.py
+# Mede a latência de um "rerun" das telas Vagas (Vincular) e Parecer
+# comparando o acesso antigo (uma conexão nova por consulta) com a
+# conexão persistente/configurada de modules.database.
+# Também roda cada rerun numa thread nova, várias sessões ao mesmo tempo, como
+# faz o Streamlit (um ScriptRunner por rerun): aí compara abrir uma conexão por
+# thread com o pool de modules.database.
+#
+# Uso:
+#   python benchmark_db.py                # usa uma cópia do gac.db
+#   python benchmark_db.py --candidatos 20000 --reruns 50
+#   python benchmark_db.py --sessoes 8    # 8 sessões simultâneas por rodada
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from modules import database
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CONSULTAS_RERUN = [
+    # Vagas > Vincular candidatos
+    ("SELECT v.*, c.nome_cliente FROM vagas v LEFT JOIN clientes c ON c.id_cliente = v.id_cliente ORDER BY v.id_vaga;", ()),
+    ("SELECT * FROM candidatos ORDER BY id_candidato;", ()),
+    (
+        "SELECT vc.*, c.nome, c.telefone, c.cidade FROM vaga_candidato vc "
+        "JOIN candidatos c ON c.id_candidato = vc.id_candidato WHERE vc.id_vaga = ? ORDER BY vc.data_vinculo DESC;",
+        None,
+    ),
+    (
+        "SELECT vc.*, c.nome, c.telefone, c.cidade FROM vaga_candidato vc "
+        "JOIN candidatos c ON c.id_candidato = vc.id_candidato WHERE vc.id_vaga = ? ORDER BY vc.data_vinculo DESC;",
+        None,
+    ),
+    # Parecer
+    (
+        "SELECT vc.id_vaga, vc.id_candidato, c.nome, v.cargo, cli.nome_cliente FROM vaga_candidato vc "
+        "JOIN candidatos c ON c.id_candidato = vc.id_candidato JOIN vagas v ON v.id_vaga = vc.id_vaga "
+        "LEFT JOIN clientes cli ON cli.id_cliente = v.id_cliente "
+        "WHERE v.status IN ('Aberta','Em andamento') ORDER BY cli.nome_cliente, v.cargo, c.nome;",
+        (),
+    ),
+    ("SELECT * FROM clientes ORDER BY nome_cliente;", ()),
+    ("SELECT * FROM candidatos WHERE id_candidato = ?;", None),
+    ("SELECT * FROM acessos ORDER BY id_acesso DESC;", ()),
+    ("SELECT * FROM status_pipeline ORDER BY tipo, nome;", ()),
+]
+
+
+def _rerun_antigo(caminho: str, id_ref: int):
+    """Como era antes: sqlite3.connect() + consulta + close() para cada helper."""
+    for sql, params in CONSULTAS_RERUN:
+        conn = sqlite3.connect(caminho)
+        conn.row_factory = sqlite3.Row
+        cur = conn.cursor()
+        cur.execute(sql, (id_ref,) if params is None else params)
+        [dict(r) for r in cur.fetchall()]
+        conn.close()
+
+
+def _rerun_novo(caminho: str, id_ref: int):
+    """Conexão persistente da thread (modules.database.conexao)."""
+    conn = database.conexao()
+    for sql, params in CONSULTAS_RERUN:
+        cur = conn.execute(sql, (id_ref,) if params is None else params)
+        [dict(r) for r in cur.fetchall()]
+
+
+def _rerun_conexao_por_thread(caminho: str, id_ref: int):
+    """Conexão nova a cada thread, fechada no fim (sem pool)."""
+    conn = database._abrir_conexao(caminho)
+    try:
+        for sql, params in CONSULTAS_RERUN:
+            cur = conn.execute(sql, (id_ref,) if params is None else params)
+            [dict(r) for r in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def _popular(caminho: str, qtd: int):
+    if qtd <= 0:
+        return
+    conn = sqlite3.connect(caminho)
+    conn.executemany(
+        "INSERT INTO candidatos (nome, cidade, telefone) VALUES (?, ?, ?)",
+        ((f"Candidato Sintético {i}", "Curitiba – PR", "41999990000") for i in range(qtd)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _medir(funcao, caminho: str, id_ref: int, reruns: int) -> list[float]:
+    tempos = []
+    for _ in range(reruns):
+        t0 = time.perf_counter()
+        funcao(caminho, id_ref)
+        tempos.append((time.perf_counter() - t0) * 1000)
+    return tempos
+
+
+def _medir_threads(funcao, caminho: str, id_ref: int, reruns: int, sessoes: int) -> list[float]:
+    """Cada rodada: `sessoes` threads novas e simultâneas, um rerun em cada."""
+    tempos = []
+    lock = threading.Lock()
+
+    def um_rerun():
+        t0 = time.perf_counter()
+        funcao(caminho, id_ref)
+        with lock:
+            tempos.append((time.perf_counter() - t0) * 1000)
+
+    for _ in range(reruns):
+        threads = [threading.Thread(target=um_rerun) for _ in range(sessoes)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    return tempos
+
+
+def _imprimir(rotulo: str, tempos: list[float]):
+    print(
+        f"  {rotulo:32s} mediana {statistics.median(tempos):7.2f} ms | "
+        f"p95 {sorted(tempos)[int(len(tempos) * 0.95) - 1]:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de latência por rerun (SQLite).")
+    parser.add_argument("--db", default=os.path.join(BASE_DIR, "gac.db"), help="banco de origem (é copiado)")
+    parser.add_argument("--reruns", type=int, default=30)
+    parser.add_argument("--candidatos", type=int, default=0, help="candidatos sintéticos extras")
+    parser.add_argument("--sessoes", type=int, default=4, help="threads simultâneas por rodada")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="gac_bench_")
+    try:
+        caminho = os.path.join(tmpdir, "gac.db")
+        shutil.copyfile(args.db, caminho)
+        database.DB_PATH = caminho
+        database.init_db()
+        _popular(caminho, args.candidatos)
+
+        row = database.conexao().execute("SELECT MIN(id_vaga) FROM vaga_candidato").fetchone()
+        id_ref = row[0] or 1
+
+        # aquecimento (cache do SO / primeira conexão)
+        _rerun_antigo(caminho, id_ref)
+        _rerun_novo(caminho, id_ref)
+
+        antes = _medir(_rerun_antigo, caminho, id_ref, args.reruns)
+        depois = _medir(_rerun_novo, caminho, id_ref, args.reruns)
+
+        print(f"Consultas por rerun: {len(CONSULTAS_RERUN)} | reruns: {args.reruns}")
+        for rotulo, tempos in (("antes (conexão por consulta)", antes), ("depois (conexão persistente)", depois)):
+            _imprimir(rotulo, tempos)
+        print(f"  ganho na mediana: {statistics.median(antes) / max(statistics.median(depois), 1e-9):.1f}x")
+
+        # um rerun por thread nova, várias sessões ao mesmo tempo
+        database.fechar_conexoes()
+        por_thread = _medir_threads(_rerun_conexao_por_thread, caminho, id_ref, args.reruns, args.sessoes)
+        com_pool = _medir_threads(_rerun_novo, caminho, id_ref, args.reruns, args.sessoes)
+        conexoes = database.estatisticas_conexoes()
+        print(f"\nThread nova por rerun, {args.sessoes} sessões simultâneas | rodadas: {args.reruns}")
+        _imprimir("conexão por thread", por_thread)
+        _imprimir("pool de conexões", com_pool)
+        print(
+            f"  ganho na mediana: {statistics.median(por_thread) / max(statistics.median(com_pool), 1e-9):.1f}x | "
+            f"pool: {conexoes['abertas']} abertas, {conexoes['reaproveitadas']} reaproveitadas, "
+            f"{conexoes['fechadas']} fechadas"
+        )
+        database.fechar_conexoes()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
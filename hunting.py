@@ -4,9 +4,8 @@ from datetime import datetime
 import streamlit as st
 
 from .core import (
-    carregar_candidatos,
     registrar_candidato,
-    LOG_CAND,
+    atualizar_linkedin_candidato,
 )
 
 
@@ -162,11 +161,7 @@ Se preferir, pode me responder por aqui mesmo ou compartilhar um telefone para c
                 cargo_pretendido=cargo_cad.strip(),
                 data_cadastro=data_cad,
             )
-            # atualiza linkedin no CSV
-            df = carregar_candidatos()
-            mask = df["id_candidato"] == str(novo_id)
-            if mask.any():
-                df.loc[mask, "linkedin"] = linkedin_cad.strip()
-                df.to_csv(LOG_CAND, sep=";", index=False, encoding="utf-8")
+            # atualiza linkedin do candidato recém-criado
+            atualizar_linkedin_candidato(novo_id, linkedin_cad.strip())
 
             st.success(f"Candidato cadastrado com ID {novo_id}. Você pode complementar na aba Candidatos.")
@@ -9,8 +9,8 @@ from modules.database import (
     get_or_create_candidato_por_nome_localidade,
     inserir_cliente,
     inserir_vaga,
-    vincular_vaga_candidato,
-    registrar_parecer_db,
+    vincular_bulk,
+    registrar_pareceres_bulk,
 )
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -125,7 +125,12 @@ def extrair_campos(texto: str, nome_arquivo: str) -> dict:
 # -------------------------------------------------
 # IMPORTAÇÃO DE UM ÚNICO PDF
 # -------------------------------------------------
-def importar_parecer(pdf_path: str):
+def importar_parecer(pdf_path: str) -> dict | None:
+    """
+    Lê o PDF, garante candidato/cliente/vaga e devolve o registro do parecer
+    (no formato de registrar_pareceres_bulk). Vínculo e parecer são gravados
+    em lote pelo main(), em uma única transação.
+    """
     print(f"\n=== Importando: {os.path.basename(pdf_path)} ===")
 
     # 1) Ler texto do PDF
@@ -157,7 +162,7 @@ def importar_parecer(pdf_path: str):
 
     if not nome:
         print("  ⚠ Não foi possível identificar o nome do candidato (nem pelo arquivo). Pulando esse PDF.")
-        return
+        return None
 
     # 3) Garantir candidato
     try_idade = None
@@ -232,44 +237,26 @@ def importar_parecer(pdf_path: str):
 
     conn.close()
 
-    # 6) Vínculo vaga × candidato
-    if id_vaga and id_candidato:
-        vincular_vaga_candidato(id_vaga, id_candidato)
-        print(f"  → Vínculo vaga {id_vaga} x candidato {id_candidato} criado/garantido.")
-
-    # 7) Apagar parecer antigo com mesmo caminho_arquivo (se houver) e registrar novo
-    conn = get_conn()
-    cur = conn.cursor()
-    try:
-        cur.execute("DELETE FROM pareceres WHERE caminho_arquivo = ?", (pdf_path,))
-        conn.commit()
-        print("  → Parecer antigo (mesmo caminho_arquivo) removido, se existia.")
-    except Exception as e:
-        print(f"  ⚠ Erro ao tentar limpar parecer antigo: {e}")
-    finally:
-        conn.close()
-
-    registrar_parecer_db(
-        id_vaga=id_vaga,
-        id_candidato=id_candidato,
-        cliente=cliente,
-        cargo=cargo,
-        nome=nome,
-        localidade=localidade,
-        idade=idade,
-        pretensao=pretensao,
-        linkedin=linkedin,
-        resumo_prof=resumo,
-        analise_prof=analise,
-        conclusao_txt=conclusao,
-        formato="PDF",
-        caminho_arquivo=pdf_path,
-        status_etapa="Em avaliação",
-        status_contratacao="Pendente",
-        motivo_decline="Importado de parecer antigo",
-    )
-
-    print("  → Parecer registrado no banco com sucesso.")
+    # 6) Vínculo vaga × candidato e 7) parecer: gravados em lote no main()
+    return {
+        "id_vaga": id_vaga,
+        "id_candidato": id_candidato,
+        "cliente": cliente,
+        "cargo": cargo,
+        "nome": nome,
+        "localidade": localidade,
+        "idade": idade,
+        "pretensao": pretensao,
+        "linkedin": linkedin,
+        "resumo_prof": resumo,
+        "analise_prof": analise,
+        "conclusao_txt": conclusao,
+        "formato": "PDF",
+        "caminho_arquivo": pdf_path,
+        "status_etapa": "Em avaliação",
+        "status_contratacao": "Pendente",
+        "motivo_decline": "Importado de parecer antigo",
+    }
 
 
 # -------------------------------------------------
@@ -287,14 +274,33 @@ def main():
         print("Nenhum PDF encontrado na pasta pareceres_antigos.")
         return
 
+    registros = []
     for arq in arquivos:
         caminho = os.path.join(PASTA_PDFS, arq)
         try:
             print(f"\nImportando {arq}")
-            importar_parecer(caminho)
+            registro = importar_parecer(caminho)
+            if registro:
+                registros.append(registro)
         except Exception as e:
             print(f"Erro ao importar {arq}: {e}")
 
+    if not registros:
+        return
+
+    # Vínculos e pareceres em lote: uma transação (um fsync) para cada tipo
+    vinculos = [
+        {"id_vaga": r["id_vaga"], "id_candidato": r["id_candidato"]}
+        for r in registros
+        if r["id_vaga"] and r["id_candidato"]
+    ]
+    vincular_bulk(vinculos)
+    print(f"\n→ {len(vinculos)} vínculo(s) vaga x candidato criados/garantidos.")
+
+    # Pareceres antigos com o mesmo caminho_arquivo são substituídos
+    ids = registrar_pareceres_bulk(registros, substituir_por_caminho=True)
+    print(f"→ {len(ids)} parecer(es) registrados no banco com sucesso.")
+
 
 if __name__ == "__main__":
     main()
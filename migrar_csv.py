@@ -0,0 +1,43 @@
+# migrar_csv.py
+# Copia os CSVs antigos de data/ (clientes, candidatos, vagas, vínculos,
+# acessos, financeiro e histórico de pareceres) para o gac.db.
+#
+# Pode ser rodado de novo: continua dos arquivos que faltam e não duplica
+# registros já existentes no banco. Os CSVs não são alterados (ficam de backup).
+# Depois que todos forem migrados, as telas passam a ler do banco.
+#
+# Uso:
+#   python migrar_csv.py
+#   python migrar_csv.py clientes candidatos   # só alguns
+import sys
+
+from modules.armazenamento import ORDEM_MIGRACAO, migrar_csv_para_sqlite, status_migracao
+
+
+def main():
+    stores = sys.argv[1:] or None
+    desconhecidos = [s for s in (stores or []) if s not in ORDEM_MIGRACAO]
+    if desconhecidos:
+        print(f"Desconhecido(s): {', '.join(desconhecidos)}. Opções: {', '.join(ORDEM_MIGRACAO)}")
+        return
+
+    relatorio = migrar_csv_para_sqlite(stores)
+    if not relatorio:
+        print("Nada a migrar: os arquivos pedidos já estão no banco.")
+
+    for item in relatorio:
+        print(
+            f"→ {item['store']}: {item['linhas_csv']} linha(s) no CSV | "
+            f"{item['inseridas']} inserida(s), {item['mescladas']} já existiam | "
+            f"{len(item['ignoradas'])} ignorada(s) | {item['linhas_banco']} no banco"
+        )
+        for motivo in item["ignoradas"]:
+            print(f"    ⚠ {motivo}")
+
+    print("\nSituação:")
+    for s in status_migracao():
+        print(f"  {s['store']:16s} {s['status']:10s} csv={s['linhas_csv']} banco={s['linhas_banco']} em {s['concluida_em']}")
+
+
+if __name__ == "__main__":
+    main()
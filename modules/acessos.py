@@ -1,15 +1,15 @@
 from datetime import date
 
-import pandas as pd
 import streamlit as st
 
 from .database import (
-    listar_clientes,
-    listar_candidatos,
-    listar_acessos,
+    listar_clientes_df,
+    listar_candidatos_df,
+    listar_acessos_df,
     obter_acesso,
     inserir_acesso,
     atualizar_acesso,
+    texto_celula,
 )
 
 
@@ -27,7 +27,7 @@ def render_tabela_html(df, columns, headers):
     for _, row in df[columns].iterrows():
         html.append("<tr>")
         for col in columns:
-            html.append(f"<td>{row[col]}</td>")
+            html.append(f"<td>{texto_celula(row[col])}</td>")
         html.append("</tr>")
 
     html.append("</tbody></table>")
@@ -48,9 +48,8 @@ def run():
     with colL:
         st.subheader("Registros de acesso")
 
-        dados = listar_acessos()
-        if dados:
-            df = pd.DataFrame(dados).fillna("")
+        df = listar_acessos_df()
+        if not df.empty:
             render_tabela_html(
                 df,
                 columns=["id_acesso", "nome_cliente", "nome_usuario", "sistema", "status"],
@@ -58,10 +57,10 @@ def run():
             )
 
             st.markdown("---")
-            ids = [int(r["id_acesso"]) for r in dados]
+            ids = df["id_acesso"].astype(int).tolist()
             labels = {
-                int(r["id_acesso"]): f"{r['id_acesso']} - {r.get('nome_cliente','')} ({r.get('sistema','')})"
-                for r in dados
+                int(i): f"{i} - {cli} ({sis})"
+                for i, cli, sis in zip(df["id_acesso"], df["nome_cliente"], df["sistema"])
             }
             id_sel = st.selectbox(
                 "Carregar acesso existente:",
@@ -83,16 +82,11 @@ def run():
     with colR:
         st.subheader("Cadastro / edição de acesso")
 
-        clientes = listar_clientes()
-        candidatos = listar_candidatos()
+        df_cli = listar_clientes_df()
+        df_cand = listar_candidatos_df()
 
-        df_cli = pd.DataFrame(clientes).fillna("") if clientes else pd.DataFrame(columns=["id_cliente", "nome_cliente"])
-        df_cand = pd.DataFrame(candidatos).fillna("") if candidatos else pd.DataFrame(
-            columns=["id_candidato", "nome"]
-        )
-
-        op_cli = {int(r["id_cliente"]): r["nome_cliente"] for _, r in df_cli.iterrows()} if not df_cli.empty else {}
-        op_cand = {int(r["id_candidato"]): r["nome"] for _, r in df_cand.iterrows()} if not df_cand.empty else {}
+        op_cli = dict(zip(df_cli["id_cliente"].astype(int), df_cli["nome_cliente"])) if not df_cli.empty else {}
+        op_cand = dict(zip(df_cand["id_candidato"].astype(int), df_cand["nome"])) if not df_cand.empty else {}
 
         registro = None
         if st.session_state["acesso_edit_id"]:
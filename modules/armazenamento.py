@@ -0,0 +1,1203 @@
+# modules/armazenamento.py
+# Onde ficam os dados das telas antigas (clientes, candidatos, vagas, vínculos,
+# acessos, financeiro e histórico de pareceres): nos CSVs de data/ ou no gac.db.
+#
+# core.carregar_* / core.registrar_* passam por aqui. Enquanto os CSVs não forem
+# migrados (migrar_csv_para_sqlite / migrar_csv.py), tudo continua nos CSVs;
+# depois da migração as telas leem as tabelas indexadas do banco.
+# GAC_ARMAZENAMENTO=csv|sqlite força um dos dois.
+import os
+import io
+import csv
+import json
+import logging
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+
+import pandas as pd
+
+from . import database
+from .arquivos import (
+    ConflitoDeVersao,
+    anexar_linha_com_id,
+    assinatura_arquivo,
+    gravar_atomico,
+    gravar_csv_atomico,
+    trava_arquivo,
+    versao_arquivo,
+)
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+# =========================
+# STORES
+# =========================
+# Por store: arquivo CSV e colunas (a "forma" que as telas conhecem), tabela do
+# banco, chave, e como cada coluna do CSV corresponde no banco:
+#   banco:     coluna do CSV -> coluna da tabela (None = só leitura / não grava)
+#   leitura:   coluna do CSV -> expressão SQL (padrão: t.<coluna da tabela>)
+#   extras:    colunas só do banco devolvidas junto (ex.: id_vaga dos pareceres)
+#   aliases:   nome antigo no cabeçalho do CSV -> coluna (corrigido em atualizar_formato)
+#   referencias: colunas com id de outro store (traduzidos na migração)
+#   duplicado: SQL que acha no banco a linha equivalente (migração não duplica)
+#   log_alteracoes: no CSV, alterações de linha vão para um log (ver BackendCSV)
+#   textos:    colunas de texto longo guardadas fora do CSV (ver textos longos no BackendCSV)
+#   tipos:     tipo de cada coluna no DataFrame tipado (ver TIPOS); o resto é texto
+STORES = {
+    "clientes": {
+        "arquivo": "clientes.csv",
+        "colunas": [
+            "id_cliente", "nome_cliente", "razao_social", "cnpj", "cidade",
+            "contato_principal", "telefone", "email", "observacoes",
+        ],
+        "tipos": {"id_cliente": "id"},
+        "tabela": "clientes",
+        "pk": "id_cliente",
+        "banco": {"contato_principal": "contato"},
+        "duplicado": (
+            "SELECT id_cliente FROM clientes WHERE lower(trim(nome_cliente)) = lower(trim(?));",
+            ("nome_cliente",),
+        ),
+    },
+    "candidatos": {
+        "arquivo": "candidatos.csv",
+        "colunas": [
+            "id_candidato", "nome", "idade", "telefone", "cidade",
+            "cargo_pretendido", "data_cadastro", "linkedin", "cv_arquivo",
+        ],
+        "tipos": {"id_candidato": "id", "data_cadastro": "data"},
+        "tabela": "candidatos",
+        "pk": "id_candidato",
+        "banco": {"cargo_pretendido": "pretensao", "data_cadastro": "created_at", "cv_arquivo": "caminho_cv"},
+        "leitura": {"data_cadastro": "substr(t.created_at, 1, 10)"},
+        "duplicado": (
+            "SELECT id_candidato FROM candidatos WHERE lower(trim(nome)) = lower(trim(?));",
+            ("nome",),
+        ),
+    },
+    "vagas": {
+        "arquivo": "vagas.csv",
+        "colunas": [
+            "id_vaga", "id_cliente", "nome_cliente", "cargo", "modalidade",
+            "data_abertura", "data_fechamento", "status", "descricao_vaga",
+        ],
+        "tipos": {
+            "id_vaga": "id", "id_cliente": "id", "nome_cliente": "categoria", "cargo": "categoria",
+            "modalidade": "categoria", "status": "categoria", "data_abertura": "data", "data_fechamento": "data",
+        },
+        "tabela": "vagas",
+        "pk": "id_vaga",
+        "banco": {"nome_cliente": None, "descricao_vaga": "descricao"},
+        "leitura": {"nome_cliente": "(SELECT c.nome_cliente FROM clientes c WHERE c.id_cliente = t.id_cliente)"},
+        "referencias": {"id_cliente": "clientes"},
+        "duplicado": (
+            "SELECT id_vaga FROM vagas WHERE id_cliente IS ? AND lower(trim(cargo)) = lower(trim(?)) "
+            "AND IFNULL(data_abertura, '') = IFNULL(?, '');",
+            ("id_cliente", "cargo", "data_abertura"),
+        ),
+    },
+    "vaga_candidatos": {
+        "arquivo": "vaga_candidatos.csv",
+        "colunas": [
+            "id_vaga", "id_candidato", "data_vinculo", "observacao",
+            "status_etapa", "status_contratacao", "motivo_decline",
+        ],
+        "log_alteracoes": True,
+        "tipos": {
+            "id_vaga": "id", "id_candidato": "id", "data_vinculo": "data",
+            "status_etapa": "categoria", "status_contratacao": "categoria",
+        },
+        "tabela": "vaga_candidato",
+        "pk": None,
+        "chave": ("id_vaga", "id_candidato"),
+        "referencias": {"id_vaga": "vagas", "id_candidato": "candidatos"},
+        "obrigatorias": ("id_vaga", "id_candidato"),
+        "duplicado": (
+            "SELECT id_vinculo FROM vaga_candidato WHERE id_vaga = ? AND id_candidato = ?;",
+            ("id_vaga", "id_candidato"),
+        ),
+    },
+    "acessos": {
+        "arquivo": "acessos.csv",
+        "colunas": [
+            "id_acesso", "id_cliente", "nome_cliente", "id_candidato",
+            "nome_usuario", "sistema", "tipo_acesso",
+            "data_inicio", "data_fim", "status", "observacoes",
+        ],
+        "tipos": {
+            "id_acesso": "id", "id_cliente": "id", "nome_cliente": "categoria", "id_candidato": "id",
+            "sistema": "categoria", "tipo_acesso": "categoria", "data_inicio": "data", "data_fim": "data",
+            "status": "categoria",
+        },
+        "tabela": "acessos",
+        "pk": "id_acesso",
+        "referencias": {"id_cliente": "clientes", "id_candidato": "candidatos"},
+    },
+    "fin_os": {
+        "arquivo": "financeiro_os.csv",
+        "colunas": [
+            "id_os", "id_cliente", "nome_cliente",
+            "descricao", "tipo_servico", "data_emissao",
+            "data_execucao", "valor", "status", "observacoes",
+        ],
+        "log_alteracoes": True,
+        "tipos": {
+            "id_os": "id", "id_cliente": "id", "nome_cliente": "categoria", "tipo_servico": "categoria",
+            "data_emissao": "data", "data_execucao": "data", "valor": "valor", "status": "categoria",
+        },
+        "tabela": "fin_os",
+        "pk": "id_os",
+        "referencias": {"id_cliente": "clientes"},
+    },
+    "fin_orc": {
+        "arquivo": "financeiro_orcamentos.csv",
+        "colunas": [
+            "id_orc", "id_cliente", "nome_cliente",
+            "descricao", "data_emissao", "validade",
+            "valor", "status", "observacoes",
+        ],
+        "log_alteracoes": True,
+        "tipos": {
+            "id_orc": "id", "id_cliente": "id", "nome_cliente": "categoria",
+            "data_emissao": "data", "validade": "data", "valor": "valor", "status": "categoria",
+        },
+        "tabela": "fin_orc",
+        "pk": "id_orc",
+        "referencias": {"id_cliente": "clientes"},
+    },
+    "fin_nf": {
+        "arquivo": "financeiro_nf.csv",
+        "colunas": [
+            "id_nf", "id_cliente", "nome_cliente",
+            "numero_nf", "data_emissao",
+            "valor", "descricao", "observacoes",
+        ],
+        "log_alteracoes": True,
+        "tipos": {
+            "id_nf": "id", "id_cliente": "id", "nome_cliente": "categoria",
+            "data_emissao": "data", "valor": "valor",
+        },
+        "tabela": "fin_nf",
+        "pk": "id_nf",
+        "referencias": {"id_cliente": "clientes"},
+    },
+    "pareceres": {
+        "arquivo": "pareceres_log.csv",
+        "colunas": [
+            "data_hora", "cliente", "cargo", "nome", "localidade",
+            "idade", "pretensao", "linkedin",
+            "resumo_profissional", "analise_perfil", "conclusao_texto",
+            "formato", "caminho_arquivo",
+            "id_candidato", "status_etapa", "status_contratacao", "motivo_decline",
+        ],
+        "tipos": {
+            "data_hora": "data", "cliente": "categoria", "cargo": "categoria", "formato": "categoria",
+            "id_candidato": "id", "id_vaga": "id", "ref_texto": "id",
+            "status_etapa": "categoria", "status_contratacao": "categoria",
+        },
+        "tabela": "pareceres",
+        "pk": None,
+        "ordem": "t.data_hora, t.id_parecer",
+        "banco": {"nome": "nome_candidato", "ref_texto": None},
+        "extras": {"id_vaga": "t.id_vaga", "ref_texto": "t.id_parecer"},
+        "textos": ("resumo_profissional", "analise_perfil", "conclusao_texto"),
+        "arquivo_textos": "pareceres_textos.jsonl",
+        "aliases": {"empresa": "cliente"},
+        "somente_anexo": True,
+        "referencias": {"id_candidato": "candidatos"},
+        "duplicado": (
+            "SELECT id_parecer FROM pareceres "
+            "WHERE (caminho_arquivo = ? AND ? <> '') OR (data_hora = ? AND lower(nome_candidato) = lower(?));",
+            ("caminho_arquivo", "caminho_arquivo", "data_hora", "nome_candidato"),
+        ),
+    },
+}
+
+# ordem da migração: quem é referenciado vem antes
+ORDEM_MIGRACAO = [
+    "clientes", "candidatos", "vagas", "vaga_candidatos",
+    "acessos", "fin_os", "fin_orc", "fin_nf", "pareceres",
+]
+
+
+def caminho_csv(store: str) -> str:
+    return os.path.join(DATA_DIR, STORES[store]["arquivo"])
+
+
+def caminho_alteracoes(store: str) -> str:
+    return caminho_csv(store) + ".alteracoes"
+
+
+def caminho_textos(store: str) -> str:
+    return os.path.join(DATA_DIR, STORES[store]["arquivo_textos"])
+
+
+def colunas_store(store: str) -> list[str]:
+    """Colunas devolvidas por carregar(store) sem projeção."""
+    spec = STORES[store]
+    return spec["colunas"] + (["ref_texto"] if spec.get("textos") else [])
+
+
+def _colunas_csv(spec: dict) -> list[str]:
+    """Colunas gravadas no CSV: os textos longos ficam fora, apontados por ref_texto."""
+    textos = spec.get("textos", ())
+    if not textos:
+        return spec["colunas"]
+    return [c for c in spec["colunas"] if c not in textos] + ["ref_texto"]
+
+
+def _coluna_banco(spec: dict, coluna: str):
+    return spec.get("banco", {}).get(coluna, coluna)
+
+
+def _chave(spec: dict) -> tuple:
+    return spec.get("chave") or (spec["pk"],)
+
+
+def _valor_banco(coluna: str, valor):
+    """Texto da tela/CSV -> valor gravado: ids viram inteiro (ou NULL se vazios)."""
+    if valor is None or (isinstance(valor, float) and pd.isna(valor)):
+        valor = ""
+    if coluna.startswith("id_"):
+        texto = str(valor).strip()
+        if not texto:
+            return None
+        try:
+            return int(float(texto))
+        except ValueError:
+            return texto
+    return valor
+
+
+def _texto(valor) -> str:
+    if valor is None or (isinstance(valor, float) and pd.isna(valor)):
+        return ""
+    return str(valor)
+
+
+def _para_banco(spec: dict, valores: dict) -> dict:
+    saida = {}
+    for coluna, valor in valores.items():
+        destino = _coluna_banco(spec, coluna)
+        if destino is not None:
+            saida[destino] = _valor_banco(destino, valor)
+    return saida
+
+
+# =========================
+# TIPOS
+# =========================
+# carregar(store, tipado=True) converte as colunas de spec["tipos"]:
+#   id:        inteiro anulável (Int64); vazio vira <NA>
+#   categoria: category (status, cliente, modalidade...: poucos valores repetidos)
+#   data:      datetime64; o que não for data (ISO ou dd/mm/aaaa) vira NaT
+#   valor:     float64 com 2 casas; aceita "3.500,00", "R$ 3500.00"...
+# O DataFrame tipado é para consulta (somas, filtros, gráficos); para editar
+# e salvar() continua valendo o DataFrame em texto.
+
+def _para_id(serie: pd.Series) -> pd.Series:
+    numeros = pd.to_numeric(serie, errors="coerce")
+    return numeros.where(numeros == numeros.round()).astype("Int64")
+
+
+def _para_data(serie: pd.Series) -> pd.Series:
+    datas = pd.to_datetime(serie, errors="coerce", format="ISO8601")
+    faltando = datas.isna() & serie.str.strip().ne("")
+    if faltando.any():
+        datas[faltando] = pd.to_datetime(serie[faltando], errors="coerce", format="%d/%m/%Y")
+    return datas
+
+
+def _para_valor(serie: pd.Series) -> pd.Series:
+    texto = serie.str.replace(r"[R$\s]", "", regex=True)
+    brasileiro = texto.str.contains(",", regex=False)
+    texto = texto.where(~brasileiro, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(texto, errors="coerce").round(2)
+
+
+CONVERSORES = {
+    "id": _para_id,
+    "categoria": lambda serie: serie.astype("category"),
+    "data": _para_data,
+    "valor": _para_valor,
+}
+
+
+def tipar(store: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica spec["tipos"] às colunas presentes em df (texto, como carregar() devolve)."""
+    tipos = STORES[store].get("tipos", {})
+    convertidas = {
+        c: CONVERSORES[tipo](df[c].fillna("").astype(str))
+        for c, tipo in tipos.items()
+        if c in df.columns
+    }
+    if not convertidas:
+        return df
+    saida = df.assign(**convertidas)
+    saida.attrs["versao"] = df.attrs.get("versao")
+    saida.attrs["tipado"] = True
+    return saida
+
+
+# =========================
+# BACKEND CSV
+# =========================
+# Cache dos DataFrames lidos dos CSVs, por arquivo: vale enquanto a versão do
+# arquivo (arquivos.versao_arquivo) for a mesma da leitura (edição por fora é
+# percebida) e é descartado pelas gravações deste módulo. Quem chama recebe uma cópia; com
+# copy-on-write (pandas >= 3) a cópia é rasa e só o que for alterado é copiado.
+#
+# Stores "somente_anexo" (pareceres_log.csv, que só cresce) não são descartados
+# ao gravar: na próxima leitura só as linhas novas passam pelo parse e são
+# anexadas ao cache (o trecho antigo é conferido por CRC).
+_CACHE_CSV: dict[str, dict] = {}
+# ref_texto -> textos do arquivo de textos (ver textos longos no BackendCSV)
+_CACHE_TEXTOS: dict[str, dict] = {}
+_LOCK_TEXTOS = threading.Lock()
+_STATS_CSV = {"hits": 0, "misses": 0, "invalidacoes": 0, "leituras_incrementais": 0}
+_LOCK_CSV = threading.Lock()
+LIMITE_LOG_ALTERACOES = 256 * 1024
+_COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+def _copia(df: pd.DataFrame) -> pd.DataFrame:
+    return df.copy(deep=not _COPY_ON_WRITE)
+
+
+def _invalidar_csv(caminho: str):
+    with _LOCK_CSV:
+        if _CACHE_CSV.pop(caminho, None) is not None:
+            _STATS_CSV["invalidacoes"] += 1
+
+
+def estatisticas_cache_csv() -> dict:
+    """Hits, misses, invalidações e leituras incrementais do cache dos CSVs."""
+    with _LOCK_CSV:
+        stats = dict(_STATS_CSV)
+        stats["arquivos"] = len(_CACHE_CSV)
+    leituras = stats["hits"] + stats["misses"]
+    stats["taxa_acerto"] = stats["hits"] / leituras if leituras else 0.0
+    return stats
+
+
+def _cabecalho_csv(caminho: str):
+    try:
+        with open(caminho, newline="", encoding="utf-8") as f:
+            return next(csv.reader(f, delimiter=";"), None)
+    except FileNotFoundError:
+        return None
+
+
+class BackendCSV:
+    """Os arquivos ;-separados de data/, como sempre foram."""
+
+    nome = "csv"
+
+    def versao(self, store: str) -> str:
+        """Carimbo de versão do store (CSV e, se houver, log de alterações)."""
+        versao = versao_arquivo(caminho_csv(store))
+        if STORES[store].get("log_alteracoes"):
+            versao += "|" + versao_arquivo(caminho_alteracoes(store))
+        return versao
+
+    def carregar(self, store: str, colunas=None) -> pd.DataFrame:
+        """
+        DataFrame do store. df.attrs["versao"] guarda a versão lida: salvar()
+        recusa (ConflitoDeVersao) um DataFrame de uma versão que já mudou.
+        colunas: só essas colunas (as que o store não tiver são ignoradas);
+        os textos longos só são lidos se estiverem entre elas.
+        """
+        spec = STORES[store]
+        caminho = caminho_csv(store)
+        versao_csv = versao_arquivo(caminho)
+        versao = self.versao(store)
+        with _LOCK_CSV:
+            em_cache = _CACHE_CSV.get(caminho)
+            if em_cache is not None and em_cache["versao"] == versao:
+                _STATS_CSV["hits"] += 1
+                return self._projetar(store, em_cache["final"], colunas)
+            _STATS_CSV["misses"] += 1
+
+        entrada = None
+        if em_cache is not None:
+            if em_cache["versao_csv"] == versao_csv:
+                # só o log de alterações mudou: o CSV já lido continua valendo
+                entrada = dict(em_cache)
+            elif spec.get("somente_anexo"):
+                entrada = self._ler_acrescimo(store, em_cache)
+        if entrada is None:
+            entrada = self._ler(store)
+
+        final = entrada["df"]
+        if spec.get("log_alteracoes") and os.path.exists(caminho_alteracoes(store)):
+            final = self._aplicar_alteracoes(store, final)
+        final.attrs["versao"] = versao
+        entrada.update(versao_csv=versao_csv, versao=versao, final=final)
+
+        # só guarda se os arquivos não mudaram durante a leitura
+        if self.versao(store) == versao and entrada["offset"] == assinatura_arquivo(caminho)[0]:
+            with _LOCK_CSV:
+                _CACHE_CSV[caminho] = entrada
+        return self._projetar(store, final, colunas)
+
+    def _projetar(self, store: str, df: pd.DataFrame, colunas) -> pd.DataFrame:
+        spec = STORES[store]
+        pedidas = colunas_store(store) if colunas is None else list(colunas)
+        textos = [c for c in spec.get("textos", ()) if c in pedidas]
+        df = _copia(df)
+        if textos:
+            df = self._juntar_textos(store, df, textos)
+        saida = df[[c for c in pedidas if c in df.columns]]
+        saida.attrs["versao"] = df.attrs.get("versao")
+        return saida
+
+    def _normalizar(self, store: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Cabeçalho antigo -> colunas atuais (aliases, colunas que faltavam, ordem)."""
+        spec = STORES[store]
+        for antigo, coluna in spec.get("aliases", {}).items():
+            if coluna not in df.columns and antigo in df.columns:
+                df = df.rename(columns={antigo: coluna})
+        colunas = _colunas_csv(spec)
+        for c in colunas:
+            if c not in df.columns:
+                df[c] = ""
+        # CSV antigo, ainda com os textos longos dentro: ficam até o passo 2 do formato
+        colunas = colunas + [c for c in spec.get("textos", ()) if c in df.columns]
+        return df[colunas]
+
+    def _conferir_colunas(self, store: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Leitura: o CSV já está no formato atual (atualizar_formato), então só troca
+        NaN por "". Se o arquivo foi trocado por fora, ajusta em memória (sem gravar).
+        """
+        df = df.fillna("")
+        if list(df.columns) == _colunas_csv(STORES[store]):
+            return df
+        logger.warning(
+            "%s fora do formato atual; rode armazenamento.atualizar_formato_csv().",
+            STORES[store]["arquivo"],
+        )
+        return self._normalizar(store, df)
+
+    def _ler(self, store: str) -> dict:
+        """Leitura completa. Guarda também até onde o arquivo foi lido (offset)."""
+        caminho = caminho_csv(store)
+        if not os.path.exists(caminho):
+            return {"df": pd.DataFrame(columns=_colunas_csv(STORES[store]), dtype=str), "offset": 0}
+
+        with open(caminho, "rb") as f:
+            dados = f.read()
+        bruto = pd.read_csv(io.BytesIO(dados), sep=";", encoding="utf-8", dtype=str)
+        df = self._conferir_colunas(store, bruto)
+        return {
+            "df": df,
+            "offset": len(dados),
+            "cabecalho": list(bruto.columns),
+            "resumo": zlib.crc32(dados),
+            "fim_de_linha": dados.endswith(b"\n"),
+        }
+
+    def _ler_acrescimo(self, store: str, em_cache: dict):
+        """
+        Store só de anexação (histórico de pareceres): faz o parse apenas dos
+        bytes gravados depois da última leitura e junta ao DataFrame em cache.
+        Devolve None se o arquivo encolheu ou foi regravado (releitura completa).
+        """
+        offset = em_cache["offset"]
+        if not em_cache.get("fim_de_linha"):
+            return None
+        try:
+            with open(caminho_csv(store), "rb") as f:
+                dados = f.read()
+        except FileNotFoundError:
+            return None
+        # CRC do trecho já lido: muito mais barato que o parse, e pega
+        # qualquer edição feita no meio do arquivo
+        if len(dados) <= offset:
+            return None
+        resumo = zlib.crc32(memoryview(dados)[:offset])
+        if resumo != em_cache["resumo"]:
+            return None
+        novos = dados[offset:]
+        if not novos.endswith(b"\n"):
+            # linha ainda sendo gravada
+            return None
+
+        bruto = pd.read_csv(
+            io.BytesIO(novos), sep=";", encoding="utf-8", dtype=str,
+            header=None, names=em_cache["cabecalho"],
+        )
+        df_novos = self._conferir_colunas(store, bruto)
+        with _LOCK_CSV:
+            _STATS_CSV["leituras_incrementais"] += 1
+        return {
+            "df": pd.concat([em_cache["df"], df_novos], ignore_index=True),
+            "offset": len(dados),
+            "cabecalho": em_cache["cabecalho"],
+            "resumo": zlib.crc32(novos, resumo),
+            "fim_de_linha": True,
+        }
+
+    def registrar(self, store: str, valores: dict):
+        spec = STORES[store]
+        colunas = _colunas_csv(spec)
+        caminho = caminho_csv(store)
+        try:
+            with trava_arquivo(caminho):
+                # nunca anexa linha no formato novo a um CSV ainda no antigo
+                self.atualizar_formato(store)
+                if spec.get("textos"):
+                    (ref,) = self._anexar_textos(store, [{c: valores.get(c, "") for c in spec["textos"]}])
+                    valores = {**valores, "ref_texto": ref}
+
+                if spec["pk"]:
+                    return anexar_linha_com_id(
+                        caminho,
+                        colunas,
+                        lambda novo_id: [novo_id] + [valores.get(c, "") for c in colunas[1:]],
+                    )
+
+                existe = os.path.exists(caminho)
+                with open(caminho, "a", newline="", encoding="utf-8") as f:
+                    w = csv.writer(f, delimiter=";")
+                    if not existe:
+                        w.writerow(colunas)
+                    w.writerow([valores.get(c, "") for c in colunas])
+            return None
+        finally:
+            if not spec.get("somente_anexo"):
+                _invalidar_csv(caminho)
+
+    def salvar(self, store: str, df: pd.DataFrame):
+        caminho = caminho_csv(store)
+        with trava_arquivo(caminho):
+            lida = df.attrs.get("versao")
+            if lida is not None and lida != self.versao(store):
+                raise ConflitoDeVersao(
+                    f"{STORES[store]['arquivo']} foi alterado por outra sessão. Recarregue e tente de novo."
+                )
+            if STORES[store].get("log_alteracoes") and self._salvar_diferencas(store, df):
+                return
+            try:
+                gravar_csv_atomico(df, caminho)
+                # o CSV regravado já contém tudo o que estava no log
+                self._descartar_alteracoes(store)
+            finally:
+                _invalidar_csv(caminho)
+
+    def atualizar(self, store: str, id_registro, valores: dict) -> int:
+        """
+        Altera colunas da linha id_registro (tupla, se a chave tiver várias colunas).
+        Stores com log_alteracoes só anexam a alteração ao log; os demais regravam o CSV.
+        """
+        spec = STORES[store]
+        chave = _chave(spec)
+        id_registro = id_registro if isinstance(id_registro, tuple) else (id_registro,)
+
+        def linhas(df):
+            mask = pd.Series(True, index=df.index)
+            for coluna, valor in zip(chave, id_registro):
+                mask &= df[coluna] == str(valor)
+            return mask
+
+        if spec.get("log_alteracoes"):
+            # chave inexistente não vai para o log (ficaria órfã até a compactação)
+            encontradas = int(linhas(self.carregar(store)).sum())
+            if encontradas:
+                self._anexar_alteracoes(
+                    store, [[*map(str, id_registro), coluna, valor] for coluna, valor in valores.items()]
+                )
+            return encontradas
+
+        with trava_arquivo(caminho_csv(store)):
+            df = self.carregar(store)
+            mask = linhas(df)
+            for coluna, valor in valores.items():
+                df.loc[mask, coluna] = valor
+            if mask.any():
+                self.salvar(store, df)
+        return int(mask.sum())
+
+    # --- log de alterações por linha -------------------------------------
+    # "<csv>.alteracoes": uma linha por célula alterada (chave...;coluna;valor),
+    # aplicada por cima do CSV na leitura. Passando de LIMITE_LOG_ALTERACOES
+    # bytes, uma thread em segundo plano regrava o CSV e zera o log.
+
+    def _anexar_alteracoes(self, store: str, linhas: list):
+        if not linhas:
+            return
+        caminho = caminho_csv(store)
+        with trava_arquivo(caminho):
+            with open(caminho_alteracoes(store), "a", newline="", encoding="utf-8") as f:
+                csv.writer(f, delimiter=";").writerows(linhas)
+        if assinatura_arquivo(caminho_alteracoes(store))[0] > LIMITE_LOG_ALTERACOES:
+            compactar_em_segundo_plano(store)
+
+    def _aplicar_alteracoes(self, store: str, df: pd.DataFrame) -> pd.DataFrame:
+        chave = list(_chave(STORES[store]))
+        try:
+            log = pd.read_csv(
+                caminho_alteracoes(store), sep=";", encoding="utf-8", dtype=str,
+                header=None, names=chave + ["coluna", "valor"], keep_default_na=False,
+            )
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return df
+        log = log[log["coluna"].isin(df.columns) & ~log["coluna"].isin(chave)]
+        if log.empty or df.empty:
+            return df
+        # vale a última alteração de cada célula
+        log = log.drop_duplicates(subset=chave + ["coluna"], keep="last")
+        novos = log.pivot(index=chave, columns="coluna", values="valor")
+        novos.index = pd.MultiIndex.from_frame(novos.index.to_frame(index=False))
+
+        # alinhado pela chave de cada linha (não por posição): uma chave repetida
+        # no CSV recebe a alteração em todas as suas linhas, como em atualizar()
+        df = df.reset_index(drop=True)
+        alinhado = novos.reindex(pd.MultiIndex.from_frame(df[chave])).set_axis(df.index)
+        df = df.copy(deep=not _COPY_ON_WRITE)
+        for coluna in novos.columns:
+            df[coluna] = alinhado[coluna].where(alinhado[coluna].notna(), df[coluna])
+        return df
+
+    def _salvar_diferencas(self, store: str, df: pd.DataFrame) -> bool:
+        """
+        Grava no log só as células que mudaram em relação ao que está salvo.
+        False se as linhas não forem as mesmas (inclusão/remoção): aí o CSV é regravado.
+        """
+        chave = list(_chave(STORES[store]))
+        atual = self.carregar(store)
+        df = df.reset_index(drop=True)
+        if list(df.columns) != list(atual.columns) or len(df) != len(atual):
+            return False
+        df = df.fillna("").astype(str)
+        if not df[chave].equals(atual[chave]):
+            return False
+
+        diferente = df.ne(atual)
+        diferente[chave] = False
+        if not diferente.to_numpy().any():
+            return True
+        mudancas = df.where(diferente).stack().dropna().reset_index()
+        mudancas.columns = ["linha", "coluna", "valor"]
+        chaves = df.loc[mudancas["linha"], chave].reset_index(drop=True)
+        self._anexar_alteracoes(
+            store, pd.concat([chaves, mudancas[["coluna", "valor"]]], axis=1).values.tolist()
+        )
+        return True
+
+    def _descartar_alteracoes(self, store: str):
+        try:
+            os.remove(caminho_alteracoes(store))
+        except FileNotFoundError:
+            pass
+
+    # --- textos longos -----------------------------------------------------
+    # Stores com "textos" (pareceres: resumo, análise, conclusão) guardam esses
+    # campos em "<arquivo_textos>", um JSON por linha, só anexado. O CSV fica
+    # com ref_texto = posição (em bytes) da linha: abrir um parecer é um seek,
+    # e o pipeline/dashboard nunca fazem parse dos textos.
+
+    def _anexar_textos(self, store: str, registros: list[dict]) -> list[str]:
+        """Grava os textos (chamar com a trava do CSV); devolve o ref_texto de cada um ("" se vazios)."""
+        refs = []
+        with open(caminho_textos(store), "ab") as f:
+            for registro in registros:
+                registro = {c: _texto(v) for c, v in registro.items()}
+                if not any(v.strip() for v in registro.values()):
+                    refs.append("")
+                    continue
+                refs.append(str(f.tell()))
+                f.write(json.dumps(registro, ensure_ascii=False).encode("utf-8") + b"\n")
+        return refs
+
+    def _ler_textos(self, store: str) -> dict[str, dict]:
+        """
+        Todos os textos do store, por ref_texto. Fica em cache enquanto a versão
+        do arquivo não muda; como ele só cresce, depois de uma gravação só as
+        linhas novas passam pelo parse.
+        """
+        caminho = caminho_textos(store)
+        versao = versao_arquivo(caminho)
+        with _LOCK_TEXTOS:
+            em_cache = _CACHE_TEXTOS.get(caminho)
+        if em_cache is not None and em_cache["versao"] == versao:
+            return em_cache["guardados"]
+
+        try:
+            with open(caminho, "rb") as f:
+                dados = f.read()
+        except FileNotFoundError:
+            return {}
+        guardados, pos = {}, 0
+        if em_cache is not None:
+            # trecho já lido intacto (CRC): parse só do que foi anexado depois
+            lido = em_cache["offset"]
+            if len(dados) >= lido and zlib.crc32(memoryview(dados)[:lido]) == em_cache["resumo"]:
+                guardados, pos = dict(em_cache["guardados"]), lido
+        # o último pedaço é vazio ou uma linha ainda sendo gravada
+        for linha in dados[pos:].split(b"\n")[:-1]:
+            if linha:
+                guardados[str(pos)] = json.loads(linha)
+            pos += len(linha) + 1
+        with _LOCK_TEXTOS:
+            _CACHE_TEXTOS[caminho] = {
+                "versao": versao,
+                "offset": pos,
+                "resumo": zlib.crc32(memoryview(dados)[:pos]),
+                "guardados": guardados,
+            }
+        return guardados
+
+    def _juntar_textos(self, store: str, df: pd.DataFrame, textos: list) -> pd.DataFrame:
+        guardados = self._ler_textos(store)
+        refs = df["ref_texto"]
+        for c in textos:
+            do_arquivo = refs.map(lambda ref: guardados.get(ref, {}).get(c))
+            atual = df[c] if c in df.columns else ""
+            df[c] = do_arquivo.where(do_arquivo.notna(), atual).astype(str)
+        return df
+
+    def textos(self, store: str, ref_texto) -> dict:
+        """Os textos longos de um registro (para abrir um único parecer)."""
+        vazio = dict.fromkeys(STORES[store]["textos"], "")
+        ref = _texto(ref_texto).strip()
+        if not ref:
+            return vazio
+        try:
+            with open(caminho_textos(store), "rb") as f:
+                f.seek(int(ref))
+                linha = f.readline()
+        except (FileNotFoundError, ValueError):
+            return vazio
+        if not linha.endswith(b"\n"):
+            return vazio
+        return {**vazio, **json.loads(linha)}
+
+    # --- formato do arquivo ------------------------------------------------
+    # Passos numerados (PASSOS_FORMATO), como as MIGRACOES do banco: cada CSV
+    # passa por eles uma vez e a versão fica em ARQUIVO_FORMATO. Depois disso
+    # a leitura não concilia colunas nem grava nada.
+
+    def _ler_para_formato(self, store: str):
+        caminho = caminho_csv(store)
+        if not _cabecalho_csv(caminho):
+            return None
+        return pd.read_csv(caminho, sep=";", encoding="utf-8", dtype=str).fillna("")
+
+    def _formato_colunas(self, store: str):
+        """Passo 1: aliases, colunas que faltavam e ordem do cabeçalho."""
+        bruto = self._ler_para_formato(store)
+        if bruto is None:
+            return
+        df = self._normalizar(store, bruto)
+        if list(df.columns) != list(bruto.columns):
+            gravar_csv_atomico(df, caminho_csv(store))
+
+    def _formato_textos(self, store: str):
+        """Passo 2: textos longos para o arquivo de textos (stores com "textos")."""
+        spec = STORES[store]
+        df = self._ler_para_formato(store) if spec.get("textos") else None
+        if df is None or list(df.columns) == _colunas_csv(spec):
+            return
+        textos = [c for c in spec["textos"] if c in df.columns]
+        pendentes = df["ref_texto"] == ""
+        if textos and pendentes.any():
+            df.loc[pendentes, "ref_texto"] = self._anexar_textos(
+                store, df.loc[pendentes, textos].to_dict("records")
+            )
+        gravar_csv_atomico(df[_colunas_csv(spec)], caminho_csv(store))
+
+    def atualizar_formato(self, store: str) -> list[int]:
+        """Aplica ao CSV os passos de PASSOS_FORMATO que faltam. Retorna os aplicados."""
+        caminho = caminho_csv(store)
+        with trava_arquivo(caminho):
+            atual = _versoes_formato().get(store, 0)
+            pendentes = [(v, passo) for v, _descricao, passo in PASSOS_FORMATO if v > atual]
+            if not pendentes:
+                return []
+            try:
+                for _versao, passo in pendentes:
+                    passo(self, store)
+            finally:
+                _invalidar_csv(caminho)
+            _registrar_formato(store, pendentes[-1][0])
+            return [v for v, _ in pendentes]
+
+    def compactar(self, store: str):
+        """Aplica o log de alterações ao CSV e apaga o log."""
+        caminho = caminho_csv(store)
+        with trava_arquivo(caminho):
+            if not assinatura_arquivo(caminho_alteracoes(store))[0]:
+                return
+            df = self.carregar(store)
+            try:
+                gravar_csv_atomico(df, caminho)
+                self._descartar_alteracoes(store)
+            finally:
+                _invalidar_csv(caminho)
+
+
+# =========================
+# BACKEND SQLITE
+# =========================
+
+@database.cache_leitura
+def _ler_tabela(store: str, colunas: tuple | None = None) -> pd.DataFrame:
+    spec = STORES[store]
+    leitura = spec.get("leitura", {})
+    selecao = {}
+    for c in spec["colunas"]:
+        destino = _coluna_banco(spec, c)
+        selecao[c] = leitura.get(c) or (f"t.{destino}" if destino else "NULL")
+    selecao.update(spec.get("extras", {}))
+    if colunas is not None:
+        # projeção: só as colunas pedidas saem do banco (textos longos ficam lá)
+        selecao = {c: selecao[c] for c in colunas if c in selecao}
+    nomes, expressoes = list(selecao), list(selecao.values())
+
+    ordem = spec.get("ordem") or ", ".join(f"t.{c}" for c in _chave(spec))
+    sql = (
+        f"SELECT {', '.join(f'{e} AS {n}' for e, n in zip(expressoes, nomes))} "
+        f"FROM {spec['tabela']} t ORDER BY {ordem};"
+    )
+    linhas = database.conexao().execute(sql).fetchall()
+    if not linhas:
+        return pd.DataFrame(columns=nomes)
+    # mesmas strings que o read_csv(dtype=str).fillna("") devolvia
+    colunas = {n: [_texto(v) for v in valores] for n, valores in zip(nomes, zip(*linhas))}
+    return pd.DataFrame(colunas, columns=nomes, dtype=str)
+
+
+@database.cache_leitura
+def _ler_textos_banco(store: str, ref: str) -> dict:
+    spec = STORES[store]
+    vazio = dict.fromkeys(spec["textos"], "")
+    if not ref.isdigit():
+        return vazio
+    expressoes = ", ".join(f"t.{_coluna_banco(spec, c)} AS {c}" for c in spec["textos"])
+    row = database.conexao().execute(
+        f"SELECT {expressoes} FROM {spec['tabela']} t WHERE {spec['extras']['ref_texto']} = ?;", (int(ref),)
+    ).fetchone()
+    return {c: _texto(row[c]) for c in spec["textos"]} if row else vazio
+
+
+class BackendSQLite:
+    """Tabelas do gac.db, devolvidas com as mesmas colunas (texto) dos CSVs."""
+
+    nome = "sqlite"
+
+    def carregar(self, store: str, colunas=None) -> pd.DataFrame:
+        return _ler_tabela(store, tuple(colunas) if colunas is not None else None)
+
+    def textos(self, store: str, ref_texto) -> dict:
+        return _ler_textos_banco(store, _texto(ref_texto).strip())
+
+    def registrar(self, store: str, valores: dict):
+        spec = STORES[store]
+        return database.inserir_registro(spec["tabela"], _para_banco(spec, valores))
+
+    def salvar(self, store: str, df: pd.DataFrame):
+        spec = STORES[store]
+        if not spec["pk"] and not spec.get("chave"):
+            raise ValueError(f"O store {store!r} não pode ser regravado por inteiro.")
+        linhas = [_para_banco(spec, r) for r in df.to_dict("records")]
+        database.salvar_tabela(spec["tabela"], _chave(spec), linhas)
+
+    def atualizar(self, store: str, id_registro, valores: dict) -> int:
+        spec = STORES[store]
+        chave = _chave(spec)
+        id_registro = id_registro if isinstance(id_registro, tuple) else (id_registro,)
+        return database.atualizar_registro(
+            spec["tabela"],
+            tuple(_coluna_banco(spec, c) for c in chave),
+            tuple(_valor_banco(c, v) for c, v in zip(chave, id_registro)),
+            _para_banco(spec, valores),
+        )
+
+
+BACKEND_CSV = BackendCSV()
+BACKEND_SQLITE = BackendSQLite()
+
+_COMPACTANDO: set[str] = set()
+
+
+def compactar_em_segundo_plano(store: str):
+    """Dispara BACKEND_CSV.compactar(store) numa thread, se já não houver uma para o store."""
+    with _LOCK_CSV:
+        if store in _COMPACTANDO:
+            return
+        _COMPACTANDO.add(store)
+
+    def _rodar():
+        try:
+            BACKEND_CSV.compactar(store)
+        except Exception:
+            logger.exception("Falha ao compactar o log de alterações de %s", store)
+        finally:
+            with _LOCK_CSV:
+                _COMPACTANDO.discard(store)
+
+    threading.Thread(target=_rodar, name=f"gac-compactar-{store}", daemon=True).start()
+
+
+@database.cache_leitura
+def _stores_migrados() -> list[str]:
+    try:
+        linhas = database.conexao().execute(
+            "SELECT store FROM migracao_csv WHERE status = 'concluida';"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        # banco ainda sem a migração 4 (init_db não rodou)
+        return []
+    return [r["store"] for r in linhas]
+
+
+def backend_atual():
+    """
+    Backend em uso: o da variável GAC_ARMAZENAMENTO (csv|sqlite) ou, sem ela,
+    o banco quando todos os CSVs já foram migrados.
+    """
+    escolha = os.environ.get("GAC_ARMAZENAMENTO", "").strip().lower()
+    if escolha == "csv":
+        return BACKEND_CSV
+    if escolha == "sqlite":
+        return BACKEND_SQLITE
+    if set(STORES) <= set(_stores_migrados()):
+        return BACKEND_SQLITE
+    return BACKEND_CSV
+
+
+def carregar(store: str, colunas=None, tipado: bool = False) -> pd.DataFrame:
+    df = backend_atual().carregar(store, colunas)
+    return tipar(store, df) if tipado else df
+
+
+def textos(store: str, ref_texto) -> dict:
+    return backend_atual().textos(store, ref_texto)
+
+
+# =========================
+# FORMATO DOS CSVs
+# =========================
+# (versão, descrição, passo). Nunca altere um passo já publicado: crie um novo
+# com a próxima versão. Um CSV que ainda não existe já nasce no formato atual.
+PASSOS_FORMATO = [
+    (1, "Cabeçalho com as colunas atuais (aliases, colunas que faltavam, ordem)", BackendCSV._formato_colunas),
+    (2, "Textos longos dos pareceres fora do CSV (ref_texto)", BackendCSV._formato_textos),
+]
+ARQUIVO_FORMATO = os.path.join(DATA_DIR, "formato_csv.json")
+_FORMATO_CONFERIDO: set[str] = set()
+
+
+def _versoes_formato() -> dict:
+    try:
+        with open(ARQUIVO_FORMATO, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _registrar_formato(store: str, versao: int):
+    with trava_arquivo(ARQUIVO_FORMATO):
+        versoes = _versoes_formato()
+        versoes[store] = versao
+        gravar_atomico(ARQUIVO_FORMATO, lambda f: json.dump(versoes, f, indent=2, sort_keys=True))
+
+
+def atualizar_formato_csv(stores=None) -> dict[str, list[int]]:
+    """
+    Deixa os CSVs de data/ no formato atual (uma vez por arquivo; depois só
+    confere a versão registrada). Retorna, por store, os passos aplicados agora.
+    """
+    aplicados = {}
+    for store in stores or STORES:
+        if store in _FORMATO_CONFERIDO:
+            continue
+        passos = BACKEND_CSV.atualizar_formato(store)
+        if passos:
+            aplicados[store] = passos
+        _FORMATO_CONFERIDO.add(store)
+    return aplicados
+
+
+def registrar(store: str, valores: dict):
+    return backend_atual().registrar(store, valores)
+
+
+def salvar(store: str, df: pd.DataFrame):
+    if df.attrs.get("tipado"):
+        raise ValueError(f"DataFrame tipado não pode ser salvo em {store!r}: carregue sem tipado=True para editar.")
+    return backend_atual().salvar(store, df)
+
+
+def atualizar(store: str, id_registro, valores: dict) -> int:
+    return backend_atual().atualizar(store, id_registro, valores)
+
+
+# =========================
+# MIGRAÇÃO CSV -> SQLITE
+# =========================
+# Cada store é migrado em um único item da fila de escrita (uma transação):
+# ou entra inteiro e fica registrado em migracao_csv, ou nada muda. Rodar de
+# novo continua dos stores que faltam. O de-para de ids (migracao_csv_ids)
+# traduz as referências dos stores seguintes (ex.: id_cliente das vagas).
+
+# vazias no CSV: deixa o DEFAULT da tabela (datetime('now'))
+_COLUNAS_COM_PADRAO = ("created_at", "data_vinculo")
+
+
+def _mapa_ids(conn: sqlite3.Connection, store: str) -> dict[str, int]:
+    return {
+        r["id_csv"]: r["id_banco"]
+        for r in conn.execute("SELECT id_csv, id_banco FROM migracao_csv_ids WHERE store = ?;", (store,))
+    }
+
+
+def _completar_parecer(conn: sqlite3.Connection, valores: dict):
+    # histórico antigo: id_candidato vazio/desconhecido e sem id_vaga
+    if valores.get("id_candidato") is None and valores.get("nome_candidato"):
+        row = conn.execute(
+            "SELECT id_candidato FROM candidatos WHERE lower(trim(nome)) = lower(trim(?)) LIMIT 1;",
+            (valores["nome_candidato"],),
+        ).fetchone()
+        valores["id_candidato"] = row["id_candidato"] if row else None
+    if valores.get("cargo") and valores.get("cliente"):
+        row = conn.execute(
+            """
+            SELECT v.id_vaga FROM vagas v JOIN clientes c ON c.id_cliente = v.id_cliente
+            WHERE lower(trim(v.cargo)) = lower(trim(?)) AND lower(trim(c.nome_cliente)) = lower(trim(?))
+            ORDER BY v.id_vaga DESC LIMIT 1;
+            """,
+            (valores["cargo"], valores["cliente"]),
+        ).fetchone()
+        valores["id_vaga"] = row["id_vaga"] if row else None
+
+
+def _migrar_store(store: str, registros: list[dict]) -> dict:
+    """Roda dentro do escritor (transação do lote já aberta)."""
+    spec = STORES[store]
+    tabela, pk = spec["tabela"], spec["pk"]
+    conn = database.conexao()
+    mapas = {ref: _mapa_ids(conn, ref) for ref in set(spec.get("referencias", {}).values())}
+    pk_banco = pk or conn.execute(
+        f"SELECT name FROM pragma_table_info('{tabela}') WHERE pk = 1;"
+    ).fetchone()["name"]
+
+    inseridas = mescladas = 0
+    ignoradas = []
+    for n, reg in enumerate(registros, start=2):  # linha 1 = cabeçalho
+        reg = {c: ("" if str(v).strip().lower() == "nan" else v) for c, v in reg.items()}
+        id_csv = str(reg.get(pk, "")).strip() if pk else ""
+
+        valores = _para_banco(spec, reg)
+        for coluna, ref in spec.get("referencias", {}).items():
+            original = reg.get(coluna, "")
+            valores[coluna] = mapas[ref].get(str(original).strip()) if str(original).strip() else None
+        faltando = [c for c in spec.get("obrigatorias", ()) if valores.get(c) is None]
+        if faltando:
+            ignoradas.append(f"linha {n}: sem {', '.join(faltando)} correspondente no banco")
+            continue
+        if store == "pareceres":
+            _completar_parecer(conn, valores)
+        for coluna in _COLUNAS_COM_PADRAO:
+            if valores.get(coluna) == "":
+                valores.pop(coluna)
+
+        existente = None
+        if spec.get("duplicado"):
+            sql, campos = spec["duplicado"]
+            row = conn.execute(sql, [valores.get(c) for c in campos]).fetchone()
+            existente = row[0] if row else None
+
+        if existente is not None:
+            # já existe: só preenche o que estiver vazio no banco
+            colunas = [c for c in valores if c != pk_banco and c not in _chave(spec)]
+            if colunas:
+                atribuicoes = ", ".join(f"{c} = COALESCE(NULLIF({c}, ''), ?)" for c in colunas)
+                conn.execute(
+                    f"UPDATE {tabela} SET {atribuicoes} WHERE {pk_banco} = ?;",
+                    [valores[c] for c in colunas] + [existente],
+                )
+            id_banco = existente
+            mescladas += 1
+        else:
+            valores.pop(pk_banco, None)
+            id_original = _valor_banco(pk, id_csv) if pk else None
+            if isinstance(id_original, int) and not conn.execute(
+                f"SELECT 1 FROM {tabela} WHERE {pk_banco} = ?;", (id_original,)
+            ).fetchone():
+                # id livre no banco: mantém o número que o usuário conhece (OS, NF...)
+                valores[pk_banco] = id_original
+            colunas = list(valores)
+            cur = conn.execute(
+                f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' for _ in colunas)});",
+                [valores[c] for c in colunas],
+            )
+            id_banco = cur.lastrowid
+            inseridas += 1
+
+        if pk and id_csv:
+            conn.execute(
+                "INSERT OR REPLACE INTO migracao_csv_ids (store, id_csv, id_banco) VALUES (?, ?, ?);",
+                (store, id_csv, id_banco),
+            )
+
+    # conferência: toda linha do CSV virou (ou foi mesclada em) uma linha do banco, ou foi ignorada com motivo
+    gravadas = inseridas + mescladas
+    if gravadas + len(ignoradas) != len(registros):
+        raise RuntimeError(f"{store}: {len(registros)} linhas no CSV, {gravadas} gravadas e {len(ignoradas)} ignoradas.")
+    if pk:
+        orfaos = conn.execute(
+            f"SELECT COUNT(*) FROM migracao_csv_ids m LEFT JOIN {tabela} t ON t.{pk_banco} = m.id_banco "
+            f"WHERE m.store = ? AND t.{pk_banco} IS NULL;",
+            (store,),
+        ).fetchone()[0]
+        if orfaos:
+            raise RuntimeError(f"{store}: {orfaos} id(s) migrados não existem na tabela {tabela}.")
+    linhas_banco = conn.execute(f"SELECT COUNT(*) FROM {tabela};").fetchone()[0]
+
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO migracao_csv (store, status, linhas_csv, linhas_banco, ignoradas, concluida_em)
+        VALUES (?, 'concluida', ?, ?, ?, ?);
+        """,
+        (store, len(registros), linhas_banco, len(ignoradas), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+    )
+    return {
+        "store": store,
+        "linhas_csv": len(registros),
+        "inseridas": inseridas,
+        "mescladas": mescladas,
+        "ignoradas": ignoradas,
+        "linhas_banco": linhas_banco,
+    }
+
+
+def status_migracao() -> list[dict]:
+    """Uma linha por store já migrado (migracao_csv)."""
+    try:
+        return [dict(r) for r in database.conexao().execute("SELECT * FROM migracao_csv ORDER BY store;")]
+    except sqlite3.OperationalError:
+        return []
+
+
+def migrar_csv_para_sqlite(stores=None) -> list[dict]:
+    """
+    Copia os CSVs de data/ para o gac.db, store por store (ORDEM_MIGRACAO).
+    Stores já concluídos são pulados; os CSVs não são alterados (ficam de backup).
+    Retorna o relatório de cada store migrado nesta chamada.
+    """
+    database.init_db()
+    atualizar_formato_csv(stores)
+    concluidos = set(_stores_migrados())
+    relatorio = []
+    for store in ORDEM_MIGRACAO:
+        if (stores and store not in stores) or store in concluidos:
+            continue
+        registros = BACKEND_CSV.carregar(store).to_dict("records")
+        relatorio.append(database.enfileirar_escrita(_migrar_store, store, registros).result())
+    return relatorio
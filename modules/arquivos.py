@@ -0,0 +1,253 @@
+# modules/arquivos.py
+# Trava de arquivo entre processos, gravação atômica com versão e alocação de
+# ids para os CSVs de data/.
+import os
+import csv
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import msvcrt  # Windows
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+# Uma trava por arquivo dentro do processo (as threads do Streamlit) +
+# trava do sistema operacional no arquivo "<csv>.lock" (outros processos).
+_LOCKS_PROCESSO: dict[str, threading.Lock] = {}
+_LOCK_DICT = threading.Lock()
+_LOCAL = threading.local()
+
+
+def _lock_do_processo(caminho: str) -> threading.Lock:
+    with _LOCK_DICT:
+        lock = _LOCKS_PROCESSO.get(caminho)
+        if lock is None:
+            lock = _LOCKS_PROCESSO[caminho] = threading.Lock()
+        return lock
+
+
+def _travar_so(f):
+    if msvcrt is not None:
+        # LK_LOCK desiste após ~10 s; continua tentando até conseguir
+        while True:
+            try:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                time.sleep(0.05)
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _destravar_so(f):
+    if msvcrt is not None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def trava_arquivo(caminho: str):
+    """
+    Acesso exclusivo a `caminho` entre threads e processos, enquanto durar o bloco.
+    Reentrante na mesma thread (pode ser aninhada).
+    """
+    caminho = os.path.abspath(caminho)
+    travados = getattr(_LOCAL, "travados", None)
+    if travados is None:
+        travados = _LOCAL.travados = {}
+    if travados.get(caminho):
+        travados[caminho] += 1
+        try:
+            yield
+        finally:
+            travados[caminho] -= 1
+        return
+
+    lock = _lock_do_processo(caminho)
+    with lock:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho + ".lock", "a+b") as f:
+            _travar_so(f)
+            travados[caminho] = 1
+            try:
+                yield
+            finally:
+                travados[caminho] = 0
+                _destravar_so(f)
+
+
+# =========================
+# SEQUÊNCIA DE IDS
+# =========================
+# "<csv>.seq" guarda: último id;tamanho do CSV;mtime do CSV (ns) da última alocação.
+# Se o CSV mudou por fora (edição na tela, planilha), o maior id é relido uma vez.
+
+def _maior_id_no_csv(caminho_csv: str, coluna_id: str) -> int:
+    if not os.path.exists(caminho_csv):
+        return 0
+    maior = 0
+    with open(caminho_csv, newline="", encoding="utf-8") as f:
+        leitor = csv.reader(f, delimiter=";")
+        cabecalho = next(leitor, None)
+        if not cabecalho or coluna_id not in cabecalho:
+            return 0
+        pos = cabecalho.index(coluna_id)
+        for linha in leitor:
+            try:
+                maior = max(maior, int(float(linha[pos])))
+            except (IndexError, ValueError):
+                continue
+    return maior
+
+
+def assinatura_arquivo(caminho_csv: str) -> tuple[int, int]:
+    """(tamanho, mtime em ns) do arquivo; (0, 0) se não existir."""
+    try:
+        st = os.stat(caminho_csv)
+        return st.st_size, st.st_mtime_ns
+    except FileNotFoundError:
+        return 0, 0
+
+
+def _ler_seq(caminho_seq: str):
+    try:
+        with open(caminho_seq, encoding="utf-8") as f:
+            ultimo, tamanho, mtime = f.read().strip().split(";")
+        return int(ultimo), (int(tamanho), int(mtime))
+    except (FileNotFoundError, ValueError):
+        return None, None
+
+
+def _gravar_seq(caminho_seq: str, ultimo: int, assinatura: tuple[int, int]):
+    tmp = caminho_seq + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(f"{ultimo};{assinatura[0]};{assinatura[1]}")
+    os.replace(tmp, caminho_seq)
+
+
+def proximo_id(caminho_csv: str, coluna_id: str) -> int:
+    """
+    Próximo id de `coluna_id` no CSV, em tempo constante (sem ler o arquivo).
+    Deve ser chamada dentro de trava_arquivo(caminho_csv), junto com a gravação
+    da linha, e seguida de confirmar_id() depois de gravar.
+    """
+    caminho_seq = caminho_csv + ".seq"
+    with trava_arquivo(caminho_csv):
+        ultimo, assinatura = _ler_seq(caminho_seq)
+        if ultimo is None or assinatura != assinatura_arquivo(caminho_csv):
+            ultimo = max(ultimo or 0, _maior_id_no_csv(caminho_csv, coluna_id))
+        novo = ultimo + 1
+        # reserva já: mesmo que a gravação falhe, o id não é reutilizado
+        _gravar_seq(caminho_seq, novo, (-1, -1))
+        return novo
+
+
+def confirmar_id(caminho_csv: str, novo_id: int):
+    """Registra o estado do CSV após a gravação do id alocado por proximo_id()."""
+    with trava_arquivo(caminho_csv):
+        _gravar_seq(caminho_csv + ".seq", novo_id, assinatura_arquivo(caminho_csv))
+
+
+def anexar_linha_com_id(caminho_csv: str, cabecalho: list, montar_linha) -> int:
+    """
+    Aloca o próximo id e anexa a linha montar_linha(novo_id) ao CSV, tudo sob a
+    mesma trava: dois processos gravando ao mesmo tempo nunca repetem id.
+    Escreve o cabeçalho se o arquivo ainda não existir (ou estiver vazio).
+    """
+    with trava_arquivo(caminho_csv):
+        novo_id = proximo_id(caminho_csv, cabecalho[0])
+        vazio = assinatura_arquivo(caminho_csv)[0] == 0
+        with open(caminho_csv, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f, delimiter=";")
+            if vazio:
+                w.writerow(cabecalho)
+            w.writerow(montar_linha(novo_id))
+        confirmar_id(caminho_csv, novo_id)
+    return novo_id
+
+
+# =========================
+# GRAVAÇÃO ATÔMICA / VERSÃO
+# =========================
+# Regravar um CSV: trava, grava tudo num temporário na mesma pasta, fsync e
+# os.replace por cima do original. Quem lê (sem trava) vê o arquivo antigo
+# ou o novo inteiro, nunca um pela metade, em qualquer worker/processo.
+#
+# A versão de um arquivo é (inode, tamanho, mtime): os.replace troca o inode
+# e anexar muda o tamanho, então qualquer gravação muda a versão, mesmo que o
+# relógio do sistema de arquivos seja grosso.
+
+class ConflitoDeVersao(RuntimeError):
+    """O arquivo foi alterado (por outra sessão/processo) depois de lido."""
+
+
+def versao_arquivo(caminho: str) -> str:
+    """Carimbo de versão do arquivo; "0" se não existir."""
+    try:
+        st = os.stat(caminho)
+    except FileNotFoundError:
+        return "0"
+    return f"{st.st_ino}-{st.st_size}-{st.st_mtime_ns}"
+
+
+def _substituir(origem: str, destino: str):
+    # no Windows o replace falha enquanto outro processo estiver com o destino aberto
+    for tentativa in range(40):
+        try:
+            os.replace(origem, destino)
+            return
+        except PermissionError:
+            if msvcrt is None or tentativa == 39:
+                raise
+            time.sleep(0.05)
+
+
+def _sincronizar_pasta(pasta: str):
+    if msvcrt is not None:
+        return
+    fd = os.open(pasta, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def gravar_atomico(caminho: str, escrever, versao_esperada: str | None = None) -> str:
+    """
+    Substitui o conteúdo de `caminho` pelo que escrever(f) gravar em f (texto utf-8).
+    Com versao_esperada (de versao_arquivo na leitura), levanta ConflitoDeVersao
+    se o arquivo tiver mudado desde então, em vez de sobrescrever a outra gravação.
+    Retorna a nova versão.
+    """
+    caminho = os.path.abspath(caminho)
+    pasta = os.path.dirname(caminho)
+    with trava_arquivo(caminho):
+        if versao_esperada is not None and versao_arquivo(caminho) != versao_esperada:
+            raise ConflitoDeVersao(
+                f"{os.path.basename(caminho)} foi alterado por outra sessão. Recarregue e tente de novo."
+            )
+        fd, tmp = tempfile.mkstemp(dir=pasta, prefix=os.path.basename(caminho) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                escrever(f)
+                f.flush()
+                os.fsync(f.fileno())
+            _substituir(tmp, caminho)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        _sincronizar_pasta(pasta)
+        return versao_arquivo(caminho)
+
+
+def gravar_csv_atomico(df, caminho: str, sep: str = ";", versao_esperada: str | None = None) -> str:
+    """df.to_csv(caminho) via gravar_atomico (sem índice, utf-8)."""
+    return gravar_atomico(caminho, lambda f: df.to_csv(f, sep=sep, index=False), versao_esperada)
@@ -5,6 +5,8 @@ from typing import Optional
 import pandas as pd
 import streamlit as st
 
+from .arquivos import gravar_csv_atomico
+
 # Caminho do arquivo de usuários: raiz do projeto (mesmo nível do parecer_app.py)
 MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.abspath(os.path.join(MODULE_DIR, ".."))
@@ -46,7 +48,7 @@ def load_users() -> pd.DataFrame:
     """Carrega usuários do CSV; se não existir, cria com usuários padrão."""
     if not os.path.exists(USERS_FILE):
         df = _create_default_users_df()
-        df.to_csv(USERS_FILE, index=False, encoding="utf-8")
+        gravar_csv_atomico(df, USERS_FILE, sep=",")
         return df
 
     df = pd.read_csv(USERS_FILE, dtype=str)
@@ -74,8 +76,8 @@ def load_users() -> pd.DataFrame:
 
 
 def save_users(df: pd.DataFrame) -> None:
-    """Grava o DataFrame de usuários no CSV."""
-    df.to_csv(USERS_FILE, index=False, encoding="utf-8")
+    """Grava o DataFrame de usuários no CSV (troca atômica, com trava)."""
+    gravar_csv_atomico(df, USERS_FILE, sep=",")
 
 
 # -----------------------------
@@ -0,0 +1,204 @@
+# modules/cache_pareceres.py
+# Cache em disco dos pareceres gerados, endereçado pelo conteúdo: a chave é o
+# hash dos campos do parecer, do formato, da versão do modelo e do conteúdo
+# dos CVs anexados. Regerar um parecer sem mudanças devolve o arquivo pronto.
+# Tamanho limitado; ao passar do limite saem os menos usados (LRU pelo mtime,
+# que é renovado a cada acerto).
+import os
+import json
+import hashlib
+import tempfile
+import threading
+
+from .core import BASE_DIR, build_parecer_docx_to_bytes, build_parecer_pdf_to_bytes, merge_pdfs
+from .renderizacao import CAMPOS_PARECER, VERSAO_MODELO_PDF, versao_modelo_docx
+
+CACHE_DIR = os.path.join(BASE_DIR, "cache_pareceres")
+LIMITE_BYTES = 256 * 1024 * 1024
+
+EXTENSOES = {"PDF": ".pdf", "DOCX": ".docx"}
+# versão do layout por formato; no DOCX inclui o conteúdo do .docx base (timbrado)
+VERSOES_MODELO = {"PDF": lambda: VERSAO_MODELO_PDF, "DOCX": versao_modelo_docx}
+
+# hash do conteúdo de cada CV por (caminho, tamanho, mtime): só relê se o arquivo mudar
+_HASHES_ANEXO: dict[str, tuple] = {}
+_LOCK = threading.Lock()
+
+
+# =========================
+# CHAVE
+# =========================
+
+def hash_arquivo(caminho: str) -> str:
+    """sha256 do conteúdo de um arquivo; "ausente" se não existir."""
+    try:
+        st = os.stat(caminho)
+    except OSError:
+        return "ausente"
+    assinatura = (st.st_size, st.st_mtime_ns)
+    with _LOCK:
+        guardado = _HASHES_ANEXO.get(caminho)
+    if guardado and guardado[0] == assinatura:
+        return guardado[1]
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloco)
+    digest = h.hexdigest()
+    with _LOCK:
+        _HASHES_ANEXO[caminho] = (assinatura, digest)
+    return digest
+
+
+def chave_parecer(registro: dict, formato: str, anexos=()) -> str:
+    """Chave do parecer: campos + formato + versão do modelo + conteúdo dos anexos."""
+    formato = formato.upper()
+    conteudo = {
+        "campos": {c: str(registro.get(c) or "") for c in CAMPOS_PARECER},
+        "formato": formato,
+        "modelo": VERSOES_MODELO[formato](),
+        "anexos": [hash_arquivo(a) for a in anexos] if formato == "PDF" else [],
+    }
+    return hashlib.sha256(json.dumps(conteudo, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _caminho(chave: str, formato: str) -> str:
+    return os.path.join(CACHE_DIR, chave + EXTENSOES[formato.upper()])
+
+
+def _caminho_info(chave: str) -> str:
+    return os.path.join(CACHE_DIR, chave + ".json")
+
+
+# =========================
+# LEITURA / GRAVAÇÃO
+# =========================
+
+def obter(chave: str, formato: str) -> str | None:
+    """Caminho do parecer em cache (e marca como usado agora), ou None."""
+    caminho = _caminho(chave, formato)
+    try:
+        os.utime(caminho)
+    except OSError:
+        return None
+    return caminho
+
+
+def guardar(chave: str, formato: str, escrever) -> str:
+    """
+    Grava via escrever(caminho_tmp) e publica no cache de forma atômica.
+    Se escrever devolver outra chave, o arquivo é publicado sob ela.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, prefix=chave[:16] + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        destino = _caminho(escrever(tmp) or chave, formato)
+        os.replace(tmp, destino)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    limpar_excedente()
+    return destino
+
+
+def gerar_parecer(registro: dict, formato: str, anexos=(), ao_falhar=None) -> tuple[str, str, bool]:
+    """
+    Parecer pronto no cache: (caminho, chave, veio_do_cache). Só renderiza (e
+    junta os CVs, no PDF) quando não há um idêntico guardado.
+    """
+    formato = formato.upper()
+    anexos = [a for a in anexos if a]
+    chave = chave_parecer(registro, formato, anexos)
+    caminho = obter(chave, formato)
+    if caminho:
+        return caminho, chave, True
+
+    campos = [registro.get(c, "") for c in CAMPOS_PARECER]
+    if formato == "PDF":
+        pulados = []
+
+        def anotar(fonte, erro):
+            pulados.append(fonte)
+            ao_falhar(fonte, erro)
+
+        def escrever(tmp):
+            nonlocal chave
+            parecer = build_parecer_pdf_to_bytes(*campos)
+            if not anexos:
+                with open(tmp, "wb") as f:
+                    f.write(parecer)
+                return None
+            merge_pdfs([parecer, *anexos], tmp, ao_falhar=anotar if ao_falhar else None)
+            if pulados:
+                # sem o CV que não abriu, o arquivo não é o da chave pedida: fica
+                # sob a chave do que foi anexado, e o próximo pedido tenta (e avisa) de novo
+                chave = chave_parecer(registro, formato, [a for a in anexos if a not in pulados])
+                return chave
+            return None
+    else:
+        def escrever(tmp):
+            with open(tmp, "wb") as f:
+                f.write(build_parecer_docx_to_bytes(*campos))
+
+    caminho = guardar(chave, formato, escrever)
+    return caminho, chave, False
+
+
+# =========================
+# ARQUIVO DE SAÍDA JÁ GRAVADO
+# =========================
+# Para não gravar outra cópia com data/hora no nome quando nada mudou, o cache
+# lembra em que arquivo de saída cada chave foi gravada por último.
+
+def saida_anterior(chave: str) -> str | None:
+    try:
+        with open(_caminho_info(chave), encoding="utf-8") as f:
+            caminho = json.load(f).get("saida") or ""
+    except (OSError, ValueError):
+        return None
+    return caminho if os.path.isfile(caminho) else None
+
+
+def registrar_saida(chave: str, caminho: str):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = _caminho_info(chave) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"saida": os.path.abspath(caminho)}, f)
+    os.replace(tmp, _caminho_info(chave))
+
+
+# =========================
+# LIMITE DE TAMANHO (LRU)
+# =========================
+
+def limpar_excedente(limite: int = LIMITE_BYTES) -> int:
+    """Remove os pareceres menos usados até o cache caber no limite. Retorna quantos saíram."""
+    try:
+        entradas = [e for e in os.scandir(CACHE_DIR) if e.name.endswith(tuple(EXTENSOES.values()))]
+    except FileNotFoundError:
+        return 0
+    itens = []
+    for e in entradas:
+        try:
+            st = e.stat()
+        except FileNotFoundError:
+            continue
+        itens.append((st.st_mtime_ns, st.st_size, e.path))
+    total = sum(tamanho for _, tamanho, _ in itens)
+    removidos = 0
+    for _, tamanho, caminho in sorted(itens):
+        if total <= limite:
+            break
+        chave = os.path.splitext(os.path.basename(caminho))[0]
+        for alvo in (caminho, _caminho_info(chave)):
+            try:
+                os.remove(alvo)
+            except OSError:  # já removido, ou aberto por outro processo (Windows)
+                pass
+        total -= tamanho
+        removidos += 1
+    return removidos
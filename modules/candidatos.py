@@ -6,10 +6,12 @@ import streamlit as st
 
 from .core import CV_DIR, montar_link_whatsapp
 from .database import (
-    listar_candidatos,
+    listar_candidatos_df,
+    listar_candidatos_pagina,
     inserir_candidato,
     obter_candidato,
     atualizar_candidato,
+    texto_celula,
 )
 
 
@@ -27,13 +29,38 @@ def render_tabela_html(df, columns, headers):
     for _, row in df[columns].iterrows():
         html.append("<tr>")
         for col in columns:
-            html.append(f"<td>{row[col]}</td>")
+            html.append(f"<td>{texto_celula(row[col])}</td>")
         html.append("</tr>")
 
     html.append("</tbody></table>")
     st.markdown("".join(html), unsafe_allow_html=True)
 
 
+TAMANHO_PAGINA = 50
+
+
+def navegacao_paginas(chave, pagina, tamanho=TAMANHO_PAGINA):
+    """
+    Botões Anterior/Próxima de uma listagem paginada por cursor.
+    Os cursores das páginas já visitadas ficam em st.session_state[chave].
+    """
+    cursores = st.session_state[chave]
+    total = pagina["total"]
+    qtd_paginas = max(1, -(-total // tamanho))
+
+    colP, colI, colN = st.columns([1, 2, 1])
+    with colP:
+        if st.button("◀ Anterior", disabled=len(cursores) == 1, key=f"{chave}_ant"):
+            cursores.pop()
+            st.experimental_rerun()
+    with colI:
+        st.caption(f"Página {len(cursores)} de {qtd_paginas} · {total} registro(s)")
+    with colN:
+        if st.button("Próxima ▶", disabled=pagina["proximo"] is None, key=f"{chave}_prox"):
+            cursores.append(pagina["proximo"])
+            st.experimental_rerun()
+
+
 def run():
     st.header("👤 Gestão de Candidatos")
 
@@ -61,12 +88,30 @@ def run():
     if modo == "Listar":
         st.subheader("📋 Candidatos cadastrados")
 
-        dados = listar_candidatos()
-        if not dados:
-            st.info("Nenhum candidato cadastrado.")
+        ordens = {"id_candidato": "ID", "nome": "Nome", "cidade": "Cidade", "created_at": "Cadastro"}
+        colF1, colF2 = st.columns([2, 1])
+        with colF1:
+            prefixo = st.text_input("Buscar pelo início do nome", key="cand_filtro_nome").strip()
+        with colF2:
+            ordem = st.selectbox("Ordenar por", list(ordens), format_func=ordens.get, key="cand_ordem")
+
+        # filtros mudaram: volta para a primeira página
+        filtros = (prefixo, ordem)
+        if st.session_state.get("cand_pag_filtros") != filtros:
+            st.session_state["cand_pag_filtros"] = filtros
+            st.session_state["cand_pag_cursores"] = [None]
+
+        pagina = listar_candidatos_pagina(
+            order_by=ordem,
+            apos=st.session_state["cand_pag_cursores"][-1],
+            limite=TAMANHO_PAGINA,
+            prefixo=prefixo or None,
+        )
+        if not pagina["itens"]:
+            st.info("Nenhum candidato encontrado." if prefixo else "Nenhum candidato cadastrado.")
             return
 
-        df = pd.DataFrame(dados).fillna("")
+        df = pd.DataFrame(pagina["itens"]).fillna("")
         df["whatsapp"] = df["telefone"].apply(montar_link_whatsapp)
 
         render_tabela_html(
@@ -74,6 +119,7 @@ def run():
             columns=["id_candidato", "nome", "cidade", "telefone", "pretensao", "linkedin", "caminho_cv"],
             headers=["ID", "Nome", "Cidade", "Telefone", "Pretensão / Cargo", "LinkedIn", "CV (caminho)"],
         )
+        navegacao_paginas("cand_pag_cursores", pagina)
         return
 
     # =========================
@@ -142,14 +188,12 @@ def run():
     if modo == "Editar":
         st.subheader("✏️ Editar candidato")
 
-        dados = listar_candidatos()
-        if not dados:
+        df = listar_candidatos_df()
+        if df.empty:
             st.info("Nenhum candidato para editar.")
             return
 
-        df = pd.DataFrame(dados).fillna("")
-
-        opcoes = {int(r["id_candidato"]): f"{r['id_candidato']} - {r['nome']}" for _, r in df.iterrows()}
+        opcoes = {int(i): f"{i} - {nome}" for i, nome in zip(df["id_candidato"], df["nome"])}
         id_sel = st.selectbox(
             "Selecione o candidato:",
             list(opcoes.keys()),
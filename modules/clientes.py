@@ -1,6 +1,7 @@
 import streamlit as st
 
-from .core import carregar_clientes, registrar_cliente, LOG_CLIENTES
+from .core import carregar_clientes, registrar_cliente, salvar_clientes
+from .arquivos import ConflitoDeVersao
 
 
 def run():
@@ -205,10 +206,14 @@ def run():
                     df_total.loc[mask, "email"] = email_edit
                     df_total.loc[mask, "observacoes"] = observ_edit
 
-                    df_total.to_csv(LOG_CLIENTES, sep=";", index=False, encoding="utf-8")
-                    st.success("Cliente atualizado com sucesso!")
-                    st.session_state["clientes_modo"] = "Listar"
-                    st.rerun()
+                    try:
+                        salvar_clientes(df_total)
+                    except ConflitoDeVersao as e:
+                        st.error(str(e))
+                    else:
+                        st.success("Cliente atualizado com sucesso!")
+                        st.session_state["clientes_modo"] = "Listar"
+                        st.rerun()
         with colc2:
             if st.button("⬅ Voltar para lista", use_container_width=True, key="btn_voltar_cliente_edit"):
                 st.session_state["clientes_modo"] = "Listar"
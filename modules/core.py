@@ -1,19 +1,20 @@
 import os
 import io
-import csv
 import re
+from contextlib import ExitStack
 from datetime import datetime
 
 import pandas as pd
 
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import Paragraph, Spacer, SimpleDocTemplate
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
-from reportlab.lib import colors
+from PyPDF2 import PdfReader, PdfWriter
 
-from PyPDF2 import PdfMerger, PdfReader
-from docx import Document
+from . import armazenamento
+from .renderizacao import (
+    renderizar_parecer_docx,
+    renderizar_parecer_pdf,
+    renderizar_pareceres_docx,
+    renderizar_pareceres_pdf,
+)
 
 # OpenAI opcional
 try:
@@ -31,16 +32,17 @@ os.makedirs(BASE_DIR, exist_ok=True)
 CV_DIR = os.path.join(BASE_DIR, "CVS")
 os.makedirs(CV_DIR, exist_ok=True)
 
-LOG_PAR = os.path.join(BASE_DIR, "pareceres_log.csv")
-LOG_CAND = os.path.join(BASE_DIR, "candidatos.csv")
-LOG_VAGAS = os.path.join(BASE_DIR, "vagas.csv")
-LOG_VAGA_CAND = os.path.join(BASE_DIR, "vaga_candidatos.csv")
-LOG_CLIENTES = os.path.join(BASE_DIR, "clientes.csv")
-LOG_ACESSOS = os.path.join(BASE_DIR, "acessos.csv")
+# CSVs antigos (ver modules.armazenamento; após a migração os dados ficam no gac.db)
+LOG_PAR = armazenamento.caminho_csv("pareceres")
+LOG_CAND = armazenamento.caminho_csv("candidatos")
+LOG_VAGAS = armazenamento.caminho_csv("vagas")
+LOG_VAGA_CAND = armazenamento.caminho_csv("vaga_candidatos")
+LOG_CLIENTES = armazenamento.caminho_csv("clientes")
+LOG_ACESSOS = armazenamento.caminho_csv("acessos")
 
-LOG_FIN_OS = os.path.join(BASE_DIR, "financeiro_os.csv")
-LOG_FIN_ORC = os.path.join(BASE_DIR, "financeiro_orcamentos.csv")
-LOG_FIN_NF = os.path.join(BASE_DIR, "financeiro_nf.csv")
+LOG_FIN_OS = armazenamento.caminho_csv("fin_os")
+LOG_FIN_ORC = armazenamento.caminho_csv("fin_orc")
+LOG_FIN_NF = armazenamento.caminho_csv("fin_nf")
 
 
 # =========================
@@ -122,15 +124,6 @@ Texto do candidato:
 # HELPERS GERAIS
 # =========================
 
-def _normalizar_linkedin(link):
-    if not link or not link.strip():
-        return None
-    link = link.strip()
-    if not (link.startswith("http://") or link.startswith("https://")):
-        return "https://" + link
-    return link
-
-
 def extract_text_from_pdf(upload):
     if not upload:
         return ""
@@ -165,87 +158,24 @@ def build_parecer_pdf_to_bytes(
     resumo_profissional, analise_perfil, conclusao_texto,
     linkedin=""
 ):
-    buffer = io.BytesIO()
-
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "Title",
-        parent=styles["Heading1"],
-        alignment=TA_CENTER,
-        fontSize=14,
-        spaceAfter=20,
-    )
-    header_style = ParagraphStyle(
-        "Header",
-        parent=styles["Normal"],
-        alignment=TA_CENTER,
-        fontSize=11,
-        textColor=colors.HexColor("#003366"),
-    )
-    section_title = ParagraphStyle(
-        "SecTitle",
-        parent=styles["Heading2"],
-        fontSize=12,
-        textColor=colors.HexColor("#003366"),
-        spaceBefore=12,
-        spaceAfter=4,
-    )
-    text_style = ParagraphStyle(
-        "Body",
-        parent=styles["Normal"],
-        fontSize=10.5,
-        alignment=TA_JUSTIFY,
-        leading=15,
-    )
-
-    def to_html(txt: str) -> str:
-        return txt.replace("\n", "<br/>")
-
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        topMargin=40,
-        bottomMargin=40,
-        leftMargin=50,
-        rightMargin=50,
-    )
-
-    content = []
-    content.append(Paragraph(f"<b>Cliente:</b> {cliente}", header_style))
-    content.append(Paragraph(f"<b>Cargo:</b> {cargo}", header_style))
-    content.append(Spacer(1, 20))
-    content.append(Paragraph("🧩 PARECER DE TRIAGEM – CANDIDATO", title_style))
-    content.append(Spacer(1, 12))
-
-    content.append(Paragraph(
-        f"<b>Nome:</b> {nome}<br/><b>Localidade:</b> {localidade}",
-        text_style
-    ))
-
-    linkedin_url = _normalizar_linkedin(linkedin)
-    if linkedin_url:
-        content.append(Paragraph(
-            f'<b>LinkedIn:</b> <link href="{linkedin_url}">{linkedin_url}</link>',
-            text_style
-        ))
-
-    content.append(Paragraph("🧾 <b>Resumo Profissional</b>", section_title))
-    content.append(Paragraph(to_html(resumo_profissional), text_style))
-
-    content.append(Paragraph("💡 <b>Análise de Perfil</b>", section_title))
-    content.append(Paragraph(to_html(analise_perfil), text_style))
-
-    content.append(Paragraph("➡️ <b>Conclusão</b>", section_title))
-    content.append(Paragraph(to_html(conclusao_texto), text_style))
+    # estilos e modelo de página ficam prontos em modules.renderizacao
+    return renderizar_parecer_pdf({
+        "cliente": cliente,
+        "cargo": cargo,
+        "nome": nome,
+        "localidade": localidade,
+        "idade": idade,
+        "pretensao": pretensao,
+        "resumo_profissional": resumo_profissional,
+        "analise_perfil": analise_perfil,
+        "conclusao_texto": conclusao_texto,
+        "linkedin": linkedin,
+    })
 
-    content.append(Paragraph("💰 <b>Informações de Remuneração</b>", section_title))
-    content.append(Paragraph(
-        f"Idade: {idade}<br/>Pretensão Salarial: {pretensao}",
-        text_style
-    ))
 
-    doc.build(content)
-    return buffer.getvalue()
+def build_pareceres_pdf_to_bytes(registros) -> list[bytes]:
+    """Lote: um PDF por parecer (dicts com os mesmos campos de build_parecer_pdf_to_bytes)."""
+    return renderizar_pareceres_pdf(registros)
 
 
 def build_parecer_docx_to_bytes(
@@ -253,50 +183,94 @@ def build_parecer_docx_to_bytes(
     resumo_profissional, analise_perfil, conclusao_texto,
     linkedin=""
 ):
-    doc = Document()
-
-    doc.add_heading("PARECER DE TRIAGEM – CANDIDATO", level=1)
-    doc.add_paragraph(f"Cliente: {cliente}")
-    doc.add_paragraph(f"Cargo: {cargo}")
-    doc.add_paragraph(f"Nome: {nome}")
-    doc.add_paragraph(f"Localidade: {localidade}")
-
-    linkedin_url = _normalizar_linkedin(linkedin)
-    if linkedin_url:
-        doc.add_paragraph(f"LinkedIn: {linkedin_url}")
-
-    doc.add_heading("Resumo Profissional", level=2)
-    for bloco in resumo_profissional.split("\n\n"):
-        doc.add_paragraph(bloco)
-
-    doc.add_heading("Análise de Perfil", level=2)
-    for bloco in analise_perfil.split("\n\n"):
-        doc.add_paragraph(bloco)
-
-    doc.add_heading("Conclusão", level=2)
-    for bloco in conclusao_texto.split("\n\n"):
-        doc.add_paragraph(bloco)
+    # modelo .docx (timbrado) carregado uma vez em modules.renderizacao
+    return renderizar_parecer_docx({
+        "cliente": cliente,
+        "cargo": cargo,
+        "nome": nome,
+        "localidade": localidade,
+        "idade": idade,
+        "pretensao": pretensao,
+        "resumo_profissional": resumo_profissional,
+        "analise_perfil": analise_perfil,
+        "conclusao_texto": conclusao_texto,
+        "linkedin": linkedin,
+    })
 
-    doc.add_heading("Informações de Remuneração", level=2)
-    doc.add_paragraph(f"Idade: {idade}")
-    doc.add_paragraph(f"Pretensão Salarial: {pretensao}")
 
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    return buffer.getvalue()
+def build_pareceres_docx_to_bytes(registros) -> list[bytes]:
+    """Lote: um DOCX por parecer (dicts com os mesmos campos de build_parecer_docx_to_bytes)."""
+    return renderizar_pareceres_docx(registros)
+
+
+class _SaidaContada:
+    """Destino só de escrita (ex.: resposta HTTP) com o tell() que o PdfWriter usa."""
+
+    def __init__(self, destino):
+        self.destino = destino
+        self.posicao = 0
+
+    def write(self, dados):
+        self.destino.write(dados)
+        self.posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self.posicao
+
+
+def _abrir_fonte_pdf(fonte, pilha: ExitStack) -> PdfReader:
+    if isinstance(fonte, (bytes, bytearray, memoryview)):
+        return PdfReader(io.BytesIO(fonte))
+    if isinstance(fonte, (str, os.PathLike)):
+        if not os.path.exists(fonte):
+            raise FileNotFoundError(f"Currículo não encontrado: {fonte}")
+        # arquivo aberto (e não o caminho): o PdfReader lê sob demanda em vez
+        # de copiar o arquivo inteiro para a memória
+        return PdfReader(pilha.enter_context(open(fonte, "rb")))
+    return PdfReader(fonte)
+
+
+def merge_pdfs(fontes, destino=None, ao_falhar=None):
+    """
+    Junta os PDFs de `fontes` (bytes, caminhos ou arquivos binários abertos), na
+    ordem, gravando numa única passada em `destino` (caminho, arquivo ou stream
+    de download). Sem destino, devolve os bytes. Fontes vazias são ignoradas.
+    Com ao_falhar(fonte, erro), uma fonte que não abre é pulada em vez de
+    interromper a junção.
+    """
+    writer = PdfWriter()
+    with ExitStack() as pilha:
+        for fonte in fontes:
+            if fonte is None or (isinstance(fonte, (bytes, str)) and not fonte):
+                continue
+            try:
+                reader = _abrir_fonte_pdf(fonte, pilha)
+                writer.append(reader)
+            except Exception as e:
+                if ao_falhar is None:
+                    raise
+                ao_falhar(fonte, e)
+
+        # as páginas só são lidas das fontes aqui, por isso elas ficam abertas até o fim
+        if destino is None:
+            out = io.BytesIO()
+            writer.write(out)
+            return out.getvalue()
+        if isinstance(destino, (str, os.PathLike)):
+            with open(destino, "wb") as f:
+                writer.write(f)
+        else:
+            try:
+                destino.tell()
+                writer.write(destino)
+            except (AttributeError, OSError):
+                writer.write(_SaidaContada(destino))
+    return None
 
 
 def merge_pdfs_bytes(parecer_bytes: bytes, resume_path: str) -> bytes:
-    if not os.path.exists(resume_path):
-        raise FileNotFoundError(f"Currículo não encontrado: {resume_path}")
-    merger = PdfMerger()
-    merger.append(io.BytesIO(parecer_bytes))
-    merger.append(resume_path)
-
-    out = io.BytesIO()
-    merger.write(out)
-    merger.close()
-    return out.getvalue()
+    return merge_pdfs([parecer_bytes, resume_path])
 
 
 # =========================
@@ -425,109 +399,61 @@ def inferir_nome_data_de_arquivo(caminho_pdf: str, nome_existente: str, data_hor
 # =========================
 # CLIENTES
 # =========================
+# Leitura e gravação passam por modules.armazenamento (CSV ou gac.db,
+# conforme a migração dos CSVs). tipado=True devolve ids, datas, valores e
+# status já convertidos (armazenamento.tipar), para consulta; para editar e
+# salvar use o DataFrame em texto (padrão).
 
-def carregar_clientes() -> pd.DataFrame:
-    colunas = [
-        "id_cliente",
-        "nome_cliente",
-        "razao_social",
-        "cnpj",
-        "cidade",
-        "contato_principal",
-        "telefone",
-        "email",
-        "observacoes",
-    ]
-    if not os.path.exists(LOG_CLIENTES):
-        return pd.DataFrame(columns=colunas)
-
-    df = pd.read_csv(LOG_CLIENTES, sep=";", encoding="utf-8", dtype=str).fillna("")
-    changed = False
-    for c in colunas:
-        if c not in df.columns:
-            df[c] = ""
-            changed = True
-    df = df[colunas]
-    if changed:
-        df.to_csv(LOG_CLIENTES, sep=";", index=False, encoding="utf-8")
-    return df
+def carregar_clientes(tipado: bool = False) -> pd.DataFrame:
+    return armazenamento.carregar("clientes", tipado=tipado)
 
 
 def registrar_cliente(nome_cliente, razao_social, cnpj, cidade, contato, telefone, email, observacoes):
-    df = carregar_clientes()
-    if df.empty:
-        novo_id = 1
-    else:
-        try:
-            novo_id = int(pd.to_numeric(df["id_cliente"], errors="coerce").max() or 0) + 1
-        except Exception:
-            novo_id = 1
-
-    existe = os.path.exists(LOG_CLIENTES)
-    with open(LOG_CLIENTES, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f, delimiter=";")
-        if not existe or df.empty:
-            w.writerow([
-                "id_cliente", "nome_cliente", "razao_social", "cnpj", "cidade",
-                "contato_principal", "telefone", "email", "observacoes"
-            ])
-        w.writerow([
-            novo_id, nome_cliente, razao_social, cnpj, cidade,
-            contato, telefone, email, observacoes
-        ])
-    return novo_id
+    return armazenamento.registrar(
+        "clientes",
+        {
+            "nome_cliente": nome_cliente,
+            "razao_social": razao_social,
+            "cnpj": cnpj,
+            "cidade": cidade,
+            "contato_principal": contato,
+            "telefone": telefone,
+            "email": email,
+            "observacoes": observacoes,
+        },
+    )
+
+
+def salvar_clientes(df: pd.DataFrame):
+    armazenamento.salvar("clientes", df)
 
 
 # =========================
 # CANDIDATOS
 # =========================
 
-def carregar_candidatos() -> pd.DataFrame:
-    colunas = [
-        "id_candidato",
-        "nome",
-        "idade",
-        "telefone",
-        "cidade",
-        "cargo_pretendido",
-        "data_cadastro",
-        "linkedin",
-        "cv_arquivo",
-    ]
-    if not os.path.exists(LOG_CAND):
-        return pd.DataFrame(columns=colunas)
-
-    df = pd.read_csv(LOG_CAND, sep=";", encoding="utf-8", dtype=str).fillna("")
-    for c in colunas:
-        if c not in df.columns:
-            df[c] = ""
-    df = df[colunas]
-    return df
+def carregar_candidatos(tipado: bool = False) -> pd.DataFrame:
+    return armazenamento.carregar("candidatos", tipado=tipado)
 
 
 def registrar_candidato(nome, idade, telefone, cidade, cargo_pretendido, data_cadastro):
-    df = carregar_candidatos()
-    if df.empty:
-        novo_id = 1
-    else:
-        try:
-            novo_id = int(pd.to_numeric(df["id_candidato"], errors="coerce").max() or 0) + 1
-        except Exception:
-            novo_id = 1
-
-    existe = os.path.exists(LOG_CAND)
-    with open(LOG_CAND, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f, delimiter=";")
-        if not existe or df.empty:
-            w.writerow([
-                "id_candidato", "nome", "idade", "telefone", "cidade",
-                "cargo_pretendido", "data_cadastro", "linkedin", "cv_arquivo"
-            ])
-        w.writerow([
-            novo_id, nome, idade, telefone, cidade,
-            cargo_pretendido, data_cadastro, "", ""
-        ])
-    return novo_id
+    return armazenamento.registrar(
+        "candidatos",
+        {
+            "nome": nome,
+            "idade": idade,
+            "telefone": telefone,
+            "cidade": cidade,
+            "cargo_pretendido": cargo_pretendido,
+            "data_cadastro": data_cadastro,
+            "linkedin": "",
+            "cv_arquivo": "",
+        },
+    )
+
+
+def atualizar_linkedin_candidato(id_candidato, linkedin):
+    return armazenamento.atualizar("candidatos", id_candidato, {"linkedin": linkedin})
 
 
 def get_or_create_candidato_por_nome_localidade(nome, localidade, idade, data_hora):
@@ -560,67 +486,47 @@ def get_or_create_candidato_por_nome_localidade(nome, localidade, idade, data_ho
 # VAGAS
 # =========================
 
-def carregar_vagas() -> pd.DataFrame:
-    colunas = [
-        "id_vaga",
-        "id_cliente",
-        "nome_cliente",
-        "cargo",
-        "modalidade",
-        "data_abertura",
-        "data_fechamento",
-        "status",
-        "descricao_vaga",
-    ]
-    if not os.path.exists(LOG_VAGAS):
-        return pd.DataFrame(columns=colunas)
-    df = pd.read_csv(LOG_VAGAS, sep=";", encoding="utf-8", dtype=str).fillna("")
-    for c in colunas:
-        if c not in df.columns:
-            df[c] = ""
-    df = df[colunas]
-    return df
+def carregar_vagas(tipado: bool = False) -> pd.DataFrame:
+    return armazenamento.carregar("vagas", tipado=tipado)
 
 
 def registrar_vaga(id_cliente, nome_cliente, cargo, modalidade, data_abertura,
                    data_fechamento, status, descricao_vaga):
-    df = carregar_vagas()
-    if df.empty:
-        novo_id = 1
-    else:
-        try:
-            novo_id = int(pd.to_numeric(df["id_vaga"], errors="coerce").max() or 0) + 1
-        except Exception:
-            novo_id = 1
-
-    existe = os.path.exists(LOG_VAGAS)
-    with open(LOG_VAGAS, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f, delimiter=";")
-        if not existe or df.empty:
-            w.writerow([
-                "id_vaga", "id_cliente", "nome_cliente", "cargo", "modalidade",
-                "data_abertura", "data_fechamento", "status", "descricao_vaga"
-            ])
-        w.writerow([
-            novo_id, id_cliente, nome_cliente, cargo, modalidade,
-            data_abertura, data_fechamento, status, descricao_vaga
-        ])
-    return novo_id
-
-
-def carregar_vaga_candidatos() -> pd.DataFrame:
-    colunas = ["id_vaga", "id_candidato", "data_vinculo", "observacao"]
-    if not os.path.exists(LOG_VAGA_CAND):
-        return pd.DataFrame(columns=colunas)
-    df = pd.read_csv(LOG_VAGA_CAND, sep=";", encoding="utf-8", dtype=str).fillna("")
-    for c in colunas:
-        if c not in df.columns:
-            df[c] = ""
-    return df[colunas]
+    return armazenamento.registrar(
+        "vagas",
+        {
+            "id_cliente": id_cliente,
+            "nome_cliente": nome_cliente,
+            "cargo": cargo,
+            "modalidade": modalidade,
+            "data_abertura": data_abertura,
+            "data_fechamento": data_fechamento,
+            "status": status,
+            "descricao_vaga": descricao_vaga,
+        },
+    )
+
+
+def carregar_vaga_candidatos(tipado: bool = False) -> pd.DataFrame:
+    # inclui as colunas de status do pipeline (antes eram descartadas na leitura)
+    return armazenamento.carregar("vaga_candidatos", tipado=tipado)
 
 
 def salvar_vaga_candidatos(df: pd.DataFrame):
-    df.to_csv(LOG_VAGA_CAND, sep=";", index=False, encoding="utf-8")
+    armazenamento.salvar("vaga_candidatos", df)
+
+
+def atualizar_status_vinculo(id_vaga, id_candidato, status_etapa, status_contratacao, motivo_decline):
+    """Atualiza só o status de um vínculo (no CSV, uma linha anexada ao log de alterações)."""
+    return armazenamento.atualizar(
+        "vaga_candidatos",
+        (str(id_vaga), str(id_candidato)),
+        {
+            "status_etapa": status_etapa,
+            "status_contratacao": status_contratacao,
+            "motivo_decline": motivo_decline,
+        },
+    )
 
 
 # =========================
@@ -646,225 +552,200 @@ def registrar_parecer_log(
     status_contratacao="Pendente",
     motivo_decline="",
 ):
-    existe = os.path.exists(LOG_PAR)
-    with open(LOG_PAR, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f, delimiter=";")
-        if not existe:
-            w.writerow([
-                "data_hora", "cliente", "cargo", "nome", "localidade",
-                "idade", "pretensao", "linkedin",
-                "resumo_profissional", "analise_perfil", "conclusao_texto",
-                "formato", "caminho_arquivo",
-                "id_candidato", "status_etapa", "status_contratacao", "motivo_decline"
-            ])
-        w.writerow([
-            data_hora, cliente, cargo, nome, localidade,
-            idade, pretensao, linkedin,
-            resumo_profissional, analise_perfil, conclusao_texto,
-            formato, caminho_arquivo,
-            id_candidato, status_etapa, status_contratacao, motivo_decline
-        ])
-
-
-def carregar_pareceres_log() -> pd.DataFrame:
-    colunas = [
-        "data_hora", "cliente", "cargo", "nome", "localidade",
-        "idade", "pretensao", "linkedin",
-        "resumo_profissional", "analise_perfil", "conclusao_texto",
-        "formato", "caminho_arquivo",
-        "id_candidato", "status_etapa", "status_contratacao", "motivo_decline"
-    ]
-    if not os.path.exists(LOG_PAR):
-        return pd.DataFrame(columns=colunas)
-    df = pd.read_csv(LOG_PAR, sep=";", encoding="utf-8", dtype=str).fillna("")
-    for c in colunas:
-        if c not in df.columns:
-            df[c] = ""
-    df = df[colunas]
-    return df
+    armazenamento.registrar(
+        "pareceres",
+        {
+            "data_hora": data_hora,
+            "cliente": cliente,
+            "cargo": cargo,
+            "nome": nome,
+            "localidade": localidade,
+            "idade": idade,
+            "pretensao": pretensao,
+            "linkedin": linkedin,
+            "resumo_profissional": resumo_profissional,
+            "analise_perfil": analise_perfil,
+            "conclusao_texto": conclusao_texto,
+            "formato": formato,
+            "caminho_arquivo": caminho_arquivo,
+            "id_candidato": id_candidato,
+            "status_etapa": status_etapa,
+            "status_contratacao": status_contratacao,
+            "motivo_decline": motivo_decline,
+        },
+    )
+
+
+def historico_em_csv() -> bool:
+    """True enquanto o histórico de pareceres ainda é o CSV (antes da migração)."""
+    return armazenamento.backend_atual().nome == "csv"
+
+
+def carregar_pareceres_log(colunas=None, tipado: bool = False) -> pd.DataFrame:
+    """
+    Histórico de pareceres. colunas=[...] carrega só essas colunas: sem
+    resumo_profissional/analise_perfil/conclusao_texto, os textos longos nem são
+    lidos (use carregar_textos_parecer ao abrir um parecer).
+    """
+    return armazenamento.carregar("pareceres", colunas, tipado=tipado)
+
+
+def carregar_textos_parecer(registro) -> dict:
+    """
+    resumo_profissional, analise_perfil e conclusao_texto de um parecer
+    (linha de carregar_pareceres_log com a coluna ref_texto).
+    """
+    textos = armazenamento.textos("pareceres", registro.get("ref_texto", ""))
+    # CSV ainda não atualizado (atualizar_formato_csv): os textos vieram na própria linha
+    return {c: v or str(registro.get(c, "") or "") for c, v in textos.items()}
+
+
+def importar_parecer_pdf(caminho: str):
+    """Lê um PDF de parecer, extrai campos e registra no histórico/candidatos."""
+    parsed = parse_parecer_pdf_arquivo(caminho)
+    nome = parsed["nome"]
+    cliente = parsed["cliente"]
+    cargo = parsed["cargo"]
+    localidade = parsed["localidade"]
+    idade = parsed["idade"]
+    pretensao = parsed["pretensao"]
+    linkedin = parsed["linkedin"]
+    resumo_prof = parsed["resumo_profissional"]
+    analise_prof = parsed["analise_perfil"]
+    conclusao_txt = parsed["conclusao_texto"]
+
+    data_hora = ""
+    nome, data_hora = inferir_nome_data_de_arquivo(caminho, nome, data_hora)
+
+    id_candidato = get_or_create_candidato_por_nome_localidade(
+        nome=nome,
+        localidade=localidade,
+        idade=idade,
+        data_hora=data_hora,
+    )
+
+    registrar_parecer_log(
+        data_hora=data_hora,
+        cliente=cliente,
+        cargo=cargo,
+        nome=nome,
+        localidade=localidade,
+        idade=idade,
+        pretensao=pretensao,
+        linkedin=linkedin,
+        resumo_profissional=resumo_prof,
+        analise_perfil=analise_prof,
+        conclusao_texto=conclusao_txt,
+        formato="PDF",
+        caminho_arquivo=caminho,
+        id_candidato=id_candidato,
+        status_etapa="Em avaliação",
+        status_contratacao="Pendente",
+        motivo_decline="",
+    )
 
 
 # =========================
 # ACESSOS (Sistemas)
 # =========================
 
-def carregar_acessos() -> pd.DataFrame:
-    colunas = [
-        "id_acesso",
-        "id_cliente",
-        "nome_cliente",
-        "id_candidato",
-        "nome_usuario",
-        "sistema",
-        "tipo_acesso",
-        "data_inicio",
-        "data_fim",
-        "status",
-        "observacoes",
-    ]
-    if not os.path.exists(LOG_ACESSOS):
-        return pd.DataFrame(columns=colunas)
-    df = pd.read_csv(LOG_ACESSOS, sep=";", encoding="utf-8", dtype=str).fillna("")
-    for c in colunas:
-        if c not in df.columns:
-            df[c] = ""
-    df = df[colunas]
-    return df
+def carregar_acessos(tipado: bool = False) -> pd.DataFrame:
+    return armazenamento.carregar("acessos", tipado=tipado)
 
 
 def registrar_acesso(id_cliente, nome_cliente, id_candidato, nome_usuario,
                      sistema, tipo_acesso, data_inicio, data_fim, status, observacoes):
-    df = carregar_acessos()
-    if df.empty:
-        novo_id = 1
-    else:
-        try:
-            novo_id = int(pd.to_numeric(df["id_acesso"], errors="coerce").max() or 0) + 1
-        except Exception:
-            novo_id = 1
-
-    existe = os.path.exists(LOG_ACESSOS)
-    with open(LOG_ACESSOS, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f, delimiter=";")
-        if not existe or df.empty:
-            w.writerow([
-                "id_acesso", "id_cliente", "nome_cliente", "id_candidato",
-                "nome_usuario", "sistema", "tipo_acesso",
-                "data_inicio", "data_fim", "status", "observacoes"
-            ])
-        w.writerow([
-            novo_id, id_cliente, nome_cliente, id_candidato,
-            nome_usuario, sistema, tipo_acesso,
-            data_inicio, data_fim, status, observacoes
-        ])
-    return novo_id
+    return armazenamento.registrar(
+        "acessos",
+        {
+            "id_cliente": id_cliente,
+            "nome_cliente": nome_cliente,
+            "id_candidato": id_candidato,
+            "nome_usuario": nome_usuario,
+            "sistema": sistema,
+            "tipo_acesso": tipo_acesso,
+            "data_inicio": data_inicio,
+            "data_fim": data_fim,
+            "status": status,
+            "observacoes": observacoes,
+        },
+    )
 
 
 # =========================
 # FINANCEIRO
 # =========================
 
-def carregar_fin_os() -> pd.DataFrame:
-    colunas = [
-        "id_os", "id_cliente", "nome_cliente",
-        "descricao", "tipo_servico", "data_emissao",
-        "data_execucao", "valor", "status", "observacoes"
-    ]
-    if not os.path.exists(LOG_FIN_OS):
-        return pd.DataFrame(columns=colunas)
-    df = pd.read_csv(LOG_FIN_OS, sep=";", encoding="utf-8", dtype=str).fillna("")
-    for c in colunas:
-        if c not in df.columns:
-            df[c] = ""
-    return df[colunas]
+def carregar_fin_os(tipado: bool = False) -> pd.DataFrame:
+    return armazenamento.carregar("fin_os", tipado=tipado)
 
 
 def registrar_fin_os(id_cliente, nome_cliente, descricao, tipo_servico,
                      data_emissao, data_execucao, valor, status, observacoes):
-    df = carregar_fin_os()
-    if df.empty:
-        novo_id = 1
-    else:
-        try:
-            novo_id = int(pd.to_numeric(df["id_os"], errors="coerce").max() or 0) + 1
-        except Exception:
-            novo_id = 1
-    existe = os.path.exists(LOG_FIN_OS)
-    with open(LOG_FIN_OS, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f, delimiter=";")
-        if not existe or df.empty:
-            w.writerow([
-                "id_os", "id_cliente", "nome_cliente",
-                "descricao", "tipo_servico", "data_emissao",
-                "data_execucao", "valor", "status", "observacoes"
-            ])
-        w.writerow([
-            novo_id, id_cliente, nome_cliente,
-            descricao, tipo_servico, data_emissao,
-            data_execucao, valor, status, observacoes
-        ])
-    return novo_id
-
-
-def carregar_fin_orc() -> pd.DataFrame:
-    colunas = [
-        "id_orc", "id_cliente", "nome_cliente",
-        "descricao", "data_emissao", "validade",
-        "valor", "status", "observacoes"
-    ]
-    if not os.path.exists(LOG_FIN_ORC):
-        return pd.DataFrame(columns=colunas)
-    df = pd.read_csv(LOG_FIN_ORC, sep=";", encoding="utf-8", dtype=str).fillna("")
-    for c in colunas:
-        if c not in df.columns:
-            df[c] = ""
-    return df[colunas]
+    return armazenamento.registrar(
+        "fin_os",
+        {
+            "id_cliente": id_cliente,
+            "nome_cliente": nome_cliente,
+            "descricao": descricao,
+            "tipo_servico": tipo_servico,
+            "data_emissao": data_emissao,
+            "data_execucao": data_execucao,
+            "valor": valor,
+            "status": status,
+            "observacoes": observacoes,
+        },
+    )
+
+
+def salvar_fin_os(df: pd.DataFrame):
+    armazenamento.salvar("fin_os", df)
+
+
+def carregar_fin_orc(tipado: bool = False) -> pd.DataFrame:
+    return armazenamento.carregar("fin_orc", tipado=tipado)
 
 
 def registrar_fin_orc(id_cliente, nome_cliente, descricao, data_emissao,
                       validade, valor, status, observacoes):
-    df = carregar_fin_orc()
-    if df.empty:
-        novo_id = 1
-    else:
-        try:
-            novo_id = int(pd.to_numeric(df["id_orc"], errors="coerce").max() or 0) + 1
-        except Exception:
-            novo_id = 1
-    existe = os.path.exists(LOG_FIN_ORC)
-    with open(LOG_FIN_ORC, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f, delimiter=";")
-        if not existe or df.empty:
-            w.writerow([
-                "id_orc", "id_cliente", "nome_cliente",
-                "descricao", "data_emissao", "validade",
-                "valor", "status", "observacoes"
-            ])
-        w.writerow([
-            novo_id, id_cliente, nome_cliente,
-            descricao, data_emissao, validade,
-            valor, status, observacoes
-        ])
-    return novo_id
-
-
-def carregar_fin_nf() -> pd.DataFrame:
-    colunas = [
-        "id_nf", "id_cliente", "nome_cliente",
-        "numero_nf", "data_emissao",
-        "valor", "descricao", "observacoes"
-    ]
-    if not os.path.exists(LOG_FIN_NF):
-        return pd.DataFrame(columns=colunas)
-    df = pd.read_csv(LOG_FIN_NF, sep=";", encoding="utf-8", dtype=str).fillna("")
-    for c in colunas:
-        if c not in df.columns:
-            df[c] = ""
-    return df[colunas]
+    return armazenamento.registrar(
+        "fin_orc",
+        {
+            "id_cliente": id_cliente,
+            "nome_cliente": nome_cliente,
+            "descricao": descricao,
+            "data_emissao": data_emissao,
+            "validade": validade,
+            "valor": valor,
+            "status": status,
+            "observacoes": observacoes,
+        },
+    )
+
+
+def salvar_fin_orc(df: pd.DataFrame):
+    armazenamento.salvar("fin_orc", df)
+
+
+def carregar_fin_nf(tipado: bool = False) -> pd.DataFrame:
+    return armazenamento.carregar("fin_nf", tipado=tipado)
 
 
 def registrar_fin_nf(id_cliente, nome_cliente, numero_nf, data_emissao,
                      valor, descricao, observacoes):
-    df = carregar_fin_nf()
-    if df.empty:
-        novo_id = 1
-    else:
-        try:
-            novo_id = int(pd.to_numeric(df["id_nf"], errors="coerce").max() or 0) + 1
-        except Exception:
-            novo_id = 1
-    existe = os.path.exists(LOG_FIN_NF)
-    with open(LOG_FIN_NF, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f, delimiter=";")
-        if not existe or df.empty:
-            w.writerow([
-                "id_nf", "id_cliente", "nome_cliente",
-                "numero_nf", "data_emissao",
-                "valor", "descricao", "observacoes"
-            ])
-        w.writerow([
-            novo_id, id_cliente, nome_cliente,
-            numero_nf, data_emissao,
-            valor, descricao, observacoes
-        ])
-    return novo_id
\ No newline at end of file
+    return armazenamento.registrar(
+        "fin_nf",
+        {
+            "id_cliente": id_cliente,
+            "nome_cliente": nome_cliente,
+            "numero_nf": numero_nf,
+            "data_emissao": data_emissao,
+            "valor": valor,
+            "descricao": descricao,
+            "observacoes": observacoes,
+        },
+    )
+
+
+def salvar_fin_nf(df: pd.DataFrame):
+    armazenamento.salvar("fin_nf", df)
@@ -41,10 +41,10 @@ def card_metric(label: str, value, subtitle: str = "", color: str = "#1f6feb"):
 def run():
     st.header("📊 Dashboard Geral - GAC")
 
-    # Carregar dados
-    df_cli = carregar_clientes()
-    df_cand = carregar_candidatos()
-    df_vagas = carregar_vagas()
+    # Carregar dados (tipados: ids numéricos, datas, status/cliente categóricos)
+    df_cli = carregar_clientes(tipado=True)
+    df_cand = carregar_candidatos(tipado=True)
+    df_vagas = carregar_vagas(tipado=True)
 
     # =========================================================
     # CARDS SUPERIORES
@@ -110,7 +110,7 @@ def run():
                 st.info("Nenhuma vaga aberta no momento.")
             else:
                 por_cliente = (
-                    df_abertas.groupby("nome_cliente")["id_vaga"]
+                    df_abertas.groupby("nome_cliente", observed=True)["id_vaga"]
                     .count()
                     .sort_values(ascending=False)
                     .head(10)
@@ -181,25 +181,10 @@ def run():
         if df_cand.empty:
             st.info("Nenhum candidato cadastrado.")
         else:
-            df_cand_view = df_cand.copy()
-
-            # tenta ordenar por data_cadastro, se existir
-            if "data_cadastro" in df_cand_view.columns:
-                try:
-                    df_cand_view["data_cadastro_ord"] = pd.to_datetime(
-                        df_cand_view["data_cadastro"], errors="coerce"
-                    )
-                    df_cand_view = df_cand_view.sort_values(
-                        "data_cadastro_ord", ascending=False
-                    )
-                except Exception:
-                    df_cand_view = df_cand_view.sort_values(
-                        "id_candidato", ascending=False
-                    )
-            else:
-                df_cand_view = df_cand_view.sort_values(
-                    "id_candidato", ascending=False
-                )
+            # data_cadastro já vem como data (sem data vão para o fim)
+            df_cand_view = df_cand.sort_values(
+                ["data_cadastro", "id_candidato"], ascending=False, na_position="last"
+            )
 
             cols_cand = [
                 "id_candidato",
@@ -1,23 +1,465 @@
 # modules/database.py
 import os
+import atexit
+import queue
+import random
+import re
 import sqlite3
 import hashlib
+import html
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
 
+import pandas as pd
+
 # Caminho do banco: na raiz do projeto (um nível acima de /modules)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "..", "gac.db")
 
+# Ajustes aplicados em toda conexão aberta pelo sistema.
+# WAL permite leituras simultâneas a uma escrita; synchronous=NORMAL é seguro em WAL
+# e evita um fsync por commit; cache_size negativo = tamanho em KiB.
+PRAGMAS_CONEXAO = (
+    "PRAGMA journal_mode = WAL;",
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA foreign_keys = ON;",
+    "PRAGMA cache_size = -16000;",
+    "PRAGMA mmap_size = 268435456;",
+    "PRAGMA temp_store = MEMORY;",
+    "PRAGMA busy_timeout = 5000;",
+)
+
+# Conexão persistente por thread, vinda de um pool limitado por banco.
+# O Streamlit roda quase todo rerun numa thread nova (ScriptRunner), então a
+# conexão não pode morrer com a thread: quando a dona termina, a conexão volta
+# para o pool e é entregue à próxima thread que pedir. Acima de
+# MAX_CONEXOES_LIVRES ociosas por banco, as sobras são fechadas na hora.
+MAX_CONEXOES_LIVRES = 8
+
+_LOCAL = threading.local()
+_LOCK_POOL = threading.Lock()
+_EM_USO: dict[tuple[int, str], tuple[threading.Thread, sqlite3.Connection]] = {}
+_LIVRES: dict[str, list[sqlite3.Connection]] = {}
+_STATS_POOL = {"abertas": 0, "reaproveitadas": 0, "fechadas": 0}
+
+logger = logging.getLogger(__name__)
+
+
+def _abrir_conexao(caminho: str, compartilhada: bool = False) -> sqlite3.Connection:
+    # compartilhada: passa de uma thread (já encerrada) para outra pelo pool
+    conn = sqlite3.connect(caminho, timeout=5, check_same_thread=not compartilhada)
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS_CONEXAO:
+        conn.execute(pragma)
+    return conn
+
 
 def get_conn():
     """
-    Abre conexão com o banco SQLite.
+    Abre uma conexão NOVA com o banco SQLite, já configurada.
+    Quem chama é responsável por fechar. Para uso interno, prefira conexao().
     """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    return _abrir_conexao(DB_PATH)
+
+
+def _fechar(conn: sqlite3.Connection):
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+    _STATS_POOL["fechadas"] += 1
+
+
+def _devolver(caminho: str, conn: sqlite3.Connection):
+    """Conexão sem dona volta para o pool (ou é fechada, se o pool estiver cheio). Com _LOCK_POOL."""
+    livres = _LIVRES.setdefault(caminho, [])
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        _fechar(conn)
+        return
+    if len(livres) < MAX_CONEXOES_LIVRES:
+        livres.append(conn)
+    else:
+        _fechar(conn)
+
+
+def _recolher_orfas():
+    """Devolve ao pool as conexões de threads que já terminaram. Com _LOCK_POOL."""
+    for chave, (thread, conn) in list(_EM_USO.items()):
+        if not thread.is_alive():
+            del _EM_USO[chave]
+            _devolver(chave[1], conn)
+
+
+def conexao() -> sqlite3.Connection:
+    """
+    Retorna a conexão persistente da thread atual (tirada do pool na primeira
+    chamada). NÃO feche esta conexão: ela é reaproveitada por todos os helpers
+    do módulo e, quando a thread terminar, por outra thread.
+    """
+    caminho = os.path.abspath(DB_PATH)
+    conns = getattr(_LOCAL, "conns", None)
+    if conns is None:
+        conns = _LOCAL.conns = {}
+    conn = conns.get(caminho)
+    if conn is None:
+        with _LOCK_POOL:
+            _recolher_orfas()
+            livres = _LIVRES.get(caminho)
+            if livres:
+                conn = livres.pop()
+                _STATS_POOL["reaproveitadas"] += 1
+            else:
+                conn = _abrir_conexao(caminho, compartilhada=True)
+                _STATS_POOL["abertas"] += 1
+            _EM_USO[(threading.get_ident(), caminho)] = (threading.current_thread(), conn)
+        conns[caminho] = conn
     return conn
 
 
+def liberar_conexao():
+    """Devolve ao pool as conexões da thread atual (ex.: ao fim de uma thread de trabalho)."""
+    conns = getattr(_LOCAL, "conns", None) or {}
+    with _LOCK_POOL:
+        for caminho, conn in conns.items():
+            _EM_USO.pop((threading.get_ident(), caminho), None)
+            _devolver(caminho, conn)
+    conns.clear()
+
+
+def fechar_conexoes():
+    """Fecha as conexões ociosas do pool e as de threads encerradas (ex.: ao sair)."""
+    with _LOCK_POOL:
+        _recolher_orfas()
+        for livres in _LIVRES.values():
+            for conn in livres:
+                _fechar(conn)
+            livres.clear()
+
+
+def estatisticas_conexoes() -> dict:
+    """Conexões abertas, reaproveitadas do pool e fechadas; em uso e ociosas agora."""
+    with _LOCK_POOL:
+        return {
+            **_STATS_POOL,
+            "em_uso": len(_EM_USO),
+            "livres": sum(len(v) for v in _LIVRES.values()),
+        }
+
+
+atexit.register(fechar_conexoes)
+
+
+@contextmanager
+def transacao(imediata: bool = False):
+    """
+    Executa um bloco de escrita na conexão da thread: commit no fim,
+    rollback se der erro.
+    imediata=True abre com BEGIN IMMEDIATE (reserva o lock de escrita já no início).
+
+    Dentro da thread escritora (ver fila de escrita abaixo) a transação já está
+    aberta pelo lote: aqui só se entrega a conexão, e o commit é do lote.
+    """
+    global _ESCRITAS
+    conn = conexao()
+    if getattr(_LOCAL, "escritor", False):
+        yield conn
+        return
+    if imediata:
+        conn.execute("BEGIN IMMEDIATE;")
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        # qualquer escrita (mesmo desfeita) invalida o cache de leitura
+        _ESCRITAS += 1
+
+
+# =========================================================
+# FILA DE ESCRITA (um único escritor por processo)
+# =========================================================
+
+# Todas as funções marcadas com @escrita rodam numa thread dedicada, que junta
+# o que estiver na fila em um único commit (group commit). Cada item roda em um
+# SAVEPOINT próprio: se um falhar, só ele é desfeito e os demais seguem.
+# Com um escritor só, as sessões do Streamlit não disputam o lock do SQLite entre
+# si; "database is locked" vindo de outro processo é tentado de novo com backoff.
+MAX_ITENS_LOTE = 200
+JANELA_LOTE_S = 0.002
+TENTATIVAS_LOCK = 6
+ESPERA_BASE_LOCK_S = 0.05
+
+_FILA_ESCRITA: queue.Queue = queue.Queue()
+_ESCRITOR = None
+_LOCK_ESCRITOR = threading.Lock()
+_STATS_ESCRITA = {"lotes": 0, "itens": 0, "falhas": 0, "retentativas": 0}
+
+
+def _lock_ocupado(erro: Exception) -> bool:
+    msg = str(erro).lower()
+    return "locked" in msg or "busy" in msg
+
+
+def _com_retentativa(acao):
+    """Executa acao(); se o banco estiver travado por outro processo, espera e tenta de novo."""
+    for tentativa in range(TENTATIVAS_LOCK):
+        try:
+            return acao()
+        except sqlite3.OperationalError as e:
+            if not _lock_ocupado(e) or tentativa == TENTATIVAS_LOCK - 1:
+                raise
+            _STATS_ESCRITA["retentativas"] += 1
+            time.sleep(ESPERA_BASE_LOCK_S * (2 ** tentativa) * (1 + random.random()))
+
+
+def _falhar_pendentes(lote: list, erro: BaseException):
+    """Entrega erro a todo Future do lote que ainda não tem resultado."""
+    for futuro, *_ in lote:
+        if not futuro.done():
+            if futuro.running() or futuro.set_running_or_notify_cancel():
+                futuro.set_exception(erro)
+
+
+def _processar_lote(lote: list):
+    global _ESCRITAS
+    conn = conexao()
+    _com_retentativa(lambda: conn.execute("BEGIN IMMEDIATE;"))
+
+    concluidos = []
+    try:
+        for futuro, func, args, kwargs in lote:
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            conn.execute("SAVEPOINT item_lote;")
+            try:
+                resultado = func(*args, **kwargs)
+            except BaseException as e:
+                conn.execute("ROLLBACK TO item_lote;")
+                conn.execute("RELEASE item_lote;")
+                _STATS_ESCRITA["falhas"] += 1
+                futuro.set_exception(e)
+            else:
+                conn.execute("RELEASE item_lote;")
+                concluidos.append((futuro, resultado))
+        _com_retentativa(conn.commit)
+    except BaseException as e:
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            pass
+        # o lote inteiro foi desfeito: falham os já executados, o que estava
+        # rodando e os que nem chegaram a rodar
+        _falhar_pendentes(lote, e)
+        return
+    finally:
+        _ESCRITAS += 1
+
+    _STATS_ESCRITA["lotes"] += 1
+    _STATS_ESCRITA["itens"] += len(concluidos)
+    # só depois do commit: quem espera o resultado já enxerga o dado gravado
+    for futuro, resultado in concluidos:
+        futuro.set_result(resultado)
+
+
+def _laco_escritor():
+    _LOCAL.escritor = True
+    while True:
+        lote = [_FILA_ESCRITA.get()]
+        limite = time.perf_counter() + JANELA_LOTE_S
+        while len(lote) < MAX_ITENS_LOTE:
+            restante = limite - time.perf_counter()
+            try:
+                lote.append(_FILA_ESCRITA.get(timeout=restante) if restante > 0 else _FILA_ESCRITA.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            _processar_lote(lote)
+        except BaseException as e:
+            # ex.: BEGIN falhou mesmo após as retentativas
+            _falhar_pendentes(lote, e)
+
+
+def enfileirar_escrita(func, *args, **kwargs) -> Future:
+    """
+    Agenda func(*args, **kwargs) na thread escritora e devolve um Future
+    com o retorno (ou a exceção) depois do commit.
+    """
+    global _ESCRITOR
+    if _ESCRITOR is None or not _ESCRITOR.is_alive():
+        with _LOCK_ESCRITOR:
+            if _ESCRITOR is None or not _ESCRITOR.is_alive():
+                _ESCRITOR = threading.Thread(target=_laco_escritor, name="gac-escritor-db", daemon=True)
+                _ESCRITOR.start()
+    futuro = Future()
+    _FILA_ESCRITA.put((futuro, func, args, kwargs))
+    return futuro
+
+
+def escrita(func):
+    """
+    Decorador dos helpers de escrita: a chamada vai para a fila de escrita e
+    espera o commit do lote. func.assincrono(...) devolve o Future sem esperar.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if getattr(_LOCAL, "escritor", False):
+            # chamada aninhada, já dentro do escritor
+            return func(*args, **kwargs)
+        return enfileirar_escrita(func, *args, **kwargs).result()
+
+    wrapper.assincrono = lambda *args, **kwargs: enfileirar_escrita(func, *args, **kwargs)
+    return wrapper
+
+
+def estatisticas_escrita() -> dict:
+    """Lotes gravados, itens, falhas, retentativas por lock e tamanho atual da fila."""
+    stats = dict(_STATS_ESCRITA)
+    stats["na_fila"] = _FILA_ESCRITA.qsize()
+    stats["itens_por_lote"] = stats["itens"] / stats["lotes"] if stats["lotes"] else 0.0
+    return stats
+
+
+def _inserir_em_lote(conn: sqlite3.Connection, tabela: str, campos: tuple, linhas: list) -> list[int]:
+    """
+    INSERT com executemany dentro de uma transação já aberta com BEGIN IMMEDIATE.
+    Com o lock de escrita reservado, o AUTOINCREMENT gera ids contíguos,
+    então os ids de cada linha (na ordem recebida) são calculados a partir do último.
+    """
+    if not linhas:
+        return []
+    row = conn.execute(
+        f"SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0), "
+        f"COALESCE((SELECT MAX(rowid) FROM {tabela}), 0)) AS base;",
+        (tabela,),
+    ).fetchone()
+    base = int(row["base"] or 0)
+
+    marcadores = ", ".join("?" for _ in campos)
+    conn.executemany(
+        f"INSERT INTO {tabela} ({', '.join(campos)}) VALUES ({marcadores});",
+        linhas,
+    )
+
+    ultimo = conn.execute(f"SELECT MAX(rowid) FROM {tabela};").fetchone()[0]
+    if ultimo != base + len(linhas):
+        raise RuntimeError(f"Ids não contíguos ao inserir em lote na tabela {tabela}.")
+    return list(range(base + 1, base + len(linhas) + 1))
+
+
+# =========================================================
+# CACHE DE LEITURA
+# =========================================================
+
+# Resultados de listar_* guardados em memória (LRU), compartilhados entre as
+# sessões do processo. Valem enquanto o banco não mudar:
+#   - _ESCRITAS é incrementado por transacao() (todo helper de escrita passa por ela);
+#   - PRAGMA data_version de uma conexão "sentinela" muda a cada commit feito por
+#     qualquer outra conexão, inclusive de outro processo (ex.: scripts de importação).
+CACHE_MAX_ITENS = 256
+
+_ESCRITAS = 0
+_CACHE: OrderedDict = OrderedDict()
+_CACHE_VERSAO = None
+_CACHE_STATS = {"hits": 0, "misses": 0, "invalidacoes": 0}
+_LOCK_CACHE = threading.Lock()
+_SENTINELAS: dict[str, sqlite3.Connection] = {}
+
+
+def _versao_dados(caminho: str) -> tuple:
+    # chamado com _LOCK_CACHE já adquirido
+    sentinela = _SENTINELAS.get(caminho)
+    if sentinela is None:
+        sentinela = _SENTINELAS[caminho] = sqlite3.connect(caminho, check_same_thread=False)
+    return (caminho, sentinela.execute("PRAGMA data_version;").fetchone()[0], _ESCRITAS)
+
+
+def _copiar(valor):
+    # quem chama pode alterar o resultado; o cache guarda a sua própria cópia
+    if isinstance(valor, pd.DataFrame):
+        return valor.copy()
+    if isinstance(valor, list):
+        return [dict(v) if isinstance(v, dict) else v for v in valor]
+    if isinstance(valor, dict):
+        return {k: _copiar(v) for k, v in valor.items()}
+    return valor
+
+
+def cache_leitura(func):
+    """
+    Decorador para funções de leitura: guarda o resultado por (função, argumentos)
+    até a próxima mudança no banco.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _CACHE_VERSAO
+        chave = (func.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(chave)
+        except TypeError:
+            # argumento não-hashable (ex.: lista de status): consulta direto
+            return func(*args, **kwargs)
+
+        if getattr(_LOCAL, "escritor", False):
+            # no escritor a conexão enxerga o lote ainda sem commit: não usa o cache
+            return func(*args, **kwargs)
+
+        caminho = os.path.abspath(DB_PATH)
+        with _LOCK_CACHE:
+            versao = _versao_dados(caminho)
+            if versao != _CACHE_VERSAO:
+                if _CACHE:
+                    _CACHE_STATS["invalidacoes"] += 1
+                _CACHE.clear()
+                _CACHE_VERSAO = versao
+            if chave in _CACHE:
+                _CACHE.move_to_end(chave)
+                _CACHE_STATS["hits"] += 1
+                return _copiar(_CACHE[chave])
+            _CACHE_STATS["misses"] += 1
+
+        valor = func(*args, **kwargs)
+
+        with _LOCK_CACHE:
+            # só guarda se nada mudou enquanto a consulta rodava
+            if _versao_dados(caminho) == versao == _CACHE_VERSAO:
+                _CACHE[chave] = _copiar(valor)
+                while len(_CACHE) > CACHE_MAX_ITENS:
+                    _CACHE.popitem(last=False)
+        return valor
+
+    return wrapper
+
+
+def estatisticas_cache() -> dict:
+    """Hits, misses, invalidações e itens atuais do cache de leitura."""
+    with _LOCK_CACHE:
+        stats = dict(_CACHE_STATS)
+        stats["itens"] = len(_CACHE)
+    consultas = stats["hits"] + stats["misses"]
+    stats["taxa_acerto"] = stats["hits"] / consultas if consultas else 0.0
+    return stats
+
+
+def limpar_cache():
+    global _CACHE_VERSAO
+    with _LOCK_CACHE:
+        _CACHE.clear()
+        _CACHE_VERSAO = None
+
+
 def hash_password(senha: str) -> str:
     """
     Gera hash SHA256 para armazenar senha.
@@ -25,18 +467,91 @@ def hash_password(senha: str) -> str:
     return hashlib.sha256(senha.encode("utf-8")).hexdigest()
 
 
+# Bancos (caminho absoluto) já inicializados neste processo e o relatório de cada um.
+_INICIALIZADOS: set[str] = set()
+_RELATORIOS_INICIALIZACAO: dict[str, dict] = {}
+_LOCK_INIT = threading.Lock()
+
+
 def init_db():
+    """
+    Garante o schema do banco uma única vez por processo (e por arquivo de banco).
+    Nas chamadas seguintes (ex.: cada rerun do Streamlit) só confere um set em memória.
+
+    Na primeira chamada lê a versão gravada em schema_version: se o banco já está
+    na última versão, não executa nenhum DDL. Caso contrário cria as tabelas base,
+    o usuário inicial e aplica as migrações pendentes.
+    O tempo de cada etapa fica em relatorio_inicializacao().
+    """
+    caminho = os.path.abspath(DB_PATH)
+    if caminho in _INICIALIZADOS:
+        return
+
+    with _LOCK_INIT:
+        if caminho in _INICIALIZADOS:
+            return
+
+        etapas = []
+        t_inicio = t0 = time.perf_counter()
+
+        def marcar(nome):
+            nonlocal t0
+            agora = time.perf_counter()
+            etapas.append((nome, (agora - t0) * 1000))
+            t0 = agora
+
+        conn = conexao()
+        marcar("conexão")
+        versao_antes = versao_schema(conn)
+        marcar("leitura da versão")
+
+        migracoes = []
+        atualizado = versao_antes >= MIGRACOES[-1][0]
+        if not atualizado:
+            _criar_schema_base(conn)
+            marcar("tabelas base")
+            migracoes = aplicar_migracoes()
+            marcar("migrações")
+
+        relatorio = {
+            "banco": caminho,
+            "versao_antes": versao_antes,
+            "versao_depois": versao_schema(conn),
+            "ja_atualizado": atualizado,
+            "migracoes": [m["versao"] for m in migracoes],
+            "etapas": etapas,
+            "total_ms": (time.perf_counter() - t_inicio) * 1000,
+        }
+        _RELATORIOS_INICIALIZACAO[caminho] = relatorio
+        _INICIALIZADOS.add(caminho)
+
+    logger.info(
+        "init_db %s: schema v%s -> v%s em %.1f ms (%s)",
+        caminho,
+        relatorio["versao_antes"],
+        relatorio["versao_depois"],
+        relatorio["total_ms"],
+        ", ".join(f"{nome} {ms:.1f} ms" for nome, ms in etapas),
+    )
+
+
+def relatorio_inicializacao() -> dict | None:
+    """
+    Tempos da inicialização do banco atual (etapas em ms, versões antes/depois).
+    None se init_db() ainda não rodou neste processo.
+    """
+    return _RELATORIOS_INICIALIZACAO.get(os.path.abspath(DB_PATH))
+
+
+def _criar_schema_base(conn: sqlite3.Connection):
     """
     Cria as tabelas principais, se não existirem.
     Também garante a existência do usuário inicial 'rikardo'.
     """
-    conn = get_conn()
     cur = conn.cursor()
 
     cur.executescript(
         """
-        PRAGMA foreign_keys = ON;
-
         CREATE TABLE IF NOT EXISTS clientes (
             id_cliente      INTEGER PRIMARY KEY AUTOINCREMENT,
             nome_cliente    TEXT NOT NULL,
@@ -170,9 +685,374 @@ def init_db():
             conn.commit()
     except Exception:
         # Se der qualquer erro nessa checagem, não queremos travar o app
-        pass
+        conn.rollback()
+
+
+# =========================================================
+# MIGRAÇÕES DE SCHEMA
+# =========================================================
+
+# Passos ordenados: (versão, descrição, comandos SQL, consultas de referência).
+# As consultas de referência têm o plano (EXPLAIN QUERY PLAN) registrado antes e
+# depois do passo, para mostrar o efeito de cada migração.
+# Nunca altere um passo já publicado: crie um novo com a próxima versão.
+MIGRACOES = [
+    (
+        1,
+        "Índices secundários de vínculos, pareceres, vagas, acessos e usuários",
+        [
+            "CREATE INDEX IF NOT EXISTS idx_vaga_candidato_candidato ON vaga_candidato (id_candidato);",
+            "CREATE INDEX IF NOT EXISTS idx_pareceres_candidato_vaga ON pareceres (id_candidato, id_vaga);",
+            "CREATE INDEX IF NOT EXISTS idx_pareceres_caminho ON pareceres (caminho_arquivo);",
+            "CREATE INDEX IF NOT EXISTS idx_vagas_cliente_cargo ON vagas (id_cliente, cargo);",
+            "CREATE INDEX IF NOT EXISTS idx_acessos_data_fim ON acessos (data_fim);",
+            "CREATE INDEX IF NOT EXISTS idx_usuarios_ativo ON usuarios (ativo);",
+            "ANALYZE;",
+        ],
+        [
+            ("SELECT * FROM vaga_candidato WHERE id_candidato = ?;", (0,)),
+            ("SELECT * FROM pareceres WHERE id_candidato = ? AND id_vaga = ?;", (0, 0)),
+            ("SELECT * FROM pareceres WHERE caminho_arquivo = ?;", ("",)),
+            ("SELECT id_vaga FROM vagas WHERE cargo = ? AND id_cliente = ?;", ("", 0)),
+            ("SELECT * FROM acessos WHERE data_fim < ?;", ("",)),
+            ("SELECT * FROM usuarios WHERE ativo = 1;", ()),
+        ],
+    ),
+    (
+        2,
+        "Índices das listagens paginadas (nome, status, data)",
+        [
+            "CREATE INDEX IF NOT EXISTS idx_candidatos_nome ON candidatos (nome COLLATE NOCASE);",
+            "CREATE INDEX IF NOT EXISTS idx_vagas_status ON vagas (status);",
+            "CREATE INDEX IF NOT EXISTS idx_pareceres_data_hora ON pareceres (data_hora);",
+            "CREATE INDEX IF NOT EXISTS idx_acessos_cliente ON acessos (id_cliente);",
+            "ANALYZE;",
+        ],
+        [
+            (
+                "SELECT * FROM candidatos WHERE nome LIKE ? ESCAPE '\\' "
+                "ORDER BY nome COLLATE NOCASE, id_candidato LIMIT 50;",
+                ("a%",),
+            ),
+            ("SELECT * FROM vagas WHERE status = ?;", ("",)),
+            ("SELECT * FROM pareceres ORDER BY data_hora DESC, id_parecer DESC LIMIT 50;", ()),
+            ("SELECT * FROM acessos WHERE id_cliente = ?;", (0,)),
+        ],
+    ),
+    (
+        3,
+        "Busca textual FTS5 (pareceres, candidatos, vagas) mantida por triggers",
+        [
+            # rowid = id * 4 + origem (1 parecer, 2 candidato, 3 vaga): as triggers
+            # acham a linha pelo rowid, sem varrer o índice.
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS busca_texto USING fts5(
+                titulo, texto,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            );
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_pareceres_busca_ins AFTER INSERT ON pareceres BEGIN
+                INSERT INTO busca_texto (rowid, titulo, texto) VALUES (
+                    new.id_parecer * 4 + 1,
+                    IFNULL(new.nome_candidato, ''),
+                    IFNULL(new.resumo_profissional, '') || char(10) ||
+                    IFNULL(new.analise_perfil, '') || char(10) ||
+                    IFNULL(new.conclusao_texto, '')
+                );
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_pareceres_busca_del AFTER DELETE ON pareceres BEGIN
+                DELETE FROM busca_texto WHERE rowid = old.id_parecer * 4 + 1;
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_pareceres_busca_upd
+            AFTER UPDATE OF nome_candidato, resumo_profissional, analise_perfil, conclusao_texto
+            ON pareceres BEGIN
+                DELETE FROM busca_texto WHERE rowid = old.id_parecer * 4 + 1;
+                INSERT INTO busca_texto (rowid, titulo, texto) VALUES (
+                    new.id_parecer * 4 + 1,
+                    IFNULL(new.nome_candidato, ''),
+                    IFNULL(new.resumo_profissional, '') || char(10) ||
+                    IFNULL(new.analise_perfil, '') || char(10) ||
+                    IFNULL(new.conclusao_texto, '')
+                );
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_candidatos_busca_ins AFTER INSERT ON candidatos BEGIN
+                INSERT INTO busca_texto (rowid, titulo, texto)
+                VALUES (new.id_candidato * 4 + 2, new.nome, '');
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_candidatos_busca_del AFTER DELETE ON candidatos BEGIN
+                DELETE FROM busca_texto WHERE rowid = old.id_candidato * 4 + 2;
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_candidatos_busca_upd AFTER UPDATE OF nome ON candidatos BEGIN
+                DELETE FROM busca_texto WHERE rowid = old.id_candidato * 4 + 2;
+                INSERT INTO busca_texto (rowid, titulo, texto)
+                VALUES (new.id_candidato * 4 + 2, new.nome, '');
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_vagas_busca_ins AFTER INSERT ON vagas BEGIN
+                INSERT INTO busca_texto (rowid, titulo, texto)
+                VALUES (new.id_vaga * 4 + 3, new.cargo, IFNULL(new.descricao, ''));
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_vagas_busca_del AFTER DELETE ON vagas BEGIN
+                DELETE FROM busca_texto WHERE rowid = old.id_vaga * 4 + 3;
+            END;
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_vagas_busca_upd AFTER UPDATE OF cargo, descricao ON vagas BEGIN
+                DELETE FROM busca_texto WHERE rowid = old.id_vaga * 4 + 3;
+                INSERT INTO busca_texto (rowid, titulo, texto)
+                VALUES (new.id_vaga * 4 + 3, new.cargo, IFNULL(new.descricao, ''));
+            END;
+            """,
+            # carga inicial do que já existe
+            """
+            INSERT INTO busca_texto (rowid, titulo, texto)
+            SELECT id_parecer * 4 + 1, IFNULL(nome_candidato, ''),
+                   IFNULL(resumo_profissional, '') || char(10) ||
+                   IFNULL(analise_perfil, '') || char(10) || IFNULL(conclusao_texto, '')
+            FROM pareceres;
+            """,
+            "INSERT INTO busca_texto (rowid, titulo, texto) SELECT id_candidato * 4 + 2, nome, '' FROM candidatos;",
+            """
+            INSERT INTO busca_texto (rowid, titulo, texto)
+            SELECT id_vaga * 4 + 3, cargo, IFNULL(descricao, '') FROM vagas;
+            """,
+            "INSERT INTO busca_texto (busca_texto) VALUES ('optimize');",
+        ],
+        [
+            ("SELECT rowid FROM busca_texto WHERE busca_texto MATCH ? ORDER BY rank LIMIT 20;", ('"ana"*',)),
+        ],
+    ),
+    (
+        4,
+        "Colunas e tabelas dos antigos CSVs (clientes, pipeline, financeiro) + controle da migração",
+        [
+            "ALTER TABLE clientes ADD COLUMN razao_social TEXT;",
+            "ALTER TABLE clientes ADD COLUMN cnpj TEXT;",
+            "ALTER TABLE clientes ADD COLUMN observacoes TEXT;",
+            "ALTER TABLE vaga_candidato ADD COLUMN status_etapa TEXT;",
+            "ALTER TABLE vaga_candidato ADD COLUMN status_contratacao TEXT;",
+            "ALTER TABLE vaga_candidato ADD COLUMN motivo_decline TEXT;",
+            """
+            CREATE TABLE IF NOT EXISTS fin_os (
+                id_os          INTEGER PRIMARY KEY AUTOINCREMENT,
+                id_cliente     INTEGER,
+                nome_cliente   TEXT,
+                descricao      TEXT,
+                tipo_servico   TEXT,
+                data_emissao   TEXT,
+                data_execucao  TEXT,
+                valor          TEXT,
+                status         TEXT,
+                observacoes    TEXT,
+                FOREIGN KEY(id_cliente) REFERENCES clientes(id_cliente)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS fin_orc (
+                id_orc         INTEGER PRIMARY KEY AUTOINCREMENT,
+                id_cliente     INTEGER,
+                nome_cliente   TEXT,
+                descricao      TEXT,
+                data_emissao   TEXT,
+                validade       TEXT,
+                valor          TEXT,
+                status         TEXT,
+                observacoes    TEXT,
+                FOREIGN KEY(id_cliente) REFERENCES clientes(id_cliente)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS fin_nf (
+                id_nf          INTEGER PRIMARY KEY AUTOINCREMENT,
+                id_cliente     INTEGER,
+                nome_cliente   TEXT,
+                numero_nf      TEXT,
+                data_emissao   TEXT,
+                valor          TEXT,
+                descricao      TEXT,
+                observacoes    TEXT,
+                FOREIGN KEY(id_cliente) REFERENCES clientes(id_cliente)
+            );
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_fin_os_cliente ON fin_os (id_cliente);",
+            "CREATE INDEX IF NOT EXISTS idx_fin_orc_cliente ON fin_orc (id_cliente);",
+            "CREATE INDEX IF NOT EXISTS idx_fin_nf_cliente ON fin_nf (id_cliente);",
+            "CREATE INDEX IF NOT EXISTS idx_clientes_nome ON clientes (nome_cliente COLLATE NOCASE);",
+            # andamento da migração CSV -> banco (uma linha por arquivo) e de-para de ids
+            """
+            CREATE TABLE IF NOT EXISTS migracao_csv (
+                store          TEXT PRIMARY KEY,
+                status         TEXT NOT NULL,
+                linhas_csv     INTEGER,
+                linhas_banco   INTEGER,
+                ignoradas      INTEGER,
+                concluida_em   TEXT
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS migracao_csv_ids (
+                store      TEXT NOT NULL,
+                id_csv     TEXT NOT NULL,
+                id_banco   INTEGER,
+                PRIMARY KEY (store, id_csv)
+            );
+            """,
+        ],
+        [
+            ("SELECT * FROM clientes WHERE nome_cliente = ? COLLATE NOCASE;", ("",)),
+            ("SELECT * FROM fin_os WHERE id_cliente = ?;", (0,)),
+        ],
+    ),
+    (
+        5,
+        "Índice de cobertura das colunas curtas dos pareceres (pipeline sem ler os textos longos)",
+        [
+            # o pipeline lê só estas colunas: a consulta fica no índice e não
+            # passa pelas páginas de overflow de resumo/análise/conclusão
+            """
+            CREATE INDEX IF NOT EXISTS idx_pareceres_resumo
+            ON pareceres (data_hora, id_parecer, id_candidato, id_vaga, cliente, cargo, caminho_arquivo);
+            """,
+            "ANALYZE;",
+        ],
+        [
+            (
+                "SELECT data_hora, id_candidato, id_vaga, cliente, cargo, caminho_arquivo, id_parecer "
+                "FROM pareceres ORDER BY data_hora, id_parecer;",
+                (),
+            ),
+        ],
+    ),
+    (
+        6,
+        "Fila de tarefas em segundo plano (parecer, importação, IA) executadas por processos trabalhadores",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS tarefas (
+                id_tarefa      INTEGER PRIMARY KEY AUTOINCREMENT,
+                tipo           TEXT NOT NULL,
+                status         TEXT NOT NULL DEFAULT 'pendente', -- pendente, executando, concluida, erro
+                parametros     TEXT,            -- JSON
+                progresso      REAL DEFAULT 0,
+                mensagem       TEXT,
+                pasta          TEXT,            -- resultado em disco (resultado.json + arquivos)
+                trabalhador    TEXT,
+                tentativas     INTEGER DEFAULT 0,
+                criado_em      TEXT,
+                iniciado_em    TEXT,
+                atualizado_em  TEXT,
+                concluido_em   TEXT
+            );
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_tarefas_status ON tarefas (status, id_tarefa);",
+        ],
+        [
+            ("SELECT id_tarefa FROM tarefas WHERE status = ? ORDER BY id_tarefa LIMIT 1;", ("pendente",)),
+        ],
+    ),
+]
+
+# Bancos (caminho absoluto) já migrados neste processo.
+_MIGRADOS: set[str] = set()
+_LOCK_MIGRACAO = threading.Lock()
+
+
+def _plano_consulta(conn: sqlite3.Connection, sql: str, params=()) -> str:
+    try:
+        linhas = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    except sqlite3.OperationalError as e:
+        # ex.: tabela criada pela própria migração ainda não existe
+        return f"(sem plano: {e})"
+    return " | ".join(str(r["detail"]) for r in linhas)
 
-    conn.close()
+
+def versao_schema(conn: sqlite3.Connection | None = None) -> int:
+    """
+    Versão de schema gravada no banco (0 se nenhuma migração foi aplicada).
+    Só lê: não cria nada se a tabela schema_version ainda não existir.
+    """
+    conn = conn or conexao()
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version';"
+    ).fetchone()
+    if not existe:
+        return 0
+    row = conn.execute("SELECT MAX(versao) AS v FROM schema_version;").fetchone()
+    return int(row["v"] or 0)
+
+
+def aplicar_migracoes() -> list[dict]:
+    """
+    Aplica, em ordem, os passos de MIGRACOES ainda não registrados em schema_version.
+    Roda uma única vez por processo para cada arquivo de banco.
+    Retorna um relatório por passo aplicado (com o plano das consultas antes/depois).
+    """
+    caminho = os.path.abspath(DB_PATH)
+    if caminho in _MIGRADOS:
+        return []
+
+    relatorio = []
+    with _LOCK_MIGRACAO:
+        if caminho in _MIGRADOS:
+            return []
+
+        conn = conexao()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                versao      INTEGER PRIMARY KEY,
+                descricao   TEXT,
+                aplicada_em TEXT DEFAULT (datetime('now'))
+            );
+            """
+        )
+        conn.commit()
+        atual = versao_schema(conn)
+
+        for versao, descricao, comandos, consultas in MIGRACOES:
+            if versao <= atual:
+                continue
+
+            antes = [_plano_consulta(conn, sql, params) for sql, params in consultas]
+            conn.execute("BEGIN IMMEDIATE;")
+            try:
+                for sql in comandos:
+                    conn.execute(sql)
+                conn.execute(
+                    "INSERT INTO schema_version (versao, descricao) VALUES (?, ?);",
+                    (versao, descricao),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            depois = [_plano_consulta(conn, sql, params) for sql, params in consultas]
+
+            item = {"versao": versao, "descricao": descricao, "planos": []}
+            logger.info("Migração %s aplicada: %s", versao, descricao)
+            for (sql, _), p_antes, p_depois in zip(consultas, antes, depois):
+                item["planos"].append({"consulta": sql, "antes": p_antes, "depois": p_depois})
+                logger.info("  %s\n    antes:  %s\n    depois: %s", sql, p_antes, p_depois)
+            relatorio.append(item)
+
+        _MIGRADOS.add(caminho)
+
+    return relatorio
 
 
 # =========================================================
@@ -184,9 +1064,7 @@ def autenticar(username: str, senha: str):
     Autentica usuário na tabela 'usuarios'.
     Retorna dict com dados do usuário ou None se falhar.
     """
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    cur = conexao().execute(
         """
         SELECT * FROM usuarios
         WHERE username = ? AND ativo = 1
@@ -194,7 +1072,6 @@ def autenticar(username: str, senha: str):
         (username,),
     )
     row = cur.fetchone()
-    conn.close()
 
     if not row:
         return None
@@ -206,29 +1083,27 @@ def autenticar(username: str, senha: str):
     return user
 
 
+@escrita
 def inserir_usuario(username: str, nome: str, senha: str, perfil: str = "OPERACOES_GERAL", ativo: int = 1) -> int:
     """
     Helper opcional para criar novos usuários via código (se quiser usar depois).
     """
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO usuarios (username, nome, senha_hash, perfil, ativo)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (username, nome, hash_password(senha), perfil, ativo),
-    )
-    conn.commit()
-    new_id = cur.lastrowid
-    conn.close()
-    return new_id
+    with transacao() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO usuarios (username, nome, senha_hash, perfil, ativo)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (username, nome, hash_password(senha), perfil, ativo),
+        )
+    return cur.lastrowid
 
 
 # =========================================================
 # CANDIDATOS
 # =========================================================
 
+@escrita
 def inserir_candidato(
     nome,
     idade=None,
@@ -239,39 +1114,50 @@ def inserir_candidato(
     pretensao=None,
     caminho_cv=None,
 ) -> int:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO candidatos (nome, idade, cidade, telefone, email, linkedin, pretensao, caminho_cv)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (nome, idade, cidade, telefone, email, linkedin, pretensao, caminho_cv),
-    )
-    conn.commit()
-    new_id = cur.lastrowid
-    conn.close()
-    return new_id
+    with transacao() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO candidatos (nome, idade, cidade, telefone, email, linkedin, pretensao, caminho_cv)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (nome, idade, cidade, telefone, email, linkedin, pretensao, caminho_cv),
+        )
+    return cur.lastrowid
 
 
+CAMPOS_CANDIDATO = ("nome", "idade", "cidade", "telefone", "email", "linkedin", "pretensao", "caminho_cv")
+
+
+@escrita
+def inserir_candidatos_bulk(registros) -> list[int]:
+    """
+    Insere vários candidatos em uma única transação (executemany).
+    registros: iterável de dicts com as mesmas chaves de inserir_candidato.
+    Retorna os ids gerados, na mesma ordem dos registros.
+    """
+    linhas = [tuple(r.get(c) for c in CAMPOS_CANDIDATO) for r in registros]
+    if not linhas:
+        return []
+    with transacao(imediata=True) as conn:
+        return _inserir_em_lote(conn, "candidatos", CAMPOS_CANDIDATO, linhas)
+
+
+@cache_leitura
 def listar_candidatos(order_by: str = "id_candidato"):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(f"SELECT * FROM candidatos ORDER BY {order_by};")
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    ordem = _expressao_ordem("candidatos", order_by)
+    cur = conexao().execute(f"SELECT * FROM candidatos ORDER BY {ordem}, id_candidato;")
+    return [dict(r) for r in cur.fetchall()]
 
 
+@cache_leitura
 def obter_candidato(id_candidato: int):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM candidatos WHERE id_candidato = ?;", (id_candidato,))
-    row = cur.fetchone()
-    conn.close()
+    row = conexao().execute(
+        "SELECT * FROM candidatos WHERE id_candidato = ?;", (id_candidato,)
+    ).fetchone()
     return dict(row) if row else None
 
 
+@escrita
 def atualizar_candidato(
     id_candidato: int,
     nome: str,
@@ -283,36 +1169,30 @@ def atualizar_candidato(
     pretensao=None,
     caminho_cv=None,
 ):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE candidatos
-        SET nome = ?, idade = ?, cidade = ?, telefone = ?, email = ?,
-            linkedin = ?, pretensao = ?, caminho_cv = ?
-        WHERE id_candidato = ?
-        """,
-        (nome, idade, cidade, telefone, email, linkedin, pretensao, caminho_cv, id_candidato),
-    )
-    conn.commit()
-    conn.close()
+    with transacao() as conn:
+        conn.execute(
+            """
+            UPDATE candidatos
+            SET nome = ?, idade = ?, cidade = ?, telefone = ?, email = ?,
+                linkedin = ?, pretensao = ?, caminho_cv = ?
+            WHERE id_candidato = ?
+            """,
+            (nome, idade, cidade, telefone, email, linkedin, pretensao, caminho_cv, id_candidato),
+        )
 
 
 def buscar_candidato_por_nome(nome: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    cur = conexao().execute(
         """
         SELECT * FROM candidatos
         WHERE lower(nome) = lower(?)
         """,
         (nome,),
     )
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    return [dict(r) for r in cur.fetchall()]
 
 
+@escrita
 def get_or_create_candidato_por_nome_localidade(
     nome: str,
     localidade: str | None = None,
@@ -322,54 +1202,45 @@ def get_or_create_candidato_por_nome_localidade(
     if existentes:
         return existentes[0]["id_candidato"]
 
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO candidatos (nome, idade, cidade)
-        VALUES (?, ?, ?)
-        """,
-        (nome or "Sem nome", idade, localidade),
-    )
-    conn.commit()
-    new_id = cur.lastrowid
-    conn.close()
-    return new_id
+    with transacao() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO candidatos (nome, idade, cidade)
+            VALUES (?, ?, ?)
+            """,
+            (nome or "Sem nome", idade, localidade),
+        )
+    return cur.lastrowid
 
 
 # =========================================================
 # CLIENTES
 # =========================================================
 
+@escrita
 def inserir_cliente(nome_cliente, contato=None, telefone=None, email=None, cidade=None) -> int:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO clientes (nome_cliente, contato, telefone, email, cidade)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (nome_cliente, contato, telefone, email, cidade),
-    )
-    conn.commit()
-    new_id = cur.lastrowid
-    conn.close()
-    return new_id
+    with transacao() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO clientes (nome_cliente, contato, telefone, email, cidade)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (nome_cliente, contato, telefone, email, cidade),
+        )
+    return cur.lastrowid
 
 
+@cache_leitura
 def listar_clientes():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM clientes ORDER BY nome_cliente;")
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    cur = conexao().execute("SELECT * FROM clientes ORDER BY nome_cliente;")
+    return [dict(r) for r in cur.fetchall()]
 
 
 # =========================================================
 # VAGAS
 # =========================================================
 
+@escrita
 def inserir_vaga(
     id_cliente,
     cargo,
@@ -379,28 +1250,23 @@ def inserir_vaga(
     status,
     descricao,
 ) -> int:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO vagas (
-            id_cliente, cargo, modalidade, data_abertura,
-            data_fechamento, status, descricao
+    with transacao() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO vagas (
+                id_cliente, cargo, modalidade, data_abertura,
+                data_fechamento, status, descricao
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (id_cliente, cargo, modalidade, data_abertura, data_fechamento, status, descricao),
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        (id_cliente, cargo, modalidade, data_abertura, data_fechamento, status, descricao),
-    )
-    conn.commit()
-    new_id = cur.lastrowid
-    conn.close()
-    return new_id
+    return cur.lastrowid
 
 
+@cache_leitura
 def listar_vagas():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    cur = conexao().execute(
         """
         SELECT v.*, c.nome_cliente
         FROM vagas v
@@ -408,15 +1274,12 @@ def listar_vagas():
         ORDER BY v.id_vaga;
         """
     )
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    return [dict(r) for r in cur.fetchall()]
 
 
+@cache_leitura
 def obter_vaga(id_vaga: int):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    row = conexao().execute(
         """
         SELECT v.*, c.nome_cliente
         FROM vagas v
@@ -424,12 +1287,11 @@ def obter_vaga(id_vaga: int):
         WHERE v.id_vaga = ?
         """,
         (id_vaga,),
-    )
-    row = cur.fetchone()
-    conn.close()
+    ).fetchone()
     return dict(row) if row else None
 
 
+@escrita
 def atualizar_vaga(
     id_vaga: int,
     id_cliente,
@@ -440,43 +1302,66 @@ def atualizar_vaga(
     status,
     descricao,
 ):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE vagas
-        SET id_cliente = ?, cargo = ?, modalidade = ?, data_abertura = ?,
-            data_fechamento = ?, status = ?, descricao = ?
-        WHERE id_vaga = ?
-        """,
-        (id_cliente, cargo, modalidade, data_abertura, data_fechamento, status, descricao, id_vaga),
-    )
-    conn.commit()
-    conn.close()
+    with transacao() as conn:
+        conn.execute(
+            """
+            UPDATE vagas
+            SET id_cliente = ?, cargo = ?, modalidade = ?, data_abertura = ?,
+                data_fechamento = ?, status = ?, descricao = ?
+            WHERE id_vaga = ?
+            """,
+            (id_cliente, cargo, modalidade, data_abertura, data_fechamento, status, descricao, id_vaga),
+        )
 
 
 # =========================================================
 # VÍNCULO VAGA x CANDIDATO
 # =========================================================
 
+@escrita
 def vincular_vaga_candidato(id_vaga: int, id_candidato: int, observacao: str = ""):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT OR IGNORE INTO vaga_candidato (id_vaga, id_candidato, observacao)
-        VALUES (?, ?, ?)
-        """,
-        (id_vaga, id_candidato, observacao),
-    )
-    conn.commit()
-    conn.close()
+    with transacao() as conn:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO vaga_candidato (id_vaga, id_candidato, observacao)
+            VALUES (?, ?, ?)
+            """,
+            (id_vaga, id_candidato, observacao),
+        )
+
+
+@escrita
+def vincular_bulk(vinculos) -> list[int]:
+    """
+    Cria vários vínculos vaga x candidato em uma única transação.
+    vinculos: iterável de dicts com id_vaga, id_candidato e (opcional) observacao.
+    Vínculos já existentes são mantidos como estão.
+    Retorna o id_vinculo de cada item, na ordem recebida.
+    """
+    linhas = [(v["id_vaga"], v["id_candidato"], v.get("observacao") or "") for v in vinculos]
+    if not linhas:
+        return []
+    with transacao(imediata=True) as conn:
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO vaga_candidato (id_vaga, id_candidato, observacao)
+            VALUES (?, ?, ?)
+            """,
+            linhas,
+        )
+        ids = []
+        for id_vaga, id_candidato, _ in linhas:
+            row = conn.execute(
+                "SELECT id_vinculo FROM vaga_candidato WHERE id_vaga = ? AND id_candidato = ?;",
+                (id_vaga, id_candidato),
+            ).fetchone()
+            ids.append(row["id_vinculo"])
+    return ids
 
 
+@cache_leitura
 def listar_vinculos_vaga(id_vaga: int):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    cur = conexao().execute(
         """
         SELECT vc.*, c.nome, c.telefone, c.cidade
         FROM vaga_candidato vc
@@ -486,70 +1371,80 @@ def listar_vinculos_vaga(id_vaga: int):
         """,
         (id_vaga,),
     )
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    return [dict(r) for r in cur.fetchall()]
 
 
+@escrita
 def atualizar_vinculos_vaga(id_vaga: int, ids_candidatos: list[int]):
     """
-    Remove vínculos antigos da vaga e recria com os IDs informados.
+    Sincroniza os vínculos da vaga com os IDs informados.
+    Só remove os candidatos que saíram e só insere os que entraram
+    (em uma transação); os vínculos mantidos preservam data_vinculo e observacao.
+    Retorna (qtd_inseridos, qtd_removidos).
     """
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM vaga_candidato WHERE id_vaga = ?;", (id_vaga,))
-    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    for idc in ids_candidatos:
-        cur.execute(
-            """
-            INSERT INTO vaga_candidato (id_vaga, id_candidato, data_vinculo, observacao)
-            VALUES (?, ?, ?, ?)
-            """,
-            (id_vaga, idc, agora, ""),
-        )
-    conn.commit()
-    conn.close()
+    desejados = {int(i) for i in ids_candidatos}
+    with transacao(imediata=True) as conn:
+        atuais = {
+            int(r["id_candidato"])
+            for r in conn.execute(
+                "SELECT id_candidato FROM vaga_candidato WHERE id_vaga = ?;", (id_vaga,)
+            ).fetchall()
+        }
+        remover = atuais - desejados
+        inserir = desejados - atuais
+
+        if remover:
+            conn.executemany(
+                "DELETE FROM vaga_candidato WHERE id_vaga = ? AND id_candidato = ?;",
+                [(id_vaga, idc) for idc in remover],
+            )
+        if inserir:
+            agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            conn.executemany(
+                """
+                INSERT INTO vaga_candidato (id_vaga, id_candidato, data_vinculo, observacao)
+                VALUES (?, ?, ?, ?)
+                """,
+                [(id_vaga, idc, agora, "") for idc in sorted(inserir)],
+            )
+    return len(inserir), len(remover)
 
 
 # =========================================================
 # STATUS PIPELINE
 # =========================================================
 
+@escrita
 def inserir_status_pipeline(nome: str, tipo: str = "ETAPA") -> int:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO status_pipeline (nome, tipo)
-        VALUES (?, ?)
-        """,
-        (nome, tipo),
-    )
-    conn.commit()
-    new_id = cur.lastrowid
-    conn.close()
-    return new_id
+    with transacao() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO status_pipeline (nome, tipo)
+            VALUES (?, ?)
+            """,
+            (nome, tipo),
+        )
+    return cur.lastrowid
 
 
+@cache_leitura
 def listar_status_pipeline(tipo: str | None = None):
-    conn = get_conn()
-    cur = conn.cursor()
+    conn = conexao()
     if tipo:
-        cur.execute(
+        cur = conn.execute(
             "SELECT * FROM status_pipeline WHERE tipo = ? ORDER BY nome;",
             (tipo,),
         )
     else:
-        cur.execute("SELECT * FROM status_pipeline ORDER BY tipo, nome;")
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+        cur = conn.execute("SELECT * FROM status_pipeline ORDER BY tipo, nome;")
+    return [dict(r) for r in cur.fetchall()]
 
 
 # =========================================================
 # PARECERES
 # =========================================================
 
+@escrita
 def registrar_parecer_db(
     id_vaga: int | None,
     id_candidato: int | None,
@@ -569,47 +1464,94 @@ def registrar_parecer_db(
     status_contratacao: str = "Pendente",
     motivo_decline: str = "",
 ):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO pareceres (
-            id_vaga, id_candidato, data_hora, cliente, cargo, nome_candidato,
-            localidade, idade, pretensao, linkedin, resumo_profissional,
-            analise_perfil, conclusao_texto, formato, caminho_arquivo,
-            status_etapa, status_contratacao, motivo_decline
+    with transacao() as conn:
+        conn.execute(
+            """
+            INSERT INTO pareceres (
+                id_vaga, id_candidato, data_hora, cliente, cargo, nome_candidato,
+                localidade, idade, pretensao, linkedin, resumo_profissional,
+                analise_perfil, conclusao_texto, formato, caminho_arquivo,
+                status_etapa, status_contratacao, motivo_decline
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                id_vaga,
+                id_candidato,
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                cliente,
+                cargo,
+                nome,
+                localidade,
+                idade,
+                pretensao,
+                linkedin,
+                resumo_prof,
+                analise_prof,
+                conclusao_txt,
+                formato,
+                caminho_arquivo,
+                status_etapa,
+                status_contratacao,
+                motivo_decline,
+            ),
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            id_vaga,
-            id_candidato,
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            cliente,
-            cargo,
-            nome,
-            localidade,
-            idade,
-            pretensao,
-            linkedin,
-            resumo_prof,
-            analise_prof,
-            conclusao_txt,
-            formato,
-            caminho_arquivo,
-            status_etapa,
-            status_contratacao,
-            motivo_decline,
-        ),
-    )
-    conn.commit()
-    conn.close()
 
 
+CAMPOS_PARECER = (
+    "id_vaga", "id_candidato", "data_hora", "cliente", "cargo", "nome_candidato",
+    "localidade", "idade", "pretensao", "linkedin", "resumo_profissional",
+    "analise_perfil", "conclusao_texto", "formato", "caminho_arquivo",
+    "status_etapa", "status_contratacao", "motivo_decline",
+)
+
+
+@escrita
+def registrar_pareceres_bulk(registros, substituir_por_caminho: bool = False) -> list[int]:
+    """
+    Registra vários pareceres em uma única transação (executemany).
+    registros: iterável de dicts com as mesmas chaves de registrar_parecer_db
+    (data_hora é opcional; se ausente, usa o momento atual).
+    substituir_por_caminho=True apaga antes, na mesma transação, os pareceres
+    já registrados com o mesmo caminho_arquivo (reimportação).
+    Retorna os id_parecer gerados, na ordem dos registros.
+    """
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    linhas = []
+    for r in registros:
+        linhas.append((
+            r.get("id_vaga"),
+            r.get("id_candidato"),
+            r.get("data_hora") or agora,
+            r.get("cliente"),
+            r.get("cargo"),
+            r.get("nome"),
+            r.get("localidade"),
+            r.get("idade"),
+            r.get("pretensao"),
+            r.get("linkedin"),
+            r.get("resumo_prof"),
+            r.get("analise_prof"),
+            r.get("conclusao_txt"),
+            r.get("formato"),
+            r.get("caminho_arquivo"),
+            r.get("status_etapa", "Em avaliação"),
+            r.get("status_contratacao", "Pendente"),
+            r.get("motivo_decline", ""),
+        ))
+    if not linhas:
+        return []
+
+    with transacao(imediata=True) as conn:
+        if substituir_por_caminho:
+            caminhos = {(l[14],) for l in linhas if l[14]}
+            conn.executemany("DELETE FROM pareceres WHERE caminho_arquivo = ?;", caminhos)
+        return _inserir_em_lote(conn, "pareceres", CAMPOS_PARECER, linhas)
+
+
+@cache_leitura
 def listar_pareceres():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    cur = conexao().execute(
         """
         SELECT p.*, c.nome as nome_cand_real, v.cargo as cargo_vaga
         FROM pareceres p
@@ -618,15 +1560,14 @@ def listar_pareceres():
         ORDER BY p.data_hora DESC;
         """
     )
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    return [dict(r) for r in cur.fetchall()]
 
 
 # =========================================================
 # ACESSOS
 # =========================================================
 
+@escrita
 def inserir_acesso(
     id_cliente: int | None,
     nome_cliente: str | None,
@@ -639,58 +1580,49 @@ def inserir_acesso(
     status: str | None,
     observacoes: str | None,
 ) -> int:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO acessos (
-            id_cliente, nome_cliente, id_candidato, nome_usuario,
-            sistema, tipo_acesso, data_inicio, data_fim, status, observacoes
+    with transacao() as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO acessos (
+                id_cliente, nome_cliente, id_candidato, nome_usuario,
+                sistema, tipo_acesso, data_inicio, data_fim, status, observacoes
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                id_cliente,
+                nome_cliente,
+                id_candidato,
+                nome_usuario,
+                sistema,
+                tipo_acesso,
+                data_inicio,
+                data_fim,
+                status,
+                observacoes,
+            ),
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            id_cliente,
-            nome_cliente,
-            id_candidato,
-            nome_usuario,
-            sistema,
-            tipo_acesso,
-            data_inicio,
-            data_fim,
-            status,
-            observacoes,
-        ),
-    )
-    conn.commit()
-    new_id = cur.lastrowid
-    conn.close()
-    return new_id
+    return cur.lastrowid
 
 
+@cache_leitura
 def listar_acessos():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    cur = conexao().execute(
         """
         SELECT * FROM acessos
         ORDER BY id_acesso DESC;
         """
     )
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    return [dict(r) for r in cur.fetchall()]
 
 
+@cache_leitura
 def obter_acesso(id_acesso: int):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM acessos WHERE id_acesso = ?;", (id_acesso,))
-    row = cur.fetchone()
-    conn.close()
+    row = conexao().execute("SELECT * FROM acessos WHERE id_acesso = ?;", (id_acesso,)).fetchone()
     return dict(row) if row else None
 
 
+@escrita
 def atualizar_acesso(
     id_acesso: int,
     id_cliente: int | None,
@@ -704,59 +1636,572 @@ def atualizar_acesso(
     status: str | None,
     observacoes: str | None,
 ):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    with transacao() as conn:
+        conn.execute(
+            """
+            UPDATE acessos
+            SET id_cliente = ?, nome_cliente = ?, id_candidato = ?, nome_usuario = ?,
+                sistema = ?, tipo_acesso = ?, data_inicio = ?, data_fim = ?, status = ?, observacoes = ?
+            WHERE id_acesso = ?
+            """,
+            (
+                id_cliente,
+                nome_cliente,
+                id_candidato,
+                nome_usuario,
+                sistema,
+                tipo_acesso,
+                data_inicio,
+                data_fim,
+                status,
+                observacoes,
+                id_acesso,
+            ),
+        )
+
+
+# =========================================================
+# REGISTROS GENÉRICOS (usados por modules.armazenamento)
+# =========================================================
+
+def _colunas_tabela(conn: sqlite3.Connection, tabela: str, colunas) -> list[str]:
+    """Confere tabela e colunas contra o schema antes de interpolá-las no SQL."""
+    existentes = set()
+    if tabela.isidentifier():
+        existentes = {r["name"] for r in conn.execute(f"PRAGMA table_info({tabela});").fetchall()}
+    if not existentes:
+        raise ValueError(f"Tabela desconhecida: {tabela!r}")
+    desconhecidas = [c for c in colunas if c not in existentes]
+    if desconhecidas:
+        raise ValueError(f"Colunas desconhecidas em {tabela}: {', '.join(desconhecidas)}")
+    return list(colunas)
+
+
+@escrita
+def inserir_registro(tabela: str, valores: dict) -> int:
+    """INSERT de uma linha (dict coluna -> valor) em `tabela`. Retorna o rowid gerado."""
+    with transacao() as conn:
+        colunas = _colunas_tabela(conn, tabela, valores.keys())
+        cur = conn.execute(
+            f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' for _ in colunas)});",
+            [valores[c] for c in colunas],
+        )
+    return cur.lastrowid
+
+
+@escrita
+def atualizar_registro(tabela: str, chave, id_registro, valores: dict) -> int:
+    """
+    UPDATE das colunas de `valores` na linha chave = id_registro.
+    chave pode ser uma coluna ("id_os") ou várias (("id_vaga", "id_candidato")),
+    com id_registro na mesma forma. Retorna as linhas alteradas.
+    """
+    if not valores:
+        return 0
+    if isinstance(chave, str):
+        chave, id_registro = (chave,), (id_registro,)
+    with transacao() as conn:
+        colunas = _colunas_tabela(conn, tabela, list(valores.keys()))
+        _colunas_tabela(conn, tabela, chave)
+        cur = conn.execute(
+            f"UPDATE {tabela} SET {', '.join(f'{c} = ?' for c in colunas)} "
+            f"WHERE {' AND '.join(f'{c} = ?' for c in chave)};",
+            [valores[c] for c in colunas] + list(id_registro),
+        )
+    return cur.rowcount
+
+
+@escrita
+def salvar_tabela(tabela: str, chave: tuple, linhas: list[dict]) -> tuple[int, int]:
+    """
+    Deixa `tabela` com o conteúdo de `linhas` (telas que editam a lista inteira):
+    upsert por `chave` (PK ou UNIQUE) e remoção das linhas que não vieram.
+    Colunas ausentes nos dicts ficam como estão. Retorna (qtd_gravadas, qtd_removidas).
+    """
+    chave = tuple(chave)
+    with transacao(imediata=True) as conn:
+        colunas = _colunas_tabela(conn, tabela, list(linhas[0].keys()) if linhas else list(chave))
+        if not set(chave) <= set(colunas):
+            raise ValueError(f"Linhas sem a chave {chave} para salvar em {tabela}.")
+
+        atuais = {tuple(r) for r in conn.execute(f"SELECT {', '.join(chave)} FROM {tabela};").fetchall()}
+        novas = {tuple(l[c] for c in chave) for l in linhas}
+        # compara como texto: ids vindos das telas chegam como "12"
+        novas_txt = {tuple(str(v) for v in k) for k in novas}
+        remover = [k for k in atuais if tuple(str(v) for v in k) not in novas_txt]
+        if remover:
+            conn.executemany(
+                f"DELETE FROM {tabela} WHERE {' AND '.join(f'{c} = ?' for c in chave)};",
+                remover,
+            )
+
+        if linhas:
+            resto = [c for c in colunas if c not in chave]
+            atualizacao = (
+                f"DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in resto)}" if resto else "DO NOTHING"
+            )
+            conn.executemany(
+                f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' for _ in colunas)}) "
+                f"ON CONFLICT ({', '.join(chave)}) {atualizacao};",
+                [[l.get(c) for c in colunas] for l in linhas],
+            )
+    return len(linhas), len(remover)
+
+
+# =========================================================
+# LISTAGEM PAGINADA (keyset)
+# =========================================================
+
+# Por entidade: colunas, FROM (com joins), chave primária, ordenações permitidas
+# (nome público -> expressão SQL) e colunas usadas por cada filtro.
+# Só o que está aqui entra no SQL; o resto vai como parâmetro.
+# Colunas que aceitam NULL são ordenadas por IFNULL(..., '') para que a
+# comparação do cursor funcione.
+_LISTAGENS = {
+    "candidatos": {
+        "campos": "*",
+        "origem": "candidatos",
+        "pk": "id_candidato",
+        "ordens": {
+            "id_candidato": "id_candidato",
+            "nome": "nome COLLATE NOCASE",
+            "cidade": "IFNULL(cidade, '')",
+            "created_at": "IFNULL(created_at, '')",
+        },
+        "status": None,
+        "cliente": None,
+        "data": "created_at",
+        "texto": "nome",
+    },
+    "vagas": {
+        "campos": "v.*, c.nome_cliente",
+        "origem": "vagas v LEFT JOIN clientes c ON c.id_cliente = v.id_cliente",
+        "pk": "v.id_vaga",
+        "ordens": {
+            "id_vaga": "v.id_vaga",
+            "cargo": "v.cargo COLLATE NOCASE",
+            "data_abertura": "IFNULL(v.data_abertura, '')",
+            "status": "IFNULL(v.status, '')",
+            "nome_cliente": "IFNULL(c.nome_cliente, '')",
+        },
+        "status": "v.status",
+        "cliente": "v.id_cliente",
+        "data": "v.data_abertura",
+        "texto": "v.cargo",
+    },
+    "pareceres": {
+        "campos": "p.*, c.nome as nome_cand_real, v.cargo as cargo_vaga",
+        "origem": (
+            "pareceres p "
+            "LEFT JOIN candidatos c ON c.id_candidato = p.id_candidato "
+            "LEFT JOIN vagas v       ON v.id_vaga      = p.id_vaga"
+        ),
+        "pk": "p.id_parecer",
+        "ordens": {
+            "id_parecer": "p.id_parecer",
+            "data_hora": "p.data_hora",
+            "nome_candidato": "IFNULL(p.nome_candidato, '')",
+            "cliente": "IFNULL(p.cliente, '')",
+        },
+        "status": "p.status_etapa",
+        "cliente": "v.id_cliente",
+        "data": "p.data_hora",
+        "texto": "p.nome_candidato",
+    },
+    "acessos": {
+        "campos": "*",
+        "origem": "acessos",
+        "pk": "id_acesso",
+        "ordens": {
+            "id_acesso": "id_acesso",
+            "nome_cliente": "IFNULL(nome_cliente, '')",
+            "nome_usuario": "IFNULL(nome_usuario, '')",
+            "sistema": "IFNULL(sistema, '')",
+            "data_inicio": "IFNULL(data_inicio, '')",
+            "data_fim": "IFNULL(data_fim, '')",
+            "status": "IFNULL(status, '')",
+        },
+        "status": "status",
+        "cliente": "id_cliente",
+        "data": "data_inicio",
+        "texto": "nome_usuario",
+    },
+}
+
+
+def _expressao_ordem(entidade: str, order_by: str) -> str:
+    ordens = _LISTAGENS[entidade]["ordens"]
+    if order_by not in ordens:
+        raise ValueError(
+            f"Ordenação inválida para {entidade}: {order_by!r} "
+            f"(permitidas: {', '.join(ordens)})"
+        )
+    return ordens[order_by]
+
+
+def _filtros_listagem(spec: dict, entidade: str, status, id_cliente, data_de, data_ate, prefixo):
+    """Monta (cláusulas, parâmetros) dos filtros; recusa filtro que a entidade não tem."""
+    clausulas, params = [], []
+
+    def coluna(filtro):
+        col = spec[filtro]
+        if col is None:
+            raise ValueError(f"{entidade} não aceita filtro por {filtro}.")
+        return col
+
+    if status:
+        col = coluna("status")
+        if isinstance(status, (list, tuple, set)):
+            status = list(status)
+            clausulas.append(f"{col} IN ({', '.join('?' * len(status))})")
+            params.extend(status)
+        else:
+            clausulas.append(f"{col} = ?")
+            params.append(status)
+    if id_cliente is not None:
+        clausulas.append(f"{coluna('cliente')} = ?")
+        params.append(int(id_cliente))
+    if data_de:
+        clausulas.append(f"{coluna('data')} >= ?")
+        params.append(str(data_de))
+    if data_ate:
+        # data_ate é inclusiva mesmo quando a coluna guarda data e hora
+        clausulas.append(f"{coluna('data')} < date(?, '+1 day')")
+        params.append(str(data_ate))
+    if prefixo:
+        escapado = prefixo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        clausulas.append(f"{coluna('texto')} LIKE ? ESCAPE '\\'")
+        params.append(escapado + "%")
+
+    return clausulas, params
+
+
+@cache_leitura
+def listar_pagina(
+    entidade: str,
+    order_by: str | None = None,
+    desc: bool = False,
+    apos=None,
+    limite: int = 50,
+    status=None,
+    id_cliente: int | None = None,
+    data_de: str | None = None,
+    data_ate: str | None = None,
+    prefixo: str | None = None,
+) -> dict:
+    """
+    Uma página de candidatos, vagas, pareceres ou acessos, com filtros no SQL.
+
+    order_by: uma das chaves de _LISTAGENS[entidade]["ordens"] (padrão: chave primária).
+    apos:     cursor devolvido em "proximo" pela página anterior (None = primeira página).
+    status:   valor ou lista de valores; id_cliente, data_de/data_ate (ISO, inclusivas)
+              e prefixo (início do nome/cargo/usuário, sem diferenciar maiúsculas).
+
+    Retorna {"itens": [...], "total": qtd com os filtros, "proximo": cursor ou None}.
+    """
+    if entidade not in _LISTAGENS:
+        raise ValueError(f"Entidade sem listagem paginada: {entidade!r}")
+    spec = _LISTAGENS[entidade]
+    pk = spec["pk"]
+    ordem = _expressao_ordem(entidade, order_by or pk.split(".")[-1])
+    limite = max(1, min(int(limite), 1000))
+
+    clausulas, params = _filtros_listagem(spec, entidade, status, id_cliente, data_de, data_ate, prefixo)
+    conn = conexao()
+
+    where = f" WHERE {' AND '.join(clausulas)}" if clausulas else ""
+    total = conn.execute(f"SELECT COUNT(*) FROM {spec['origem']}{where};", params).fetchone()[0]
+
+    # Cursor: (valor da ordenação, pk) da última linha já exibida.
+    # Forma expandida para o SQLite usar o índice da coluna ordenada.
+    op = "<" if desc else ">"
+    params_pagina = list(params)
+    if apos is not None:
+        valor, ultimo_pk = apos
+        if ordem == pk:
+            clausulas.append(f"{pk} {op} ?")
+            params_pagina.append(ultimo_pk)
+        else:
+            clausulas.append(f"{ordem} {op}= ? AND ({ordem} {op} ? OR {pk} {op} ?)")
+            params_pagina.extend([valor, valor, ultimo_pk])
+
+    where = f" WHERE {' AND '.join(clausulas)}" if clausulas else ""
+    direcao = "DESC" if desc else "ASC"
+    ordenacao = f"{pk} {direcao}" if ordem == pk else f"{ordem} {direcao}, {pk} {direcao}"
+    cur = conn.execute(
+        f"SELECT {spec['campos']}, {ordem} AS _chave_ordem FROM {spec['origem']}{where} "
+        f"ORDER BY {ordenacao} LIMIT ?;",
+        params_pagina + [limite + 1],
+    )
+
+    itens = [dict(r) for r in cur.fetchall()]
+    proximo = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        ultimo = itens[-1]
+        proximo = (ultimo["_chave_ordem"], ultimo[pk.split(".")[-1]])
+    for item in itens:
+        item.pop("_chave_ordem", None)
+
+    return {"itens": itens, "total": total, "proximo": proximo}
+
+
+def listar_candidatos_pagina(**kwargs) -> dict:
+    return listar_pagina("candidatos", **kwargs)
+
+
+def listar_vagas_pagina(**kwargs) -> dict:
+    return listar_pagina("vagas", **kwargs)
+
+
+def listar_pareceres_pagina(**kwargs) -> dict:
+    return listar_pagina("pareceres", **kwargs)
+
+
+def listar_acessos_pagina(**kwargs) -> dict:
+    return listar_pagina("acessos", **kwargs)
+
+
+# =========================================================
+# DATAFRAMES (leitura colunar)
+# =========================================================
+
+# Tipagem pelo nome da coluna: id_* -> Int64, status*/modalidade/... -> category,
+# data_*/created_at -> datetime64 (NaT se vazio). As demais pelo que vier do
+# banco: só inteiros (ex.: idade) -> Int64, números -> Float64 (NA se NULL),
+# qualquer texto na coluna -> texto com "" no lugar de NULL.
+# Colunas com poucos valores distintos (cidades, clientes) também viram category.
+COLUNAS_CATEGORIA = {
+    "modalidade", "tipo", "tipo_acesso", "sistema", "formato", "perfil",
+    "cidade", "cidade_candidato", "localidade", "cliente", "nome_cliente",
+}
+COLUNAS_DATA = {"created_at", "aplicada_em"}
+
+
+def _tipo_numerico(valores: list) -> str | None:
+    """"Int64"/"Float64" se os valores não nulos forem todos números; senão None."""
+    tipo = None
+    for v in valores:
+        if v is None:
+            continue
+        if isinstance(v, int) and not isinstance(v, bool):
+            tipo = tipo or "Int64"
+        elif isinstance(v, float):
+            tipo = "Float64"
+        else:
+            return None
+    return tipo
+
+
+def _serie_tipada(nome: str, valores: list) -> pd.Series:
+    if nome.startswith("id_"):
+        try:
+            return pd.Series(valores, dtype="Int64")
+        except (TypeError, ValueError):
+            return pd.to_numeric(pd.Series(valores, dtype=object), errors="coerce").astype("Int64")
+    if nome.startswith("data_") or nome in COLUNAS_DATA:
+        return pd.to_datetime(pd.Series(valores, dtype=object), format="ISO8601", errors="coerce")
+    if nome.startswith("status") or nome in COLUNAS_CATEGORIA:
+        return pd.Series(pd.Categorical(["" if v is None else str(v) for v in valores]))
+    numerico = _tipo_numerico(valores)
+    if numerico:
+        return pd.Series(valores, dtype=numerico)
+    return pd.Series(["" if v is None else str(v) for v in valores], dtype=object)
+
+
+def consultar_df(sql: str, params=(), lote: int = 5000) -> pd.DataFrame:
+    """
+    Executa a consulta e monta um DataFrame tipado direto das tuplas do cursor,
+    coluna a coluna (sem criar um dict por linha).
+    """
+    cur = conexao().cursor()
+    cur.row_factory = None
+    cur.execute(sql, params)
+    nomes = [d[0] for d in cur.description]
+
+    colunas = [[] for _ in nomes]
+    while True:
+        linhas = cur.fetchmany(lote)
+        if not linhas:
+            break
+        for coluna, valores in zip(colunas, zip(*linhas)):
+            coluna.extend(valores)
+
+    return pd.DataFrame({nome: _serie_tipada(nome, valores) for nome, valores in zip(nomes, colunas)})
+
+
+def texto_celula(valor) -> str:
+    """Valor de um DataFrame tipado para exibição em tabela HTML (NA/NaT -> "")."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ""
+    if isinstance(valor, pd.Timestamp):
+        return valor.strftime("%Y-%m-%d" if valor == valor.normalize() else "%Y-%m-%d %H:%M")
+    return str(valor)
+
+
+@cache_leitura
+def listar_candidatos_df(order_by: str = "id_candidato") -> pd.DataFrame:
+    ordem = _expressao_ordem("candidatos", order_by)
+    return consultar_df(f"SELECT * FROM candidatos ORDER BY {ordem}, id_candidato;")
+
+
+@cache_leitura
+def listar_clientes_df() -> pd.DataFrame:
+    return consultar_df("SELECT * FROM clientes ORDER BY nome_cliente;")
+
+
+@cache_leitura
+def listar_vagas_df() -> pd.DataFrame:
+    return consultar_df(
         """
-        UPDATE acessos
-        SET id_cliente = ?, nome_cliente = ?, id_candidato = ?, nome_usuario = ?,
-            sistema = ?, tipo_acesso = ?, data_inicio = ?, data_fim = ?, status = ?, observacoes = ?
-        WHERE id_acesso = ?
+        SELECT v.*, c.nome_cliente
+        FROM vagas v
+        LEFT JOIN clientes c ON c.id_cliente = v.id_cliente
+        ORDER BY v.id_vaga;
+        """
+    )
+
+
+@cache_leitura
+def listar_acessos_df() -> pd.DataFrame:
+    return consultar_df("SELECT * FROM acessos ORDER BY id_acesso DESC;")
+
+
+# =========================================================
+# BUSCA TEXTUAL (FTS5)
+# =========================================================
+
+# Origem codificada no rowid de busca_texto (ver migração 3).
+ORIGENS_BUSCA = {1: "parecer", 2: "candidato", 3: "vaga"}
+
+# Peso do título (nome / cargo) e do texto no BM25.
+PESOS_BUSCA = (5.0, 1.0)
+
+# snippet() marca os termos com estes caracteres de controle (não aparecem em
+# texto digitado); o trecho é escapado como HTML e só então eles viram <mark>.
+_INICIO_DESTAQUE, _FIM_DESTAQUE = "\x02", "\x03"
+
+
+def _trecho_html(trecho) -> str:
+    """Trecho do snippet() como HTML seguro: texto escapado, só <mark> como tag."""
+    seguro = html.escape(str(trecho or ""))
+    return seguro.replace(_INICIO_DESTAQUE, "<mark>").replace(_FIM_DESTAQUE, "</mark>")
+
+
+def _consulta_fts(consulta: str) -> str:
+    """
+    Converte o texto digitado em uma consulta FTS5 segura: cada palavra vira
+    um prefixo entre aspas ("pala"*), todas obrigatórias.
+    """
+    termos = re.findall(r"\w+", consulta or "")
+    return " ".join(f'"{t}"*' for t in termos)
+
+
+@cache_leitura
+def buscar_texto(consulta: str, origens=None, limite: int = 30) -> list[dict]:
+    """
+    Busca em pareceres (nome, resumo, análise, conclusão), candidatos (nome)
+    e vagas (cargo, descrição). Sem diferenciar acentos nem maiúsculas; cada
+    palavra casa como prefixo. Resultados em ordem de relevância (BM25).
+
+    origens: subconjunto de ("parecer", "candidato", "vaga"); None = todas.
+    Retorna dicts com origem, id, titulo, trecho (HTML escapado, termos em <mark>) e rank.
+    """
+    expr = _consulta_fts(consulta)
+    if not expr:
+        return []
+
+    codigos = [c for c, nome in ORIGENS_BUSCA.items() if origens is None or nome in origens]
+    if not codigos:
+        return []
+
+    cur = conexao().execute(
+        f"""
+        SELECT rowid,
+               titulo,
+               snippet(busca_texto, -1, ?, ?, ' … ', 16) AS trecho,
+               bm25(busca_texto, ?, ?) AS rank
+        FROM busca_texto
+        WHERE busca_texto MATCH ?
+          AND rowid % 4 IN ({", ".join("?" * len(codigos))})
+        ORDER BY rank
+        LIMIT ?;
         """,
-        (
-            id_cliente,
-            nome_cliente,
-            id_candidato,
-            nome_usuario,
-            sistema,
-            tipo_acesso,
-            data_inicio,
-            data_fim,
-            status,
-            observacoes,
-            id_acesso,
-        ),
+        (_INICIO_DESTAQUE, _FIM_DESTAQUE, *PESOS_BUSCA, expr, *codigos, int(limite)),
     )
-    conn.commit()
-    conn.close()
+    return [
+        {
+            "origem": ORIGENS_BUSCA[r["rowid"] % 4],
+            "id": r["rowid"] // 4,
+            "titulo": r["titulo"],
+            "trecho": _trecho_html(r["trecho"]),
+            "rank": r["rank"],
+        }
+        for r in cur.fetchall()
+    ]
+
+
+def buscar_pareceres(consulta: str, limite: int = 50) -> list[dict]:
+    """
+    Pareceres que casam com a busca, do mais relevante para o menos,
+    com as colunas da tabela pareceres + "trecho" destacado.
+    """
+    achados = buscar_texto(consulta, origens=("parecer",), limite=limite)
+    if not achados:
+        return []
+
+    ids = [a["id"] for a in achados]
+    cur = conexao().execute(
+        f"SELECT * FROM pareceres WHERE id_parecer IN ({', '.join('?' * len(ids))});",
+        ids,
+    )
+    por_id = {r["id_parecer"]: dict(r) for r in cur.fetchall()}
+
+    resultado = []
+    for a in achados:
+        row = por_id.get(a["id"])
+        if row:
+            row["trecho"] = a["trecho"]
+            resultado.append(row)
+    return resultado
 
 
 # =========================================================
 # LIMPAR / RESETAR DADOS (se precisar zerar tudo)
 # =========================================================
 
+# Ordem das exclusões: filhas antes das tabelas referenciadas (foreign_keys = ON).
+TABELAS_DADOS_PRINCIPAIS = (
+    "fin_os",
+    "fin_orc",
+    "fin_nf",
+    "tarefas",
+    "pareceres",
+    "vaga_candidato",
+    "acessos",
+    "vagas",
+    "candidatos",
+    "clientes",
+    "status_pipeline",
+)
+
+
+@escrita
+def _apagar_dados_principais():
+    with transacao() as conn:
+        for tabela in TABELAS_DADOS_PRINCIPAIS:
+            conn.execute(f"DELETE FROM {tabela};")
+
+
 def limpar_dados_principais(confirmar: bool = False):
     """
     Apaga dados de candidatos, vagas, vínculos, pareceres, clientes,
-    status_pipeline e acessos.
+    status_pipeline, acessos, financeiro (OS, orçamentos, NFs) e tarefas.
     Use confirmar=True pra não apagar sem querer.
     """
     if not confirmar:
         raise ValueError("Para limpar dados, chame limpar_dados_principais(confirmar=True).")
 
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.executescript(
-        """
-        DELETE FROM pareceres;
-        DELETE FROM vaga_candidato;
-        DELETE FROM vagas;
-        DELETE FROM candidatos;
-        DELETE FROM clientes;
-        DELETE FROM status_pipeline;
-        DELETE FROM acessos;
-        VACUUM;
-        """
-    )
-    conn.commit()
-    conn.close()
+    _apagar_dados_principais()
+    # VACUUM não roda dentro de transação: fica fora do lote do escritor
+    conexao().execute("VACUUM;")
@@ -2,17 +2,18 @@ from datetime import datetime
 
 import streamlit as st
 
+from .arquivos import ConflitoDeVersao
 from .core import (
     carregar_clientes,
     carregar_fin_os,
     registrar_fin_os,
-    LOG_FIN_OS,
+    salvar_fin_os,
     carregar_fin_orc,
     registrar_fin_orc,
-    LOG_FIN_ORC,
+    salvar_fin_orc,
     carregar_fin_nf,
     registrar_fin_nf,
-    LOG_FIN_NF,
+    salvar_fin_nf,
 )
 
 
@@ -30,6 +31,26 @@ def _select_cliente():
     return str(id_cli_sel), op_cli[id_cli_sel]
 
 
+def _moeda(valor) -> str:
+    return "R$ " + f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _resumo_valores(df, por=None):
+    """Total de `valor` (e por `por`) a partir do DataFrame tipado (valor numérico)."""
+    if df.empty:
+        return
+    sem_valor = int(df["valor"].isna().sum())
+    texto = f"**Total:** {_moeda(df['valor'].sum())} em {len(df)} registro(s)"
+    if sem_valor:
+        texto += f" — {sem_valor} sem valor numérico"
+    st.markdown(texto)
+    if por:
+        resumo = df.groupby(por, observed=True)["valor"].agg(["count", "sum"])
+        resumo.columns = ["Quantidade", "Total"]
+        resumo["Total"] = resumo["Total"].map(_moeda)
+        st.dataframe(resumo, use_container_width=True)
+
+
 def run():
     st.header("💼 Financeiro - Alvim Consultoria")
 
@@ -83,6 +104,7 @@ def run():
         st.markdown("---")
         st.subheader("📋 OS cadastradas")
 
+        _resumo_valores(carregar_fin_os(tipado=True), por="status")
         df_os = carregar_fin_os()
         if df_os.empty:
             st.info("Nenhuma OS registrada.")
@@ -98,10 +120,15 @@ def run():
                 key="os_editor",
             )
             if st.button("💾 Salvar alterações das OS"):
+                # o data_editor devolve um DataFrame novo, sem attrs: leva junto a
+                # versão lida para salvar() recusar se outra sessão gravou antes
+                edited_os.attrs["versao"] = df_os.attrs.get("versao")
                 try:
-                    edited_os.to_csv(LOG_FIN_OS, sep=";", index=False, encoding="utf-8")
+                    salvar_fin_os(edited_os)
                     st.success("OS atualizadas com sucesso!")
                     st.rerun()
+                except ConflitoDeVersao as e:
+                    st.error(str(e))
                 except Exception as e:
                     st.error(f"Erro ao salvar OS: {e}")
 
@@ -147,6 +174,7 @@ def run():
         st.markdown("---")
         st.subheader("📋 Orçamentos registrados")
 
+        _resumo_valores(carregar_fin_orc(tipado=True), por="status")
         df_orc = carregar_fin_orc()
         if df_orc.empty:
             st.info("Nenhum orçamento registrado.")
@@ -162,10 +190,13 @@ def run():
                 key="orc_editor",
             )
             if st.button("💾 Salvar alterações dos orçamentos"):
+                edited_orc.attrs["versao"] = df_orc.attrs.get("versao")
                 try:
-                    edited_orc.to_csv(LOG_FIN_ORC, sep=";", index=False, encoding="utf-8")
+                    salvar_fin_orc(edited_orc)
                     st.success("Orçamentos atualizados com sucesso!")
                     st.rerun()
+                except ConflitoDeVersao as e:
+                    st.error(str(e))
                 except Exception as e:
                     st.error(f"Erro ao salvar orçamentos: {e}")
 
@@ -205,6 +236,7 @@ def run():
         st.markdown("---")
         st.subheader("📋 Notas Fiscais registradas")
 
+        _resumo_valores(carregar_fin_nf(tipado=True), por=None)
         df_nf = carregar_fin_nf()
         if df_nf.empty:
             st.info("Nenhuma NF registrada.")
@@ -220,9 +252,12 @@ def run():
                 key="nf_editor",
             )
             if st.button("💾 Salvar alterações das NFs"):
+                edited_nf.attrs["versao"] = df_nf.attrs.get("versao")
                 try:
-                    edited_nf.to_csv(LOG_FIN_NF, sep=";", index=False, encoding="utf-8")
+                    salvar_fin_nf(edited_nf)
                     st.success("Notas fiscais atualizadas com sucesso!")
                     st.rerun()
+                except ConflitoDeVersao as e:
+                    st.error(str(e))
                 except Exception as e:
                     st.error(f"Erro ao salvar NFs: {e}")
\ No newline at end of file
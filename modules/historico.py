@@ -1,31 +1,89 @@
 import os
+
+import pandas as pd
 import streamlit as st
 
 from .core import carregar_pareceres_log
 
+try:
+    from .database import buscar_pareceres
+except Exception:
+    buscar_pareceres = None
+
+
+def _busca_indexada(filtro):
+    """
+    Busca no índice FTS do banco (sem acento, por prefixo, ordenada por relevância).
+    Retorna None se o banco/índice não estiver disponível.
+    """
+    if buscar_pareceres is None:
+        return None
+    try:
+        achados = buscar_pareceres(filtro, limite=200)
+    except Exception:
+        return None
+    df = pd.DataFrame(achados).fillna("")
+    if not df.empty:
+        df = df.rename(columns={"nome_candidato": "nome"})
+    return df
+
+
+# o que a lista mostra: os textos longos só são lidos na busca simples
+COLUNAS_LISTA = [
+    "data_hora", "cliente", "cargo", "nome", "pretensao", "formato", "id_candidato",
+    "status_etapa", "status_contratacao", "motivo_decline", "caminho_arquivo",
+]
+
+
+def _filtrar(df, filtro):
+    if filtro.strip():
+        f = filtro.strip().lower()
+        df = df[
+            df["nome"].str.lower().str.contains(f)
+            | df["cliente"].str.lower().str.contains(f)
+            | df["cargo"].str.lower().str.contains(f)
+        ]
+    return df.sort_values("data_hora", ascending=False)
+
 
 def run():
     st.header("📁 Histórico de Pareceres")
 
-    df = carregar_pareceres_log()
+    df = carregar_pareceres_log(colunas=COLUNAS_LISTA)
     if df.empty:
         st.info("Nenhum parecer registrado ainda.")
         return
 
     filtro = st.text_input("Filtrar por candidato, cliente ou cargo:")
+    busca = st.text_input("Buscar no conteúdo do parecer (nome, resumo, análise, conclusão):")
 
-    df_view = df.copy()
-    if filtro.strip():
-        f = filtro.strip().lower()
-        df_view = df_view[
-            df_view["nome"].str.lower().str.contains(f)
-            | df_view["cliente"].str.lower().str.contains(f)
-            | df_view["cargo"].str.lower().str.contains(f)
-        ]
+    df_view = _filtrar(df, filtro)
+
+    if busca.strip():
+        achados = _busca_indexada(busca.strip())
+        if achados is None:
+            st.warning("Busca indexada indisponível; usando busca simples.")
+            df_view = _filtrar(carregar_pareceres_log(), filtro)
+            b = busca.strip().lower()
+            colunas = [c for c in ("nome", "resumo_profissional", "analise_perfil", "conclusao_texto") if c in df_view]
+            mask = df_view[colunas[0]].str.lower().str.contains(b, regex=False)
+            for c in colunas[1:]:
+                mask |= df_view[c].str.lower().str.contains(b, regex=False)
+            df_view = df_view[mask]
+        else:
+            # já vem por relevância; mantém o filtro de candidato/cliente/cargo
+            if filtro.strip() and not achados.empty:
+                f = filtro.strip().lower()
+                achados = achados[
+                    achados["nome"].str.lower().str.contains(f)
+                    | achados["cliente"].str.lower().str.contains(f)
+                    | achados["cargo"].str.lower().str.contains(f)
+                ]
+            df_view = achados
 
     st.write(f"Total de pareceres encontrados: {len(df_view)}")
 
-    for _, row in df_view.sort_values("data_hora", ascending=False).iterrows():
+    for _, row in df_view.iterrows():
         st.markdown(
             f"""
 **Data/Hora:** {row['data_hora']}  
@@ -41,6 +99,10 @@ def run():
 **Arquivo:** `{row['caminho_arquivo']}`
 """
         )
+        if row.get("trecho"):
+            # já vem escapado de buscar_texto: a única tag é <mark>
+            trecho = " ".join(str(row["trecho"]).split())
+            st.markdown(f"> {trecho}", unsafe_allow_html=True)
         arq = row["caminho_arquivo"]
         if isinstance(arq, str) and os.path.exists(arq):
             with open(arq, "rb") as f:
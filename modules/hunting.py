@@ -4,9 +4,8 @@ from datetime import datetime
 import streamlit as st
 
 from .core import (
-    carregar_candidatos,
     registrar_candidato,
-    LOG_CAND,
+    atualizar_linkedin_candidato,
 )
 
 
@@ -188,10 +187,6 @@ Você teria alguns minutos para conversarmos?"""
                 data_cadastro=data_cad,
             )
 
-            df = carregar_candidatos()
-            mask = df["id_candidato"] == str(novo_id)
-            if mask.any():
-                df.loc[mask, "linkedin"] = linkedin_cad
-                df.to_csv(LOG_CAND, sep=";", index=False, encoding="utf-8")
+            atualizar_linkedin_candidato(novo_id, linkedin_cad)
 
             st.success(f"Candidato cadastrado com ID {novo_id}.")
@@ -3,57 +3,22 @@ import streamlit as st
 
 from .core import (
     BASE_DIR,
-    parse_parecer_pdf_arquivo,
     carregar_pareceres_log,
-    registrar_parecer_log,
-    get_or_create_candidato_por_nome_localidade,
-    inferir_nome_data_de_arquivo,
 )
+from .painel_tarefas import acompanhar_tarefa
+from .tarefas import enfileirar, resultado_tarefa
 
 
-def _importar_um_pdf(caminho: str):
-    """Lê um PDF de parecer, extrai campos e registra no histórico/candidatos."""
-    parsed = parse_parecer_pdf_arquivo(caminho)
-    nome = parsed["nome"]
-    cliente = parsed["cliente"]
-    cargo = parsed["cargo"]
-    localidade = parsed["localidade"]
-    idade = parsed["idade"]
-    pretensao = parsed["pretensao"]
-    linkedin = parsed["linkedin"]
-    resumo_prof = parsed["resumo_profissional"]
-    analise_prof = parsed["analise_perfil"]
-    conclusao_txt = parsed["conclusao_texto"]
-
-    data_hora = ""
-    nome, data_hora = inferir_nome_data_de_arquivo(caminho, nome, data_hora)
-
-    id_candidato = get_or_create_candidato_por_nome_localidade(
-        nome=nome,
-        localidade=localidade,
-        idade=idade,
-        data_hora=data_hora,
-    )
-
-    registrar_parecer_log(
-        data_hora=data_hora,
-        cliente=cliente,
-        cargo=cargo,
-        nome=nome,
-        localidade=localidade,
-        idade=idade,
-        pretensao=pretensao,
-        linkedin=linkedin,
-        resumo_profissional=resumo_prof,
-        analise_perfil=analise_prof,
-        conclusao_texto=conclusao_txt,
-        formato="PDF",
-        caminho_arquivo=caminho,
-        id_candidato=id_candidato,
-        status_etapa="Em avaliação",
-        status_contratacao="Pendente",
-        motivo_decline="",
-    )
+def _resultado_importacao(chave: str):
+    """Painel da última importação enfileirada nesta sessão (e o resumo quando termina)."""
+    id_tarefa = st.session_state.get(chave)
+    if not id_tarefa:
+        return
+    tarefa = acompanhar_tarefa(id_tarefa)
+    if tarefa and tarefa["status"] == "concluida":
+        for erro in resultado_tarefa(tarefa).get("erros", []):
+            st.warning(f"{os.path.basename(erro['arquivo'])}: {erro['erro']}")
+        st.info("Verifique o Histórico e o Pipeline.")
 
 
 def run():
@@ -86,19 +51,21 @@ def run():
                 dest_dir = os.path.join(BASE_DIR, "importados_upload")
                 os.makedirs(dest_dir, exist_ok=True)
 
+                caminhos = []
                 for f in uploaded_files:
                     dest_path = os.path.join(dest_dir, f.name)
                     # salva arquivo no servidor
                     with open(dest_path, "wb") as out:
                         out.write(f.read())
+                    caminhos.append(dest_path)
 
-                    # importa esse PDF
-                    _importar_um_pdf(dest_path)
-
-                st.success("Importação concluída a partir dos PDFs enviados! Verifique o Histórico e o Pipeline.")
+                # a leitura e o registro rodam num trabalhador (modules.tarefas)
+                st.session_state["imp_tarefa_upload"] = enfileirar("importar_pareceres", caminhos=caminhos)
             except Exception as e:
                 st.error(f"Erro ao importar PDFs enviados: {e}")
 
+    _resultado_importacao("imp_tarefa_upload")
+
     st.markdown("---")
 
     # ============================================
@@ -120,7 +87,7 @@ def run():
             st.error("Pasta inválida.")
             st.session_state["pdfs_para_importar"] = []
         else:
-            df_atual = carregar_pareceres_log()
+            df_atual = carregar_pareceres_log(colunas=["caminho_arquivo"])
             caminhos_existentes = set(df_atual["caminho_arquivo"].tolist()) if not df_atual.empty else set()
 
             pdfs = []
@@ -141,12 +108,12 @@ def run():
 
         if st.button("📥 Importar PDFs listados (servidor)", key="imp_btn_importar_pasta"):
             try:
-                for caminho in pdfs_encontrados:
-                    _importar_um_pdf(caminho)
-
+                st.session_state["imp_tarefa_pasta"] = enfileirar("importar_pareceres", caminhos=list(pdfs_encontrados))
                 st.session_state["pdfs_para_importar"] = []
-                st.success("Importação concluída a partir da pasta do servidor! Verifique o Histórico e o Pipeline.")
+                st.rerun()
             except Exception as e:
                 st.error(f"Erro ao importar PDFs da pasta: {e}")
     else:
         st.info("Nenhum PDF novo listado na pasta do servidor (ou você ainda não clicou em 'Listar PDFs').")
+
+    _resultado_importacao("imp_tarefa_pasta")
@@ -0,0 +1,196 @@
+# modules/lote_pareceres.py
+# Pareceres em lote: todos os candidatos de uma vaga (ou os vínculos
+# escolhidos) renderizados em paralelo, um processo por núcleo, e entregues
+# num único ZIP. Não importa streamlit: os processos filhos só carregam o
+# necessário para gerar PDF/DOCX.
+import io
+import os
+import re
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from .cache_pareceres import gerar_parecer
+from .database import consultar_df, texto_celula
+from .renderizacao import CAMPOS_PARECER
+
+# Abaixo disso não compensa subir processos (cada um importa reportlab/pandas).
+MIN_ITENS_PROCESSOS = 4
+
+
+# =========================
+# DADOS DO LOTE
+# =========================
+
+def registros_para_lote(id_vaga: int, ids_candidatos=None) -> list[dict]:
+    """
+    Um registro por vínculo da vaga (ou só dos ids_candidatos informados), com os
+    campos do parecer. Os textos vêm do último parecer registrado para o mesmo
+    vínculo; sem parecer anterior, saem em branco.
+    """
+    df = consultar_df(
+        """
+        SELECT
+            vc.id_vaga,
+            vc.id_candidato,
+            COALESCE(cli.nome_cliente, p.cliente, '') AS cliente,
+            COALESCE(v.cargo, p.cargo, '')            AS cargo,
+            c.nome                                    AS nome,
+            COALESCE(c.cidade, p.localidade, '')      AS localidade,
+            COALESCE(c.idade, p.idade, '')            AS idade,
+            COALESCE(c.pretensao, p.pretensao, '')    AS pretensao,
+            COALESCE(c.linkedin, p.linkedin, '')      AS linkedin,
+            COALESCE(p.resumo_profissional, '')       AS resumo_profissional,
+            COALESCE(p.analise_perfil, '')            AS analise_perfil,
+            COALESCE(p.conclusao_texto, '')           AS conclusao_texto,
+            COALESCE(c.caminho_cv, '')                AS caminho_cv
+        FROM vaga_candidato vc
+        JOIN candidatos c ON c.id_candidato = vc.id_candidato
+        JOIN vagas v      ON v.id_vaga      = vc.id_vaga
+        LEFT JOIN clientes cli ON cli.id_cliente = v.id_cliente
+        LEFT JOIN pareceres p ON p.id_parecer = (
+            SELECT MAX(p2.id_parecer) FROM pareceres p2
+            WHERE p2.id_vaga = vc.id_vaga AND p2.id_candidato = vc.id_candidato
+        )
+        WHERE vc.id_vaga = ?
+        ORDER BY c.nome;
+        """,
+        (int(id_vaga),),
+    )
+    if ids_candidatos is not None:
+        df = df[df["id_candidato"].isin([int(i) for i in ids_candidatos])]
+
+    registros = []
+    for linha in df.to_dict("records"):
+        registro = {c: texto_celula(linha.get(c)) for c in CAMPOS_PARECER}
+        registro["id_vaga"] = int(linha["id_vaga"])
+        registro["id_candidato"] = int(linha["id_candidato"])
+        registro["caminho_cv"] = texto_celula(linha.get("caminho_cv"))
+        registros.append(registro)
+    return registros
+
+
+def _nome_arquivo(registro: dict, formato: str) -> str:
+    nome = re.sub(r"[^\w\-]+", "_", registro.get("nome") or "Candidato").strip("_") or "Candidato"
+    sufixo = f"_{registro['id_candidato']}" if registro.get("id_candidato") else ""
+    return f"Parecer_{nome}{sufixo}.{formato.lower()}"
+
+
+# =========================
+# RENDERIZAÇÃO (processo filho)
+# =========================
+
+def _renderizar_item(indice: int, registro: dict, formato: str, anexar_cv: bool) -> dict:
+    """Gera um parecer; erros voltam no resultado em vez de derrubar o lote."""
+    resultado = {
+        "indice": indice,
+        "nome": registro.get("nome", ""),
+        "arquivo": _nome_arquivo(registro, formato),
+        "dados": None,
+        "erro": "",
+        "aviso": "",
+    }
+    anexos = []
+    cv = registro.get("caminho_cv") or ""
+    if formato == "PDF" and anexar_cv and cv:
+        if os.path.isfile(cv):
+            anexos.append(cv)
+        else:
+            resultado["aviso"] = f"CV não anexado: Currículo não encontrado: {cv}"
+
+    def falhou(fonte, e):
+        resultado["aviso"] = f"CV não anexado: {e}"
+
+    try:
+        # pareceres que não mudaram desde o último lote saem prontos do cache
+        caminho, _, _ = gerar_parecer(registro, formato, anexos, ao_falhar=falhou)
+        with open(caminho, "rb") as f:
+            resultado["dados"] = f.read()
+    except Exception as e:
+        resultado["erro"] = str(e)
+    return resultado
+
+
+def _processos(total: int, processos=None) -> int:
+    if multiprocessing.current_process().daemon:
+        # dentro de um trabalhador da fila (processo daemon) não se pode subir filhos
+        return 1
+    if processos is None:
+        processos = os.cpu_count() or 1
+    return max(1, min(processos, total))
+
+
+def _executar(registros, formato, anexar_cv, processos):
+    """Gera os resultados na ordem em que ficam prontos."""
+    n = _processos(len(registros), processos)
+    if n == 1 or len(registros) < MIN_ITENS_PROCESSOS:
+        for i, registro in enumerate(registros):
+            yield _renderizar_item(i, registro, formato, anexar_cv)
+        return
+
+    feitos = set()
+    try:
+        # spawn: o servidor do Streamlit tem várias threads (sessões, escritor do
+        # banco) e um fork no meio delas pode herdar travas ocupadas
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n, mp_context=contexto) as pool:
+            futuros = [
+                pool.submit(_renderizar_item, i, registro, formato, anexar_cv)
+                for i, registro in enumerate(registros)
+            ]
+            for futuro in as_completed(futuros):
+                resultado = futuro.result()
+                feitos.add(resultado["indice"])
+                yield resultado
+    except (BrokenProcessPool, OSError):
+        # sem processos disponíveis: termina o que faltou aqui mesmo
+        for i, registro in enumerate(registros):
+            if i not in feitos:
+                yield _renderizar_item(i, registro, formato, anexar_cv)
+
+
+# =========================
+# LOTE -> ZIP
+# =========================
+
+def gerar_lote_zip(registros, formato: str = "PDF", anexar_cv: bool = True,
+                   ao_progredir=None, processos=None) -> tuple[bytes, list[dict]]:
+    """
+    Gera o parecer de cada registro (PDF ou DOCX, CV do candidato anexado ao PDF)
+    em paralelo e devolve (bytes do ZIP, resultados). Cada resultado tem nome,
+    arquivo, erro e aviso (sem os bytes). ao_progredir(feitos, total, resultado)
+    é chamada a cada parecer concluído. Itens com erro ficam fora do ZIP e são
+    listados em erros.txt.
+    """
+    registros = list(registros)
+    formato = formato.upper()
+    total = len(registros)
+    resultados = [None] * total
+    nomes_usados = set()
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for feitos, resultado in enumerate(_executar(registros, formato, anexar_cv, processos), start=1):
+            dados = resultado.pop("dados")
+            if dados is not None:
+                arquivo = resultado["arquivo"]
+                base, ext = os.path.splitext(arquivo)
+                n = 2
+                while arquivo in nomes_usados:
+                    arquivo = f"{base}_{n}{ext}"
+                    n += 1
+                nomes_usados.add(arquivo)
+                resultado["arquivo"] = arquivo
+                zf.writestr(arquivo, dados)
+            resultados[resultado["indice"]] = resultado
+            if ao_progredir is not None:
+                ao_progredir(feitos, total, resultado)
+
+        problemas = [r for r in resultados if r["erro"] or r["aviso"]]
+        if problemas:
+            zf.writestr("erros.txt", "\n".join(
+                f"{r['nome'] or '(sem nome)'}: {r['erro'] or r['aviso']}" for r in problemas
+            ))
+
+    return buffer.getvalue(), resultados
@@ -0,0 +1,58 @@
+# modules/painel_tarefas.py
+# Acompanhamento, na tela, das tarefas em segundo plano (modules.tarefas).
+import streamlit as st
+
+from .tarefas import FINAIS, garantir_trabalhadores, obter_tarefa
+
+ROTULOS_STATUS = {
+    "pendente": "⏳ Na fila",
+    "executando": "⚙️ Em execução",
+    "concluida": "✅ Concluída",
+    "erro": "❌ Erro",
+}
+
+
+def _exibir(tarefa: dict):
+    rotulo = ROTULOS_STATUS.get(tarefa["status"], tarefa["status"])
+    texto = f"Tarefa {tarefa['id_tarefa']} — {rotulo}"
+    if tarefa.get("mensagem"):
+        texto += f": {tarefa['mensagem']}"
+    if tarefa["status"] == "erro":
+        st.error(texto)
+    elif tarefa["status"] == "concluida":
+        st.success(texto)
+    else:
+        st.progress(float(tarefa.get("progresso") or 0.0), text=texto)
+
+
+def acompanhar_tarefa(id_tarefa: int, intervalo: float = 1.0) -> dict | None:
+    """
+    Mostra status e progresso da tarefa. Enquanto não termina, o painel se
+    atualiza sozinho (só ele, não a página) e, ao terminar, recarrega a página
+    para quem chamou tratar o resultado. Retorna a tarefa como está agora.
+    """
+    tarefa = obter_tarefa(id_tarefa)
+    if tarefa is None:
+        return None
+    if tarefa["status"] in FINAIS:
+        _exibir(tarefa)
+        return tarefa
+
+    # tarefa na fila depois de um reinício do servidor: sobe trabalhadores de novo
+    garantir_trabalhadores()
+
+    fragmento = getattr(st, "fragment", None)
+    if fragmento is None:
+        _exibir(tarefa)
+        st.button("🔄 Atualizar", key=f"tarefa_atualizar_{id_tarefa}")
+        return tarefa
+
+    @fragmento(run_every=intervalo)
+    def _painel():
+        atual = obter_tarefa(id_tarefa)
+        _exibir(atual)
+        if atual["status"] in FINAIS:
+            st.rerun()
+
+    _painel()
+    return tarefa
@@ -1,35 +1,31 @@
 import os
 from datetime import datetime
 
-import pandas as pd
 import streamlit as st
 
-from .core import (
-    BASE_DIR,
-    build_parecer_pdf_to_bytes,
-    build_parecer_docx_to_bytes,
-    merge_pdfs_bytes,
-    registrar_parecer_log,
-    gerar_campos_via_openai,
-    extract_text_from_pdf,
-)
+from .core import BASE_DIR
 from .database import (
-    get_conn,
+    consultar_df,
     obter_candidato,
-    registrar_parecer_db,
+    texto_celula,
 )
+from .painel_tarefas import acompanhar_tarefa
+from .tarefas import enfileirar, guardar_entrada, resultado_tarefa
+
+MIMES = {
+    "PDF": "application/pdf",
+    "DOCX": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
 
 
 def _carregar_vinculos_para_parecer():
     """
-    Retorna lista de dicts com:
+    Retorna DataFrame com:
     id_vaga, id_candidato, nome_candidato, cidade, idade, linkedin, pretensao,
     cargo_vaga, nome_cliente, status_vaga
     Apenas vagas Aberta / Em andamento.
     """
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
+    return consultar_df(
         """
         SELECT
             vc.id_vaga,
@@ -50,9 +46,76 @@ def _carregar_vinculos_para_parecer():
         ORDER BY cli.nome_cliente, v.cargo, c.nome;
         """
     )
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+
+
+def _secao_lote(df_v):
+    """Pareceres de vários candidatos de uma vaga de uma vez, num ZIP."""
+    with st.expander("📦 Pareceres em lote (vaga inteira ou candidatos escolhidos)", expanded=False):
+        vagas = (
+            df_v.drop_duplicates("id_vaga")
+            .set_index("id_vaga")
+            .apply(lambda r: f"[{r['nome_cliente'] or '-'}] {r['cargo_vaga']}", axis=1)
+            .to_dict()
+        )
+        id_vaga = st.selectbox(
+            "Vaga:",
+            list(vagas.keys()),
+            format_func=lambda x: vagas[x],
+            key="lote_vaga_sel",
+        )
+        cands = df_v[df_v["id_vaga"] == id_vaga]
+        nomes = dict(zip(cands["id_candidato"], cands["nome_candidato"]))
+        ids_sel = st.multiselect(
+            "Candidatos (todos por padrão):",
+            list(nomes.keys()),
+            default=list(nomes.keys()),
+            format_func=lambda x: nomes[x],
+            key=f"lote_cands_{id_vaga}",
+        )
+        col_f, col_cv = st.columns(2)
+        with col_f:
+            formato_lote = st.radio("Formato", ["PDF", "DOCX"], index=0, key="lote_formato", horizontal=True)
+        with col_cv:
+            anexar_cv = st.checkbox("Anexar CV do candidato (PDF)", value=True, key="lote_anexar_cv")
+        st.caption("Os textos vêm do último parecer registrado de cada candidato nesta vaga.")
+
+        if st.button("📦 Gerar pareceres em lote"):
+            if not ids_sel:
+                st.warning("Selecione ao menos um candidato.")
+                return
+            try:
+                # renderização e ZIP rodam num trabalhador (modules.tarefas)
+                st.session_state["parecer_tarefa_lote"] = enfileirar(
+                    "lote_pareceres",
+                    id_vaga=int(id_vaga),
+                    ids_candidatos=[int(i) for i in ids_sel],
+                    formato=formato_lote,
+                    anexar_cv=bool(anexar_cv),
+                )
+            except Exception as e:
+                st.error(f"Erro ao gerar lote: {e}")
+                return
+
+        id_tarefa = st.session_state.get("parecer_tarefa_lote")
+        if id_tarefa:
+            tarefa = acompanhar_tarefa(id_tarefa)
+            if tarefa and tarefa["status"] == "concluida":
+                resultado = resultado_tarefa(tarefa)
+                for r in resultado.get("resultados", []):
+                    if r["erro"]:
+                        st.error(f"{r['nome']}: {r['erro']}")
+                    elif r["aviso"]:
+                        st.warning(f"{r['nome']}: {r['aviso']}")
+                caminho_zip = resultado.get("caminho") or ""
+                if os.path.isfile(caminho_zip):
+                    with open(caminho_zip, "rb") as f:
+                        st.download_button(
+                            "⬇️ Baixar ZIP",
+                            data=f,
+                            file_name=os.path.basename(caminho_zip),
+                            mime="application/zip",
+                            key=f"lote_download_{id_tarefa}",
+                        )
 
 
 def run():
@@ -81,22 +144,20 @@ def run():
     # =========================
     st.subheader("Vincular a uma vaga e candidato")
 
-    vinculos = _carregar_vinculos_para_parecer()
-    if not vinculos:
+    df_v = _carregar_vinculos_para_parecer()
+    if df_v.empty:
         st.info(
             "Nenhuma vaga em andamento com candidatos vinculados. "
             "Vincule candidatos às vagas em **Vagas > Vincular candidatos**."
         )
     else:
-        df_v = pd.DataFrame(vinculos).fillna("")
-        opcoes = {}
-        for _, r in df_v.iterrows():
-            chave = f"{int(r['id_vaga'])}|{int(r['id_candidato'])}"
-            label = (
-                f"[{r.get('nome_cliente','-')}] "
-                f"{r['cargo_vaga']}  —  {r['nome_candidato']}"
+        opcoes = {
+            f"{int(id_vaga)}|{int(id_cand)}": f"[{cli or '-'}] {cargo}  —  {nome}"
+            for id_vaga, id_cand, cli, cargo, nome in zip(
+                df_v["id_vaga"], df_v["id_candidato"], df_v["nome_cliente"],
+                df_v["cargo_vaga"], df_v["nome_candidato"],
             )
-            opcoes[chave] = label
+        }
 
         chave_sel = st.selectbox(
             "Selecione vaga + candidato:",
@@ -118,7 +179,7 @@ def run():
             st.session_state["cargo"] = linha.get("cargo_vaga", "")
             st.session_state["nome"] = linha.get("nome_candidato", "")
             st.session_state["localidade"] = linha.get("cidade_candidato", "")
-            st.session_state["idade"] = str(linha.get("idade_candidato") or "")
+            st.session_state["idade"] = texto_celula(linha.get("idade_candidato"))
             st.session_state["pretensao"] = linha.get("pretensao_candidato", "")
             st.session_state["linkedin"] = linha.get("linkedin_candidato", "")
 
@@ -127,6 +188,8 @@ def run():
 
             st.success("Dados do vínculo carregados para o parecer.")
 
+        _secao_lote(df_v)
+
     st.markdown("---")
 
     # =========================
@@ -160,21 +223,24 @@ def run():
                 st.warning("Envie um PDF ou escreva observações para usar a IA.")
             else:
                 try:
-                    texto_pdf = extract_text_from_pdf(uploaded_pdf) if uploaded_pdf else ""
-                    texto_base = (texto_pdf or "") + "\n\n" + (obs_ia or "")
-                    nome_ai, resumo_ai, analise_ai, concl_ai = gerar_campos_via_openai(texto_base)
-                    if nome_ai:
-                        st.session_state["nome"] = nome_ai
-                    if resumo_ai:
-                        st.session_state["resumo_profissional"] = resumo_ai
-                    if analise_ai:
-                        st.session_state["analise_perfil"] = analise_ai
-                    if concl_ai:
-                        st.session_state["conclusao_texto"] = concl_ai
-                    st.success("Campos preenchidos pela IA.")
+                    caminho_pdf = guardar_entrada(uploaded_pdf.name, uploaded_pdf.getvalue()) if uploaded_pdf else ""
+                    st.session_state["parecer_tarefa_ia"] = enfileirar(
+                        "preencher_ia", caminho_pdf=caminho_pdf, observacoes=obs_ia or "",
+                    )
                 except Exception as e:
                     st.error(f"Erro ao usar IA: {e}")
 
+        id_tarefa_ia = st.session_state.get("parecer_tarefa_ia")
+        if id_tarefa_ia:
+            tarefa = acompanhar_tarefa(id_tarefa_ia)
+            if tarefa and tarefa["status"] == "concluida" and st.session_state.get("parecer_ia_aplicada") != id_tarefa_ia:
+                # aplica uma vez só (antes dos campos do formulário serem desenhados)
+                campos_ai = resultado_tarefa(tarefa)
+                for campo in ("nome", "resumo_profissional", "analise_perfil", "conclusao_texto"):
+                    if campos_ai.get(campo):
+                        st.session_state[campo] = campos_ai[campo]
+                st.session_state["parecer_ia_aplicada"] = id_tarefa_ia
+
     st.markdown("---")
 
     # =========================
@@ -247,7 +313,6 @@ def run():
             return
 
         try:
-            os.makedirs(output_folder, exist_ok=True)
             data_hora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
             cliente = st.session_state["cliente"]
@@ -266,159 +331,62 @@ def run():
             # =========================
             # Gera o parecer (PDF/DOCX)
             # =========================
+            registro = {
+                "cliente": cliente,
+                "cargo": cargo,
+                "nome": nome,
+                "localidade": localidade,
+                "idade": idade,
+                "pretensao": pretensao,
+                "resumo_profissional": resumo_prof,
+                "analise_perfil": analise_prof,
+                "conclusao_texto": conclusao_txt,
+                "linkedin": linkedin,
+            }
+
+            # Anexos (só no PDF): CV do candidato (se existir em banco) e CV extra escolhido
+            anexos = []
             if formato == "PDF":
-                parecer_bytes = build_parecer_pdf_to_bytes(
-                    cliente,
-                    cargo,
-                    nome,
-                    localidade,
-                    idade,
-                    pretensao,
-                    resumo_prof,
-                    analise_prof,
-                    conclusao_txt,
-                    linkedin,
-                )
-
-                # 1) Anexa CV do candidato (se existir em banco)
                 if id_cand_log:
                     cand = obter_candidato(int(id_cand_log))
                     if cand:
                         cv_path = cand.get("caminho_cv") or ""
                         if cv_path and os.path.isfile(cv_path):
-                            try:
-                                parecer_bytes = merge_pdfs_bytes(parecer_bytes, cv_path)
-                            except Exception as e:
-                                st.warning(f"Não foi possível anexar o CV do candidato: {e}")
-
-                # 2) Anexa CV extra escolhido (opcional)
+                            anexos.append(cv_path)
                 if selected_cv_extra != "(Não anexar)":
-                    resume_path = os.path.join(pasta_cv_extra, selected_cv_extra)
-                    try:
-                        parecer_bytes = merge_pdfs_bytes(parecer_bytes, resume_path)
-                    except Exception as e:
-                        st.warning(f"Não foi possível anexar o CV adicional: {e}")
-
-                filename = nome_base + ".pdf"
-                caminho_final = os.path.join(output_folder, filename)
-                with open(caminho_final, "wb") as f:
-                    f.write(parecer_bytes)
-
-                # CSV (histórico antigo)
-                registrar_parecer_log(
-                    data_hora=data_hora,
-                    cliente=cliente,
-                    cargo=cargo,
-                    nome=nome,
-                    localidade=localidade,
-                    idade=idade,
-                    pretensao=pretensao,
-                    linkedin=linkedin,
-                    resumo_profissional=resumo_prof,
-                    analise_perfil=analise_prof,
-                    conclusao_texto=conclusao_txt,
-                    formato="PDF",
-                    caminho_arquivo=caminho_final,
-                    id_candidato=str(id_cand_log or ""),
-                    status_etapa="Em avaliação",
-                    status_contratacao="Pendente",
-                    motivo_decline="",
-                )
-
-                # Banco de dados (novo oficial)
-                registrar_parecer_db(
-                    id_vaga=int(id_vaga_log) if id_vaga_log else None,
-                    id_candidato=int(id_cand_log) if id_cand_log else None,
-                    cliente=cliente,
-                    cargo=cargo,
-                    nome=nome,
-                    localidade=localidade,
-                    idade=idade,
-                    pretensao=pretensao,
-                    linkedin=linkedin,
-                    resumo_prof=resumo_prof,
-                    analise_prof=analise_prof,
-                    conclusao_txt=conclusao_txt,
-                    formato="PDF",
-                    caminho_arquivo=caminho_final,
-                    status_etapa="Em avaliação",
-                    status_contratacao="Pendente",
-                    motivo_decline="",
-                )
-
-                st.success(f"Parecer gerado: {caminho_final}")
-                st.download_button(
-                    "⬇️ Baixar PDF",
-                    data=parecer_bytes,
-                    file_name=filename,
-                    mime="application/pdf",
-                )
-
-            else:  # DOCX
-                parecer_bytes = build_parecer_docx_to_bytes(
-                    cliente,
-                    cargo,
-                    nome,
-                    localidade,
-                    idade,
-                    pretensao,
-                    resumo_prof,
-                    analise_prof,
-                    conclusao_txt,
-                    linkedin,
-                )
-                filename = nome_base + ".docx"
-                caminho_final = os.path.join(output_folder, filename)
-                with open(caminho_final, "wb") as f:
-                    f.write(parecer_bytes)
-
-                registrar_parecer_log(
-                    data_hora=data_hora,
-                    cliente=cliente,
-                    cargo=cargo,
-                    nome=nome,
-                    localidade=localidade,
-                    idade=idade,
-                    pretensao=pretensao,
-                    linkedin=linkedin,
-                    resumo_profissional=resumo_prof,
-                    analise_perfil=analise_prof,
-                    conclusao_texto=conclusao_txt,
-                    formato="DOCX",
-                    caminho_arquivo=caminho_final,
-                    id_candidato=str(id_cand_log or ""),
-                    status_etapa="Em avaliação",
-                    status_contratacao="Pendente",
-                    motivo_decline="",
-                )
-
-                registrar_parecer_db(
-                    id_vaga=int(id_vaga_log) if id_vaga_log else None,
-                    id_candidato=int(id_cand_log) if id_cand_log else None,
-                    cliente=cliente,
-                    cargo=cargo,
-                    nome=nome,
-                    localidade=localidade,
-                    idade=idade,
-                    pretensao=pretensao,
-                    linkedin=linkedin,
-                    resumo_prof=resumo_prof,
-                    analise_prof=analise_prof,
-                    conclusao_txt=conclusao_txt,
-                    formato="DOCX",
-                    caminho_arquivo=caminho_final,
-                    status_etapa="Em avaliação",
-                    status_contratacao="Pendente",
-                    motivo_decline="",
-                )
-
-                st.success(f"Parecer gerado: {caminho_final}")
-                st.download_button(
-                    "⬇️ Baixar DOCX",
-                    data=parecer_bytes,
-                    file_name=filename,
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                )
-
+                    anexos.append(os.path.join(pasta_cv_extra, selected_cv_extra))
+
+            # geração, gravação e histórico rodam num trabalhador (modules.tarefas)
+            st.session_state["parecer_tarefa"] = enfileirar(
+                "parecer",
+                registro=registro,
+                formato=formato,
+                anexos=anexos,
+                pasta_saida=output_folder,
+                nome_base=nome_base,
+                data_hora=data_hora,
+                id_vaga=id_vaga_log,
+                id_candidato=id_cand_log,
+            )
         except Exception as e:
             st.error(f"Erro ao gerar parecer: {e}")
+
+    id_tarefa = st.session_state.get("parecer_tarefa")
+    if id_tarefa:
+        tarefa = acompanhar_tarefa(id_tarefa)
+        if tarefa and tarefa["status"] == "concluida":
+            resultado = resultado_tarefa(tarefa)
+            for aviso in resultado.get("avisos", []):
+                st.warning(aviso)
+            caminho_final = resultado.get("caminho") or ""
+            if os.path.isfile(caminho_final):
+                st.caption(caminho_final)
+                formato_final = os.path.splitext(caminho_final)[1].lstrip(".").upper()
+                with open(caminho_final, "rb") as f:
+                    st.download_button(
+                        f"⬇️ Baixar {formato_final}",
+                        data=f,
+                        file_name=os.path.basename(caminho_final),
+                        mime=MIMES.get(formato_final, "application/octet-stream"),
+                        key=f"parecer_download_{id_tarefa}",
+                    )
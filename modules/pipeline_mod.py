@@ -6,12 +6,14 @@ import streamlit as st
 
 from .core import (
     carregar_pareceres_log,
+    carregar_textos_parecer,
     carregar_vaga_candidatos,
     carregar_vagas,
     carregar_candidatos,
-    salvar_vaga_candidatos,
+    atualizar_status_vinculo,
     montar_link_whatsapp,
 )
+from .database import texto_celula
 
 # Tenta importar catálogo de status
 try:
@@ -55,28 +57,23 @@ def build_pipeline_df():
     - candidatos
     - último parecer por (id_candidato, id_vaga), se existir
     """
-    df_vinc = carregar_vaga_candidatos()
-    df_vagas = carregar_vagas()
-    df_cand = carregar_candidatos()
-    df_par = carregar_pareceres_log()
+    # tipados: ids Int64 (merge numérico), datas, status/cliente/cargo categóricos
+    df_vinc = carregar_vaga_candidatos(tipado=True)
+    df_vagas = carregar_vagas(tipado=True)
+    df_cand = carregar_candidatos(tipado=True)
+    # só as colunas curtas: os textos longos dos pareceres não são lidos
+    df_par = carregar_pareceres_log(
+        colunas=["id_candidato", "id_vaga", "data_hora", "cliente", "cargo", "caminho_arquivo"],
+        tipado=True,
+    )
 
     if df_vinc.empty or df_vagas.empty or df_cand.empty:
         return pd.DataFrame()
 
-    # Garante colunas de status no vínculo
-    for col in ["status_etapa", "status_contratacao", "motivo_decline"]:
-        if col not in df_vinc.columns:
-            df_vinc[col] = ""
-
-    # Prepara pareceres com id_vaga
+    # Prepara pareceres com id_vaga (o histórico em CSV não tem a coluna)
     if not df_par.empty and "id_candidato" in df_par.columns:
-        df_par = df_par.copy()
-        df_par["id_candidato"] = df_par["id_candidato"].astype(str)
-
-        if "id_vaga" in df_par.columns:
-            df_par["id_vaga"] = df_par["id_vaga"].astype(str)
-        else:
-            df_par["id_vaga"] = ""
+        if "id_vaga" not in df_par.columns:
+            df_par["id_vaga"] = pd.Series(pd.NA, index=df_par.index, dtype="Int64")
 
         df_par = df_par.sort_values("data_hora")
 
@@ -93,19 +90,7 @@ def build_pipeline_df():
             ]
         ]
     else:
-        df_par_latest = pd.DataFrame(
-            columns=["id_candidato", "id_vaga", "data_hora", "cliente", "cargo", "caminho_arquivo"]
-        )
-
-    df_vinc = df_vinc.copy()
-    df_vinc["id_vaga"] = df_vinc["id_vaga"].astype(str)
-    df_vinc["id_candidato"] = df_vinc["id_candidato"].astype(str)
-
-    df_vagas = df_vagas.copy()
-    df_vagas["id_vaga"] = df_vagas["id_vaga"].astype(str)
-
-    df_cand = df_cand.copy()
-    df_cand["id_candidato"] = df_cand["id_candidato"].astype(str)
+        df_par_latest = pd.DataFrame()
 
     # Base: vínculos + vaga + candidato
     df_pipe = df_vinc.merge(
@@ -127,7 +112,7 @@ def build_pipeline_df():
             suffixes=("", "_parecer"),
         )
     else:
-        df_pipe["data_hora"] = ""
+        df_pipe["data_hora"] = pd.NaT
         df_pipe["caminho_arquivo"] = ""
 
     df_pipe.rename(
@@ -137,19 +122,21 @@ def build_pipeline_df():
         inplace=True,
     )
 
-    # Ordena por data de vínculo, se existir
-    if "data_vinculo" in df_pipe.columns:
-        try:
-            df_pipe["data_vinculo_dt"] = pd.to_datetime(df_pipe["data_vinculo"])
-            df_pipe = df_pipe.sort_values("data_vinculo_dt", ascending=False)
-        except Exception:
-            df_pipe = df_pipe.sort_values(["nome_cliente", "cargo", "nome"])
-    else:
-        df_pipe = df_pipe.sort_values(["nome_cliente", "cargo", "nome"])
+    # Ordena por data de vínculo (já é data; sem data vão para o fim)
+    df_pipe = df_pipe.sort_values("data_vinculo", ascending=False, na_position="last")
 
     return df_pipe
 
 
+def _contem(serie: pd.Series, texto: str) -> pd.Series:
+    """Filtro "contém" sem diferenciar maiúsculas; em coluna categórica compara só as categorias."""
+    texto = texto.strip().lower()
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = serie.cat.categories
+        return serie.isin(categorias[categorias.str.lower().str.contains(texto, regex=False)])
+    return serie.fillna("").str.lower().str.contains(texto, regex=False)
+
+
 def run():
     st.header("📌 Pipeline de Candidatos")
 
@@ -190,17 +177,11 @@ def run():
     df_view = df_pipe.copy()
 
     if filtro_cliente.strip():
-        df_view = df_view[
-            df_view["nome_cliente"].fillna("").str.lower().str.contains(filtro_cliente.strip().lower())
-        ]
+        df_view = df_view[_contem(df_view["nome_cliente"], filtro_cliente)]
     if filtro_cargo.strip():
-        df_view = df_view[
-            df_view["cargo"].fillna("").str.lower().str.contains(filtro_cargo.strip().lower())
-        ]
+        df_view = df_view[_contem(df_view["cargo"], filtro_cargo)]
     if filtro_candidato.strip():
-        df_view = df_view[
-            df_view["nome"].fillna("").str.lower().str.contains(filtro_candidato.strip().lower())
-        ]
+        df_view = df_view[_contem(df_view["nome"], filtro_candidato)]
     if etapa_filter != "(Todas)":
         df_view = df_view[df_view["status_etapa"] == etapa_filter]
     if status_filter != "(Todos)":
@@ -237,18 +218,16 @@ def run():
             "Último parecer",
         ]
 
-        sub = df[cols].fillna("")
         html = ["<table>"]
         html.append("<thead><tr>")
         for h in headers:
             html.append(f"<th>{h}</th>")
         html.append("</tr></thead>")
         html.append("<tbody>")
-        for _, row in sub.iterrows():
+        for _, row in df[cols].iterrows():
             html.append("<tr>")
             for c in cols:
-                valor = row[c]
-                html.append(f"<td>{valor}</td>")
+                html.append(f"<td>{texto_celula(row[c])}</td>")
             html.append("</tr>")
         html.append("</tbody></table>")
         st.markdown("".join(html), unsafe_allow_html=True)
@@ -317,7 +296,12 @@ def run():
     # 4) Editar parecer no módulo Parecer
     with colD:
         if st.button("📝 Editar parecer no módulo Parecer"):
-            df_par = carregar_pareceres_log()
+            df_par = carregar_pareceres_log(
+                colunas=[
+                    "id_candidato", "id_vaga", "data_hora", "cliente", "cargo", "nome",
+                    "localidade", "idade", "pretensao", "linkedin", "ref_texto",
+                ]
+            )
             if df_par.empty:
                 st.warning("Nenhum parecer encontrado para este candidato.")
             else:
@@ -341,6 +325,7 @@ def run():
                     st.warning("Nenhum parecer encontrado para este candidato/vaga.")
                 else:
                     reg = registros.sort_values("data_hora").iloc[-1]
+                    textos = carregar_textos_parecer(reg)
 
                     st.session_state["cliente"] = reg.get("cliente", "")
                     st.session_state["cargo"] = reg.get("cargo", "")
@@ -349,9 +334,9 @@ def run():
                     st.session_state["idade"] = str(reg.get("idade", ""))
                     st.session_state["pretensao"] = reg.get("pretensao", "")
                     st.session_state["linkedin"] = reg.get("linkedin", "")
-                    st.session_state["resumo_profissional"] = reg.get("resumo_profissional", "")
-                    st.session_state["analise_perfil"] = reg.get("analise_perfil", "")
-                    st.session_state["conclusao_texto"] = reg.get("conclusao_texto", "")
+                    st.session_state["resumo_profissional"] = textos["resumo_profissional"]
+                    st.session_state["analise_perfil"] = textos["analise_perfil"]
+                    st.session_state["conclusao_texto"] = textos["conclusao_texto"]
                     st.session_state["id_candidato_selecionado"] = str(reg.get("id_candidato", ""))
                     st.session_state["id_vaga_selecionada"] = str(reg.get("id_vaga", ""))
 
@@ -404,26 +389,20 @@ def run():
             if df_vinc.empty:
                 st.error("Arquivo de vínculos vazio. Nada para atualizar.")
             else:
-                df_vinc = df_vinc.copy()
-                df_vinc["id_vaga"] = df_vinc["id_vaga"].astype(str)
-                df_vinc["id_candidato"] = df_vinc["id_candidato"].astype(str)
-
-                mask = (df_vinc["id_vaga"] == str(row_sel["id_vaga"])) & (
-                    df_vinc["id_candidato"] == str(row_sel["id_candidato"])
+                mask = (df_vinc["id_vaga"].astype(str) == str(row_sel["id_vaga"])) & (
+                    df_vinc["id_candidato"].astype(str) == str(row_sel["id_candidato"])
                 )
                 if not mask.any():
                     st.error("Registro de vínculo não encontrado para atualização.")
                 else:
-                    for col, val in [
-                        ("status_etapa", etapa_nova),
-                        ("status_contratacao", status_novo),
-                        ("motivo_decline", motivo_novo),
-                    ]:
-                        if col not in df_vinc.columns:
-                            df_vinc[col] = ""
-                        df_vinc.loc[mask, col] = val
-
-                    salvar_vaga_candidatos(df_vinc)
+                    # só a linha alterada é gravada (não regrava o arquivo todo)
+                    atualizar_status_vinculo(
+                        row_sel["id_vaga"],
+                        row_sel["id_candidato"],
+                        etapa_nova,
+                        status_novo,
+                        motivo_novo,
+                    )
                     st.success("Status do pipeline atualizado com sucesso!")
                     st.rerun()
         except Exception as e:
@@ -0,0 +1,457 @@
+# modules/renderizacao.py
+# Motor de geração dos pareceres em PDF e DOCX.
+#
+# PDF: estilos e modelo de página (frame + PageTemplate) são montados uma vez
+# por processo/thread e reaproveitados; os parágrafos (que o reportlab altera
+# durante a montagem) são novos a cada parecer. Aceita um parecer ou uma
+# lista (lote para um cliente).
+#
+# DOCX: o .docx base (timbrado da empresa em modelos/parecer.docx, ou o modelo
+# padrão montado aqui) é carregado e compilado uma vez por processo; cada
+# parecer é uma cópia dele com os marcadores {{campo}} preenchidos numa passada.
+import io
+import os
+import re
+import hashlib
+import zipfile
+import functools
+import threading
+from xml.sax.saxutils import escape
+
+from docx import Document
+from lxml import etree
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer
+
+# campos de um parecer (mesmos nomes dos argumentos de core.build_parecer_*_to_bytes)
+CAMPOS_PARECER = (
+    "cliente", "cargo", "nome", "localidade", "idade", "pretensao",
+    "resumo_profissional", "analise_perfil", "conclusao_texto", "linkedin",
+)
+
+# Sobem quando o layout mudar (entram na chave do cache de pareceres gerados).
+VERSAO_MODELO_PDF = 1
+VERSAO_MODELO_DOCX = 2  # além do conteúdo do .docx base (ver versao_modelo_docx)
+
+# .docx base com o timbrado; sem ele, usa o modelo padrão (_documento_padrao)
+MODELO_DOCX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "modelos", "parecer.docx")
+
+_LOCAL = threading.local()
+
+
+def normalizar_linkedin(link):
+    if not link or not link.strip():
+        return None
+    link = link.strip()
+    if not (link.startswith("http://") or link.startswith("https://")):
+        return "https://" + link
+    return link
+
+
+def _to_html(txt) -> str:
+    return str(txt or "").replace("\n", "<br/>")
+
+
+# =========================
+# ESTILOS / MODELO (uma vez)
+# =========================
+
+@functools.lru_cache(maxsize=1)
+def estilos_parecer() -> dict:
+    """ParagraphStyle do parecer, criados uma vez por processo (só leitura depois)."""
+    base = getSampleStyleSheet()
+    return {
+        "titulo": ParagraphStyle(
+            "Title",
+            parent=base["Heading1"],
+            alignment=TA_CENTER,
+            fontSize=14,
+            spaceAfter=20,
+        ),
+        "cabecalho": ParagraphStyle(
+            "Header",
+            parent=base["Normal"],
+            alignment=TA_CENTER,
+            fontSize=11,
+            textColor=colors.HexColor("#003366"),
+        ),
+        "secao": ParagraphStyle(
+            "SecTitle",
+            parent=base["Heading2"],
+            fontSize=12,
+            textColor=colors.HexColor("#003366"),
+            spaceBefore=12,
+            spaceAfter=4,
+        ),
+        "corpo": ParagraphStyle(
+            "Body",
+            parent=base["Normal"],
+            fontSize=10.5,
+            alignment=TA_JUSTIFY,
+            leading=15,
+        ),
+    }
+
+
+class _ModeloPDF:
+    """
+    Documento A4 do parecer (margens, frame, PageTemplate).
+    O build do reportlab altera o documento e os flowables durante a montagem
+    (quebra de parágrafo entre páginas, posição do frame), por isso há um
+    modelo por thread (ver _modelo_pdf) e todos os Paragraph, inclusive os
+    títulos fixos, são criados de novo a cada parecer.
+    """
+
+    def __init__(self):
+        self.doc = BaseDocTemplate(
+            None,
+            pagesize=A4,
+            topMargin=40,
+            bottomMargin=40,
+            leftMargin=50,
+            rightMargin=50,
+        )
+        frame = Frame(self.doc.leftMargin, self.doc.bottomMargin, self.doc.width, self.doc.height, id="normal")
+        self.doc.addPageTemplates([PageTemplate(id="Parecer", frames=[frame], pagesize=A4)])
+
+    def historia(self, registro: dict) -> list:
+        """Flowables de um parecer (novos a cada chamada; só os estilos são reaproveitados)."""
+        e = estilos_parecer()
+        r = {c: registro.get(c, "") for c in CAMPOS_PARECER}
+
+        content = [
+            Paragraph(f"<b>Cliente:</b> {r['cliente']}", e["cabecalho"]),
+            Paragraph(f"<b>Cargo:</b> {r['cargo']}", e["cabecalho"]),
+            Spacer(1, 20),
+            Paragraph("🧩 PARECER DE TRIAGEM – CANDIDATO", e["titulo"]),
+            Spacer(1, 12),
+            Paragraph(f"<b>Nome:</b> {r['nome']}<br/><b>Localidade:</b> {r['localidade']}", e["corpo"]),
+        ]
+
+        linkedin_url = normalizar_linkedin(r["linkedin"])
+        if linkedin_url:
+            content.append(Paragraph(
+                f'<b>LinkedIn:</b> <link href="{linkedin_url}">{linkedin_url}</link>',
+                e["corpo"],
+            ))
+
+        content += [
+            Paragraph("🧾 <b>Resumo Profissional</b>", e["secao"]),
+            Paragraph(_to_html(r["resumo_profissional"]), e["corpo"]),
+            Paragraph("💡 <b>Análise de Perfil</b>", e["secao"]),
+            Paragraph(_to_html(r["analise_perfil"]), e["corpo"]),
+            Paragraph("➡️ <b>Conclusão</b>", e["secao"]),
+            Paragraph(_to_html(r["conclusao_texto"]), e["corpo"]),
+            Paragraph("💰 <b>Informações de Remuneração</b>", e["secao"]),
+            Paragraph(f"Idade: {r['idade']}<br/>Pretensão Salarial: {r['pretensao']}", e["corpo"]),
+        ]
+        return content
+
+    def montar(self, historia: list, destino):
+        """Gera o PDF em destino (caminho ou arquivo binário aberto)."""
+        self.doc.build(list(historia), filename=destino)
+
+
+def _modelo_pdf() -> _ModeloPDF:
+    modelo = getattr(_LOCAL, "modelo_pdf", None)
+    if modelo is None:
+        modelo = _LOCAL.modelo_pdf = _ModeloPDF()
+    return modelo
+
+
+# =========================
+# RENDERIZAÇÃO
+# =========================
+
+def renderizar_parecer_pdf(registro: dict, destino=None):
+    """
+    PDF de um parecer (registro com os campos de CAMPOS_PARECER).
+    Sem destino devolve os bytes; com destino (caminho ou arquivo) grava nele.
+    """
+    modelo = _modelo_pdf()
+    if destino is not None:
+        modelo.montar(modelo.historia(registro), destino)
+        return None
+    buffer = io.BytesIO()
+    modelo.montar(modelo.historia(registro), buffer)
+    return buffer.getvalue()
+
+
+def renderizar_pareceres_pdf(registros) -> list[bytes]:
+    """Um PDF por parecer, todos com o mesmo modelo (lote para um cliente)."""
+    return [renderizar_parecer_pdf(r) for r in registros]
+
+
+# =========================
+# DOCX (modelo com marcadores)
+# =========================
+# No .docx base, um parágrafo que é só {{resumo_profissional}}, {{analise_perfil}}
+# ou {{conclusao_texto}} vira um parágrafo por bloco do texto (separados por
+# linha em branco), com a formatação do parágrafo do modelo. Os demais
+# marcadores são trocados no lugar; parágrafo com {{linkedin}} some se não
+# houver LinkedIn. Cabeçalho e rodapé (timbrado) também aceitam marcadores.
+# Marcador dentro de caixa de texto vale; um parágrafo com marcador que também
+# ancora uma caixa de texto (w:p dentro dele) é recusado ao carregar o modelo.
+
+CAMPOS_BLOCO = ("resumo_profissional", "analise_perfil", "conclusao_texto")
+CAMPOS_OPCIONAIS = ("linkedin",)
+
+_RE_MARCADOR = re.compile(r"\{\{(\w+)\}\}")
+_RE_MOLDE = re.compile(r"<\?gac-molde (\d+)\?>")
+_RE_XMLNS = re.compile(r'\s+xmlns(?::\w+)?="[^"]*"')
+_RE_CONTROLE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def _documento_padrao():
+    """Modelo padrão: mesmo conteúdo do parecer DOCX de sempre, com marcadores."""
+    doc = Document()
+    doc.add_heading("PARECER DE TRIAGEM – CANDIDATO", level=1)
+    doc.add_paragraph("Cliente: {{cliente}}")
+    doc.add_paragraph("Cargo: {{cargo}}")
+    doc.add_paragraph("Nome: {{nome}}")
+    doc.add_paragraph("Localidade: {{localidade}}")
+    doc.add_paragraph("LinkedIn: {{linkedin}}")
+    doc.add_heading("Resumo Profissional", level=2)
+    doc.add_paragraph("{{resumo_profissional}}")
+    doc.add_heading("Análise de Perfil", level=2)
+    doc.add_paragraph("{{analise_perfil}}")
+    doc.add_heading("Conclusão", level=2)
+    doc.add_paragraph("{{conclusao_texto}}")
+    doc.add_heading("Informações de Remuneração", level=2)
+    doc.add_paragraph("Idade: {{idade}}")
+    doc.add_paragraph("Pretensão Salarial: {{pretensao}}")
+    return doc
+
+
+def _paragrafos(doc):
+    def de(container):
+        yield from container.paragraphs
+        for tabela in container.tables:
+            for linha in tabela.rows:
+                for celula in linha.cells:
+                    yield from de(celula)
+
+    yield from de(doc)
+    for secao in doc.sections:
+        for parte in (secao.header, secao.footer, secao.first_page_header,
+                      secao.first_page_footer, secao.even_page_header, secao.even_page_footer):
+            if not parte.is_linked_to_previous:
+                yield from de(parte)
+
+
+def _juntar_runs_com_marcadores(doc):
+    """
+    O Word às vezes quebra "{{campo}}" em vários runs: junta no run onde o
+    marcador começa (com a formatação dele) os runs até o marcador fechar.
+    """
+    for p in _paragrafos(doc):
+        if "{{" not in p.text:
+            continue
+        runs = p.runs
+        i = 0
+        while i < len(runs):
+            texto = runs[i].text
+            j = i
+            while texto.rfind("{") > texto.rfind("}") and j + 1 < len(runs):
+                j += 1
+                texto += runs[j].text
+            if j > i:
+                runs[i].text = texto
+                for r in runs[i + 1:j + 1]:
+                    r._r.getparent().remove(r._r)
+            i = j + 1
+
+
+def _textos_proprios(p):
+    """<w:t> do parágrafo, sem os de parágrafos aninhados (caixas de texto, formas)."""
+    return [t for t in p.iter(_W + "t") if next(t.iterancestors(_W + "p")) is p]
+
+
+def _compilar_xml(xml: str) -> list:
+    """
+    Parte o XML em trechos fixos (str) e marcadores:
+    ("campo", nome), ("bloco", nome, antes, depois) e ("opcional", nome, trechos).
+    Os parágrafos com marcador são achados pelo parse do XML (lxml), então um
+    marcador numa caixa de texto (w:p dentro de w:p) é tratado no parágrafo dele.
+    """
+    raiz = etree.fromstring(xml.encode("utf-8"))
+    moldes = []
+    for p in list(raiz.iter(_W + "p")):
+        textos = _textos_proprios(p)
+        texto = "".join(t.text or "" for t in textos)
+        nomes = _RE_MARCADOR.findall(texto)
+        if not nomes:
+            continue
+        if next(p.iterdescendants(_W + "p"), None) is not None:
+            raise ValueError(
+                "Modelo DOCX não suportado: o parágrafo com "
+                + ", ".join("{{%s}}" % n for n in nomes)
+                + " contém outro parágrafo (caixa de texto ou forma ancorada nele). "
+                "Coloque o marcador num parágrafo próprio, fora da caixa de texto."
+            )
+        # o valor pode começar/terminar com espaço
+        for t in textos:
+            t.set(_XML_SPACE, "preserve")
+        # as declarações de namespace já estão no elemento raiz do documento
+        par = etree.tostring(p, encoding="unicode", with_tail=False)
+        fim_tag = par.index(">")
+        par = _RE_XMLNS.sub("", par[:fim_tag]) + par[fim_tag:]
+
+        pi = etree.ProcessingInstruction("gac-molde", str(len(moldes)))
+        pi.tail = p.tail
+        p.getparent().replace(p, pi)
+        moldes.append((par, nomes, texto.strip()))
+
+    cabecalho = xml[:xml.index("?>") + 2] + "\n" if xml.startswith("<?xml") else ""
+    corpo = _RE_MOLDE.split(etree.tostring(raiz, encoding="unicode"))
+
+    segmentos = [cabecalho + corpo[0]]
+    for i in range(1, len(corpo), 2):
+        par, nomes, texto = moldes[int(corpo[i])]
+        if len(nomes) == 1 and nomes[0] in CAMPOS_BLOCO and texto == "{{%s}}" % nomes[0]:
+            antes, depois = par.split("{{%s}}" % nomes[0], 1)
+            segmentos.append(("bloco", nomes[0], antes, depois))
+        else:
+            trechos = []
+            ultimo = 0
+            for mm in _RE_MARCADOR.finditer(par):
+                trechos.append(par[ultimo:mm.start()])
+                trechos.append(("campo", mm.group(1)))
+                ultimo = mm.end()
+            trechos.append(par[ultimo:])
+            opcional = next((n for n in nomes if n in CAMPOS_OPCIONAIS), None)
+            if opcional:
+                segmentos.append(("opcional", opcional, trechos))
+            else:
+                segmentos.extend(trechos)
+        segmentos.append(corpo[i + 1])
+
+    # junta trechos fixos vizinhos
+    compacto = []
+    for seg in segmentos:
+        if isinstance(seg, str) and compacto and isinstance(compacto[-1], str):
+            compacto[-1] += seg
+        elif seg != "":
+            compacto.append(seg)
+    return compacto
+
+
+def _texto_xml(valor) -> str:
+    """Valor para dentro de <w:t>: escapado, sem caracteres de controle, \n vira quebra de linha."""
+    texto = escape(_RE_CONTROLE.sub("", str(valor or "")))
+    return texto.replace("\n", '</w:t><w:br/><w:t xml:space="preserve">')
+
+
+class ModeloDocx:
+    """
+    .docx base compilado. As partes sem marcadores ficam num ZIP pronto (já
+    comprimido, uma vez só); os XML com marcadores viram listas de trechos e
+    são as únicas partes gravadas a cada parecer. Só leitura depois de criado,
+    então um único modelo serve a todas as threads.
+    """
+
+    def __init__(self, origem=None):
+        doc = Document(origem) if origem else _documento_padrao()
+        _juntar_runs_com_marcadores(doc)
+        buffer = io.BytesIO()
+        doc.save(buffer)
+
+        self.moldes = []  # (ZipInfo, trechos)
+        base = io.BytesIO()
+        with zipfile.ZipFile(buffer) as origem_zip, zipfile.ZipFile(base, "w", zipfile.ZIP_DEFLATED) as fixo:
+            for info in origem_zip.infolist():
+                dados = origem_zip.read(info)
+                if info.filename.startswith("word/") and info.filename.endswith(".xml") and b"{{" in dados:
+                    self.moldes.append((info, _compilar_xml(dados.decode("utf-8"))))
+                else:
+                    fixo.writestr(info, dados)
+        self.base = base.getvalue()
+
+    @staticmethod
+    def _valores(registro: dict) -> dict:
+        valores = {c: registro.get(c, "") for c in CAMPOS_PARECER}
+        valores["linkedin"] = normalizar_linkedin(valores["linkedin"]) or ""
+        return valores
+
+    @staticmethod
+    def _preencher(trechos, valores: dict, saida: list):
+        for seg in trechos:
+            if isinstance(seg, str):
+                saida.append(seg)
+            elif seg[0] == "campo":
+                saida.append(_texto_xml(valores.get(seg[1], "")))
+            elif seg[0] == "bloco":
+                _, nome, antes, depois = seg
+                for bloco in str(valores.get(nome, "") or "").split("\n\n"):
+                    saida += (antes, _texto_xml(bloco), depois)
+            elif valores.get(seg[1]):  # opcional
+                ModeloDocx._preencher(seg[2], valores, saida)
+
+    def renderizar(self, registro: dict, destino=None):
+        """DOCX de um parecer; sem destino devolve os bytes, com destino (caminho ou arquivo) grava nele."""
+        valores = self._valores(registro)
+        buffer = io.BytesIO()
+        buffer.write(self.base)
+        # acrescenta ao ZIP base só as partes preenchidas
+        with zipfile.ZipFile(buffer, "a", zipfile.ZIP_DEFLATED) as z:
+            for info, trechos in self.moldes:
+                saida = []
+                self._preencher(trechos, valores, saida)
+                z.writestr(info, "".join(saida).encode("utf-8"))
+        if destino is None:
+            return buffer.getvalue()
+        if isinstance(destino, (str, os.PathLike)):
+            with open(destino, "wb") as f:
+                f.write(buffer.getbuffer())
+        else:
+            destino.write(buffer.getbuffer())
+        return None
+
+
+def _assinatura_modelo_docx():
+    try:
+        st = os.stat(MODELO_DOCX)
+    except OSError:
+        return None
+    return (MODELO_DOCX, st.st_size, st.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=2)
+def _modelo_docx(assinatura) -> ModeloDocx:
+    return ModeloDocx(assinatura[0] if assinatura else None)
+
+
+def modelo_docx() -> ModeloDocx:
+    """Modelo DOCX do processo (recarregado só se o .docx base mudar)."""
+    return _modelo_docx(_assinatura_modelo_docx())
+
+
+@functools.lru_cache(maxsize=2)
+def _hash_modelo(assinatura) -> str:
+    if not assinatura:
+        return "padrao"
+    with open(assinatura[0], "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def versao_modelo_docx() -> str:
+    """Versão do layout DOCX + conteúdo do .docx base (para o cache de pareceres)."""
+    return f"{VERSAO_MODELO_DOCX}-{_hash_modelo(_assinatura_modelo_docx())}"
+
+
+def renderizar_parecer_docx(registro: dict, destino=None):
+    """DOCX de um parecer a partir do modelo (bytes, ou grava em destino)."""
+    return modelo_docx().renderizar(registro, destino)
+
+
+def renderizar_pareceres_docx(registros) -> list[bytes]:
+    """Um DOCX por parecer, todos com o mesmo modelo carregado uma vez."""
+    modelo = modelo_docx()
+    return [modelo.renderizar(r) for r in registros]
@@ -2,6 +2,8 @@ import os
 import pandas as pd
 import streamlit as st
 
+from .arquivos import gravar_csv_atomico
+
 # Arquivo de status na raiz do projeto (mesmo nível do parecer_app.py)
 MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.abspath(os.path.join(MODULE_DIR, ".."))
@@ -115,7 +117,7 @@ def load_status_df() -> pd.DataFrame:
     """Carrega status do CSV, criando defaults se não existir."""
     if not os.path.exists(STATUS_FILE):
         df = _create_default_df()
-        df.to_csv(STATUS_FILE, index=False, encoding="utf-8")
+        gravar_csv_atomico(df, STATUS_FILE, sep=",")
         return df
 
     df = pd.read_csv(STATUS_FILE, dtype=str).fillna("")
@@ -135,7 +137,7 @@ def load_status_df() -> pd.DataFrame:
 
 
 def save_status_df(df: pd.DataFrame) -> None:
-    df.to_csv(STATUS_FILE, index=False, encoding="utf-8")
+    gravar_csv_atomico(df, STATUS_FILE, sep=",")
 
 
 # -------------------------------------------------
@@ -0,0 +1,435 @@
+# modules/tarefas.py
+# Fila local de tarefas demoradas (gerar parecer, pareceres em lote, importar
+# PDFs, preencher via IA). A tela grava a tarefa na tabela `tarefas` do gac.db e volta na hora;
+# processos trabalhadores pegam as pendentes, executam e deixam o resultado em
+# disco (data/tarefas/<id>/resultado.json e arquivos gerados). A tela acompanha
+# pelo status/progresso gravados na tabela.
+#
+# Não importa streamlit. Os trabalhadores sobem junto com o app
+# (garantir_trabalhadores) ou à parte: python -m modules.tarefas
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+import multiprocessing
+from datetime import datetime, timedelta
+
+from .core import (
+    BASE_DIR,
+    extract_text_from_pdf,
+    gerar_campos_via_openai,
+    historico_em_csv,
+    importar_parecer_pdf,
+    registrar_parecer_log,
+)
+from .database import conexao, escrita, init_db, registrar_parecer_db, transacao
+
+PASTA_TAREFAS = os.path.join(BASE_DIR, "tarefas")
+PASTA_ENTRADA = os.path.join(PASTA_TAREFAS, "entrada")  # arquivos enviados pela tela
+
+N_TRABALHADORES = 2
+INTERVALO_S = 0.5        # espera entre consultas à fila quando não há tarefa
+BATIDA_S = 15            # sinal de vida do trabalhador enquanto executa uma tarefa
+TAREFA_PARADA_S = 120    # executando sem sinal há mais que isso: trabalhador morreu
+MAX_TENTATIVAS = 3
+
+FINAIS = ("concluida", "erro")
+
+# tipo -> função(contexto, **parametros) -> dict (vai para resultado.json)
+TIPOS: dict = {}
+
+_TRABALHADORES: list = []
+_LOCK_TRABALHADORES = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def tipo_tarefa(nome: str):
+    """Registra a função que executa as tarefas do tipo `nome`."""
+    def registrar(func):
+        TIPOS[nome] = func
+        return func
+    return registrar
+
+
+def _agora() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# =========================
+# TABELA
+# =========================
+
+@escrita
+def _inserir_tarefa(tipo: str, parametros: str) -> int:
+    with transacao() as conn:
+        agora = _agora()
+        cur = conn.execute(
+            "INSERT INTO tarefas (tipo, status, parametros, criado_em, atualizado_em) VALUES (?, 'pendente', ?, ?, ?);",
+            (tipo, parametros, agora, agora),
+        )
+        return cur.lastrowid
+
+
+@escrita
+def _liberar_paradas(limite: str):
+    """Tarefa presa com um trabalhador que morreu: volta para a fila (ou desiste)."""
+    agora = _agora()
+    with transacao() as conn:
+        conn.execute(
+            """
+            UPDATE tarefas
+            SET status = CASE WHEN tentativas >= ? THEN 'erro' ELSE 'pendente' END,
+                concluido_em = CASE WHEN tentativas >= ? THEN ? ELSE NULL END,
+                mensagem = 'Interrompida (trabalhador parou)',
+                trabalhador = NULL,
+                atualizado_em = ?
+            WHERE status = 'executando' AND atualizado_em < ?;
+            """,
+            (MAX_TENTATIVAS, MAX_TENTATIVAS, agora, agora, limite),
+        )
+
+
+@escrita
+def _reservar(id_tarefa: int, trabalhador: str) -> bool:
+    """Marca a tarefa como executando por `trabalhador`, se ainda estiver pendente."""
+    agora = _agora()
+    with transacao() as conn:
+        cur = conn.execute(
+            """
+            UPDATE tarefas
+            SET status = 'executando', trabalhador = ?, tentativas = tentativas + 1,
+                iniciado_em = ?, atualizado_em = ?, progresso = 0, mensagem = ''
+            WHERE id_tarefa = ? AND status = 'pendente';
+            """,
+            (trabalhador, agora, agora, id_tarefa),
+        )
+        return cur.rowcount == 1
+
+
+def _pegar_proxima(trabalhador: str):
+    """
+    Tarefa pendente mais antiga, já reservada para `trabalhador` (ou None).
+    A consulta é só leitura; a fila de escrita (e o lock do banco) só entra
+    quando há o que reservar.
+    """
+    conn = conexao()
+    limite = (datetime.now() - timedelta(seconds=TAREFA_PARADA_S)).strftime("%Y-%m-%d %H:%M:%S")
+    parada = conn.execute(
+        "SELECT 1 FROM tarefas WHERE status = 'executando' AND atualizado_em < ? LIMIT 1;", (limite,)
+    ).fetchone()
+    if parada:
+        _liberar_paradas(limite)
+
+    while True:
+        row = conn.execute(
+            "SELECT * FROM tarefas WHERE status = 'pendente' ORDER BY id_tarefa LIMIT 1;"
+        ).fetchone()
+        if row is None:
+            return None
+        if _reservar(row["id_tarefa"], trabalhador):
+            return dict(row)
+        # outro trabalhador reservou antes: tenta a próxima
+
+
+@escrita
+def _atualizar_tarefa(id_tarefa: int, **campos):
+    campos["atualizado_em"] = _agora()
+    if campos.get("status") in FINAIS:
+        campos["concluido_em"] = campos["atualizado_em"]
+    sets = ", ".join(f"{c} = ?" for c in campos)
+    with transacao() as conn:
+        conn.execute(f"UPDATE tarefas SET {sets} WHERE id_tarefa = ?;", (*campos.values(), id_tarefa))
+
+
+def _ler(row) -> dict:
+    tarefa = dict(row)
+    try:
+        tarefa["parametros"] = json.loads(tarefa.get("parametros") or "{}")
+    except ValueError:
+        tarefa["parametros"] = {}
+    return tarefa
+
+
+def obter_tarefa(id_tarefa: int) -> dict | None:
+    """Estado atual da tarefa (sem cache: quem muda é outro processo)."""
+    row = conexao().execute("SELECT * FROM tarefas WHERE id_tarefa = ?;", (int(id_tarefa),)).fetchone()
+    return _ler(row) if row else None
+
+
+def listar_tarefas(tipos=None, limite: int = 20) -> list[dict]:
+    sql = "SELECT * FROM tarefas"
+    params = []
+    if tipos:
+        sql += f" WHERE tipo IN ({', '.join('?' for _ in tipos)})"
+        params.extend(tipos)
+    sql += " ORDER BY id_tarefa DESC LIMIT ?;"
+    params.append(int(limite))
+    return [_ler(r) for r in conexao().execute(sql, params).fetchall()]
+
+
+def resultado_tarefa(tarefa: dict) -> dict:
+    """Conteúdo de resultado.json da tarefa concluída ({} se ainda não há)."""
+    pasta = tarefa.get("pasta") or ""
+    try:
+        with open(os.path.join(pasta, "resultado.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def enfileirar(tipo: str, **parametros) -> int:
+    """Grava a tarefa como pendente, garante trabalhadores rodando e devolve o id."""
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de tarefa desconhecido: {tipo}")
+    id_tarefa = _inserir_tarefa(tipo, json.dumps(parametros, ensure_ascii=False))
+    garantir_trabalhadores()
+    return id_tarefa
+
+
+def guardar_entrada(nome_arquivo: str, dados: bytes) -> str:
+    """Grava um arquivo enviado pela tela para uma tarefa usar; devolve o caminho."""
+    os.makedirs(PASTA_ENTRADA, exist_ok=True)
+    base, ext = os.path.splitext(os.path.basename(nome_arquivo))
+    caminho = os.path.join(PASTA_ENTRADA, f"{base}_{time.time_ns()}{ext}")
+    with open(caminho, "wb") as f:
+        f.write(dados)
+    return caminho
+
+
+# =========================
+# EXECUÇÃO
+# =========================
+
+class Contexto:
+    """O que a função da tarefa recebe: pasta do resultado e aviso de progresso."""
+
+    def __init__(self, id_tarefa: int, pasta: str):
+        self.id_tarefa = id_tarefa
+        self.pasta = pasta
+
+    def progresso(self, fracao: float, mensagem: str = ""):
+        _atualizar_tarefa(self.id_tarefa, progresso=max(0.0, min(1.0, float(fracao))), mensagem=mensagem)
+
+
+def _bater(id_tarefa: int, parar: threading.Event):
+    while not parar.wait(BATIDA_S):
+        try:
+            _atualizar_tarefa(id_tarefa)
+        except Exception:
+            logger.exception("Falha ao renovar o sinal da tarefa %s", id_tarefa)
+
+
+def executar_tarefa(tarefa: dict):
+    """Roda uma tarefa já marcada como executando e grava o desfecho."""
+    id_tarefa = tarefa["id_tarefa"]
+    pasta = os.path.join(PASTA_TAREFAS, str(id_tarefa))
+    os.makedirs(pasta, exist_ok=True)
+    # sinal de vida enquanto a tarefa roda: um passo longo (IA, junção grande)
+    # não é confundido com trabalhador morto e executado de novo
+    parar = threading.Event()
+    batida = threading.Thread(target=_bater, args=(id_tarefa, parar), name="gac-tarefa-batida", daemon=True)
+    batida.start()
+    try:
+        func = TIPOS[tarefa["tipo"]]
+        parametros = json.loads(tarefa.get("parametros") or "{}")
+        resultado = func(Contexto(id_tarefa, pasta), **parametros) or {}
+        with open(os.path.join(pasta, "resultado.json"), "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False)
+    except Exception as e:
+        logger.exception("Tarefa %s (%s) falhou", id_tarefa, tarefa.get("tipo"))
+        _atualizar_tarefa(id_tarefa, status="erro", mensagem=str(e), pasta=pasta)
+        return
+    finally:
+        parar.set()
+        batida.join()
+    _atualizar_tarefa(id_tarefa, status="concluida", progresso=1.0, pasta=pasta,
+                      mensagem=resultado.get("mensagem", ""))
+
+
+def laco_trabalhador(id_pai: int | None = None):
+    """
+    Pega e executa tarefas até o processo pai (o app) sair. Sem pai
+    (python -m modules.tarefas), roda até ser interrompido.
+    """
+    init_db()
+    nome = f"{os.getpid()}"
+    while True:
+        if id_pai is not None and os.getppid() != id_pai:
+            return
+        try:
+            tarefa = _pegar_proxima(nome)
+        except Exception:
+            logger.exception("Falha ao consultar a fila de tarefas")
+            tarefa = None
+        if tarefa is None:
+            time.sleep(INTERVALO_S)
+            continue
+        executar_tarefa(tarefa)
+
+
+def garantir_trabalhadores(n: int = N_TRABALHADORES):
+    """Sobe (ou repõe) os processos trabalhadores deste servidor."""
+    with _LOCK_TRABALHADORES:
+        _TRABALHADORES[:] = [p for p in _TRABALHADORES if p.is_alive()]
+        if len(_TRABALHADORES) >= n:
+            return
+        # spawn: o servidor do Streamlit tem várias threads e um fork no meio delas
+        # pode herdar travas ocupadas
+        contexto = multiprocessing.get_context("spawn")
+        for _ in range(n - len(_TRABALHADORES)):
+            p = contexto.Process(
+                target=laco_trabalhador, args=(os.getpid(),), name="gac-tarefas", daemon=True,
+            )
+            p.start()
+            _TRABALHADORES.append(p)
+
+
+# =========================
+# TIPOS DE TAREFA
+# =========================
+
+@tipo_tarefa("parecer")
+def _tarefa_parecer(ctx: Contexto, registro: dict, formato: str, anexos: list, pasta_saida: str,
+                    nome_base: str, data_hora: str, id_vaga=None, id_candidato=None) -> dict:
+    """Gera o parecer (via cache), grava na pasta de saída e registra o histórico."""
+    from .cache_pareceres import EXTENSOES, gerar_parecer, registrar_saida, saida_anterior
+
+    avisos = []
+    ctx.progresso(0.1, "Gerando parecer")
+    caminho_cache, chave, _ = gerar_parecer(
+        registro,
+        formato,
+        anexos,
+        ao_falhar=lambda fonte, e: avisos.append(
+            f"Não foi possível anexar o CV {os.path.basename(str(fonte))}: {e}"
+        ),
+    )
+
+    anterior = saida_anterior(chave)
+    if anterior and os.path.dirname(anterior) == os.path.abspath(pasta_saida):
+        # idêntico ao já gravado nesta pasta: sem nova cópia nem novo histórico
+        return {
+            "caminho": anterior,
+            "reaproveitado": True,
+            "avisos": avisos,
+            "mensagem": "Parecer sem alterações desde a última geração",
+        }
+
+    ctx.progresso(0.6, "Gravando arquivo")
+    os.makedirs(pasta_saida, exist_ok=True)
+    caminho_final = os.path.join(pasta_saida, nome_base + EXTENSOES[formato])
+    shutil.copyfile(caminho_cache, caminho_final)
+    registrar_saida(chave, caminho_final)
+
+    ctx.progresso(0.8, "Registrando histórico")
+    # CSV (histórico antigo; depois da migração o histórico é a tabela pareceres)
+    if historico_em_csv():
+        registrar_parecer_log(
+            data_hora=data_hora,
+            cliente=registro["cliente"],
+            cargo=registro["cargo"],
+            nome=registro["nome"],
+            localidade=registro["localidade"],
+            idade=registro["idade"],
+            pretensao=registro["pretensao"],
+            linkedin=registro["linkedin"],
+            resumo_profissional=registro["resumo_profissional"],
+            analise_perfil=registro["analise_perfil"],
+            conclusao_texto=registro["conclusao_texto"],
+            formato=formato,
+            caminho_arquivo=caminho_final,
+            id_candidato=str(id_candidato or ""),
+            status_etapa="Em avaliação",
+            status_contratacao="Pendente",
+            motivo_decline="",
+        )
+
+    # Banco de dados (novo oficial)
+    registrar_parecer_db(
+        id_vaga=int(id_vaga) if id_vaga else None,
+        id_candidato=int(id_candidato) if id_candidato else None,
+        cliente=registro["cliente"],
+        cargo=registro["cargo"],
+        nome=registro["nome"],
+        localidade=registro["localidade"],
+        idade=registro["idade"],
+        pretensao=registro["pretensao"],
+        linkedin=registro["linkedin"],
+        resumo_prof=registro["resumo_profissional"],
+        analise_prof=registro["analise_perfil"],
+        conclusao_txt=registro["conclusao_texto"],
+        formato=formato,
+        caminho_arquivo=caminho_final,
+        status_etapa="Em avaliação",
+        status_contratacao="Pendente",
+        motivo_decline="",
+    )
+    return {"caminho": caminho_final, "reaproveitado": False, "avisos": avisos, "mensagem": "Parecer gerado"}
+
+
+@tipo_tarefa("importar_pareceres")
+def _tarefa_importar_pareceres(ctx: Contexto, caminhos: list) -> dict:
+    """Importa PDFs de pareceres antigos (um por vez, com progresso por arquivo)."""
+    importados, erros = [], []
+    for n, caminho in enumerate(caminhos, start=1):
+        ctx.progresso((n - 1) / len(caminhos), f"{n} de {len(caminhos)}: {os.path.basename(caminho)}")
+        try:
+            importar_parecer_pdf(caminho)
+            importados.append(caminho)
+        except Exception as e:
+            erros.append({"arquivo": caminho, "erro": str(e)})
+    return {
+        "importados": importados,
+        "erros": erros,
+        "mensagem": f"{len(importados)} de {len(caminhos)} PDFs importados",
+    }
+
+
+@tipo_tarefa("lote_pareceres")
+def _tarefa_lote_pareceres(ctx: Contexto, id_vaga: int, ids_candidatos: list, formato: str,
+                           anexar_cv: bool) -> dict:
+    """Pareceres de vários candidatos de uma vaga num ZIP gravado na pasta da tarefa."""
+    from .lote_pareceres import gerar_lote_zip, registros_para_lote
+
+    registros = registros_para_lote(int(id_vaga), ids_candidatos)
+    ctx.progresso(0.0, f"0 de {len(registros)}")
+
+    def progredir(feitos, total, resultado):
+        ctx.progresso(feitos / total, f"{feitos} de {total} — {resultado['nome']}")
+
+    zip_bytes, resultados = gerar_lote_zip(registros, formato=formato, anexar_cv=anexar_cv, ao_progredir=progredir)
+    caminho = os.path.join(ctx.pasta, f"Pareceres_vaga_{int(id_vaga)}_{datetime.now().strftime('%Y%m%d_%H%M')}.zip")
+    with open(caminho, "wb") as f:
+        f.write(zip_bytes)
+    ok = sum(1 for r in resultados if not r["erro"])
+    return {
+        "caminho": caminho,
+        "resultados": resultados,
+        "mensagem": f"{ok} de {len(resultados)} pareceres gerados",
+    }
+
+
+@tipo_tarefa("preencher_ia")
+def _tarefa_preencher_ia(ctx: Contexto, caminho_pdf: str = "", observacoes: str = "") -> dict:
+    """Campos do parecer sugeridos pela IA a partir do CV (PDF) e/ou observações."""
+    texto_pdf = ""
+    if caminho_pdf:
+        ctx.progresso(0.1, "Lendo o PDF")
+        texto_pdf = extract_text_from_pdf(caminho_pdf)
+    ctx.progresso(0.3, "Consultando a IA")
+    nome, resumo, analise, conclusao = gerar_campos_via_openai((texto_pdf or "") + "\n\n" + (observacoes or ""))
+    return {
+        "nome": nome,
+        "resumo_profissional": resumo,
+        "analise_perfil": analise,
+        "conclusao_texto": conclusao,
+        "mensagem": "Campos preenchidos pela IA",
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    laco_trabalhador()
@@ -5,6 +5,8 @@ from typing import Tuple
 import pandas as pd
 import streamlit as st
 
+from .arquivos import gravar_csv_atomico
+
 
 # ==========================================
 # CONSTANTES / ARQUIVOS
@@ -58,7 +60,7 @@ def ensure_users_file() -> pd.DataFrame:
             },
         ]
         df = pd.DataFrame(data)
-        df.to_csv(USERS_FILE, sep=";", index=False, encoding="utf-8")
+        gravar_csv_atomico(df, USERS_FILE)
         return df
 
     df = pd.read_csv(USERS_FILE, sep=";", encoding="utf-8")
@@ -84,7 +86,7 @@ def ensure_users_file() -> pd.DataFrame:
     df["senha_hash"] = df["senha_hash"].fillna("").astype(str)
 
     # Salva de volta padronizado
-    df.to_csv(USERS_FILE, sep=";", index=False, encoding="utf-8")
+    gravar_csv_atomico(df, USERS_FILE)
     return df
 
 
@@ -95,7 +97,7 @@ def load_users() -> pd.DataFrame:
 
 def save_users(df: pd.DataFrame) -> None:
     """Salva DataFrame de usuários em usuarios.csv."""
-    df.to_csv(USERS_FILE, sep=";", index=False, encoding="utf-8")
+    gravar_csv_atomico(df, USERS_FILE)
 
 
 # ==========================================
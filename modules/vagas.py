@@ -6,14 +6,18 @@ import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
 
+from .candidatos import TAMANHO_PAGINA, navegacao_paginas
 from .database import (
     listar_clientes,
-    listar_vagas,
+    listar_clientes_df,
+    listar_vagas_df,
+    listar_vagas_pagina,
     inserir_vaga,
     atualizar_vaga,
-    listar_candidatos,
+    listar_candidatos_df,
     listar_vinculos_vaga,
     atualizar_vinculos_vaga,
+    texto_celula,
 )
 
 
@@ -117,7 +121,7 @@ def render_tabela_html(df, columns, headers):
     for _, row in df[columns].iterrows():
         html.append("<tr>")
         for col in columns:
-            html.append(f"<td>{row[col]}</td>")
+            html.append(f"<td>{texto_celula(row[col])}</td>")
         html.append("</tr>")
 
     html.append("</tbody></table>")
@@ -163,12 +167,40 @@ def run():
     if modo == "Listar":
         st.subheader("📋 Vagas cadastradas")
 
-        dados = listar_vagas()
-        if not dados:
-            st.info("Nenhuma vaga cadastrada.")
+        clientes = listar_clientes()
+        nomes_cli = {c["id_cliente"]: c["nome_cliente"] for c in clientes}
+        colF1, colF2, colF3 = st.columns(3)
+        with colF1:
+            status_f = st.selectbox(
+                "Status", ["(Todos)", "Aberta", "Em andamento", "Encerrada"], key="vagas_filtro_status"
+            )
+        with colF2:
+            cliente_f = st.selectbox(
+                "Cliente",
+                ["(Todos)"] + list(nomes_cli),
+                format_func=lambda x: nomes_cli.get(x, "(Todos)"),
+                key="vagas_filtro_cliente",
+            )
+        with colF3:
+            prefixo = st.text_input("Cargo começa com", key="vagas_filtro_cargo").strip()
+
+        filtros = (status_f, cliente_f, prefixo)
+        if st.session_state.get("vagas_pag_filtros") != filtros:
+            st.session_state["vagas_pag_filtros"] = filtros
+            st.session_state["vagas_pag_cursores"] = [None]
+
+        pagina = listar_vagas_pagina(
+            apos=st.session_state["vagas_pag_cursores"][-1],
+            limite=TAMANHO_PAGINA,
+            status=None if status_f == "(Todos)" else status_f,
+            id_cliente=None if cliente_f == "(Todos)" else cliente_f,
+            prefixo=prefixo or None,
+        )
+        if not pagina["itens"]:
+            st.info("Nenhuma vaga encontrada.")
             return
 
-        df = pd.DataFrame(dados).fillna("")
+        df = pd.DataFrame(pagina["itens"]).fillna("")
 
         render_tabela_html(
             df,
@@ -193,6 +225,7 @@ def run():
                 "Status",
             ],
         )
+        navegacao_paginas("vagas_pag_cursores", pagina)
         return
 
     # =========================
@@ -201,13 +234,12 @@ def run():
     if modo == "Inserir":
         st.subheader("➕ Nova vaga")
 
-        clientes = listar_clientes()
-        if not clientes:
+        df_cli = listar_clientes_df()
+        if df_cli.empty:
             st.warning("Cadastre clientes antes de criar vagas.")
             return
 
-        df_cli = pd.DataFrame(clientes).fillna("")
-        opcoes_cli = {int(r["id_cliente"]): r["nome_cliente"] for _, r in df_cli.iterrows()}
+        opcoes_cli = dict(zip(df_cli["id_cliente"].astype(int), df_cli["nome_cliente"]))
 
         id_cliente_sel = st.selectbox(
             "Cliente:",
@@ -257,22 +289,19 @@ def run():
     if modo == "Editar":
         st.subheader("✏️ Editar vaga")
 
-        dados_vagas = listar_vagas()
-        if not dados_vagas:
+        df_v = listar_vagas_df()
+        if df_v.empty:
             st.info("Nenhuma vaga para editar.")
             return
 
-        dados_cli = listar_clientes()
-        if not dados_cli:
+        df_cli = listar_clientes_df()
+        if df_cli.empty:
             st.warning("Não há clientes cadastrados para vincular à vaga.")
             return
 
-        df_v = pd.DataFrame(dados_vagas).fillna("")
-        df_cli = pd.DataFrame(dados_cli).fillna("")
-
         opcoes_vagas = {
-            int(r["id_vaga"]): f"{r['id_vaga']} - {r.get('nome_cliente','')} - {r['cargo']}"
-            for _, r in df_v.iterrows()
+            int(i): f"{i} - {cli} - {cargo}"
+            for i, cli, cargo in zip(df_v["id_vaga"], df_v["nome_cliente"], df_v["cargo"])
         }
 
         id_vaga_sel = st.selectbox(
@@ -284,8 +313,10 @@ def run():
 
         row = df_v[df_v["id_vaga"] == id_vaga_sel].iloc[0]
 
-        opcoes_cli = {int(r["id_cliente"]): r["nome_cliente"] for _, r in df_cli.iterrows()}
-        id_cliente_atual = int(row.get("id_cliente") or list(opcoes_cli.keys())[0])
+        opcoes_cli = dict(zip(df_cli["id_cliente"].astype(int), df_cli["nome_cliente"]))
+        id_cliente_atual = (
+            int(row["id_cliente"]) if pd.notna(row["id_cliente"]) else list(opcoes_cli.keys())[0]
+        )
 
         id_cliente_edit = st.selectbox(
             "Cliente:",
@@ -309,14 +340,13 @@ def run():
                 else 0,
             )
         with col2:
-            try:
-                data_abertura_dt = datetime.strptime(str(row["data_abertura"]), "%Y-%m-%d").date()
-            except Exception:
-                data_abertura_dt = datetime.today().date()
-            try:
-                data_fechamento_dt = datetime.strptime(str(row["data_fechamento"]), "%Y-%m-%d").date()
-            except Exception:
-                data_fechamento_dt = datetime.today().date()
+            # datas já vêm como datetime (NaT quando vazias)
+            data_abertura_dt = (
+                row["data_abertura"].date() if pd.notna(row["data_abertura"]) else datetime.today().date()
+            )
+            data_fechamento_dt = (
+                row["data_fechamento"].date() if pd.notna(row["data_fechamento"]) else datetime.today().date()
+            )
 
             data_abertura_edit = st.date_input("Abertura", value=data_abertura_dt)
             data_fechamento_edit = st.date_input("Fechamento", value=data_fechamento_dt)
@@ -357,15 +387,14 @@ def run():
     if modo == "Texto":
         st.subheader("📝 Gerador de textos para divulgação")
 
-        dados = listar_vagas()
-        if not dados:
+        df = listar_vagas_df()
+        if df.empty:
             st.info("Cadastre vagas primeiro.")
             return
 
-        df = pd.DataFrame(dados).fillna("")
         opcoes = {
-            int(r["id_vaga"]): f"{r.get('nome_cliente','')} - {r['cargo']}"
-            for _, r in df.iterrows()
+            int(i): f"{cli} - {cargo}"
+            for i, cli, cargo in zip(df["id_vaga"], df["nome_cliente"], df["cargo"])
         }
 
         id_vaga = st.selectbox(
@@ -420,19 +449,16 @@ def run():
     if modo == "Vinculo":
         st.subheader("🔗 Vincular candidatos à vaga")
 
-        dados_vagas = listar_vagas()
-        dados_cand = listar_candidatos()
+        df_v = listar_vagas_df()
+        df_c = listar_candidatos_df()
 
-        if not dados_vagas or not dados_cand:
+        if df_v.empty or df_c.empty:
             st.info("Necessário ter ao menos uma vaga e um candidato.")
             return
 
-        df_v = pd.DataFrame(dados_vagas).fillna("")
-        df_c = pd.DataFrame(dados_cand).fillna("")
-
         opcoes_vinc = {
-            int(r["id_vaga"]): f"{r['id_vaga']} - {r.get('nome_cliente','')} - {r['cargo']}"
-            for _, r in df_v.iterrows()
+            int(i): f"{i} - {cli} - {cargo}"
+            for i, cli, cargo in zip(df_v["id_vaga"], df_v["nome_cliente"], df_v["cargo"])
         }
 
         id_vaga_vinc = st.selectbox(
@@ -444,9 +470,7 @@ def run():
         vinculados = listar_vinculos_vaga(int(id_vaga_vinc))
         ids_existentes = {int(v["id_candidato"]) for v in vinculados}
 
-        opcoes_candidatos = {
-            int(r["id_candidato"]): r["nome"] for _, r in df_c.iterrows()
-        }
+        opcoes_candidatos = dict(zip(df_c["id_candidato"].astype(int), df_c["nome"]))
 
         selecionados = st.multiselect(
             "Candidatos vinculados a esta vaga:",
@@ -16,6 +16,7 @@ if BASE_DIR not in sys.path:
 
 # Banco de dados
 from modules.database import init_db, autenticar
+from modules.armazenamento import atualizar_formato_csv
 
 # CSS global / tema
 from modules.ui_style import inject_global_css
@@ -370,7 +371,10 @@ def route_section(main_module: str, sub_module: str, username: str) -> None:
 # ---------------------------------------------------------
 def main() -> None:
     # 1) Garante que o banco exista e tenha as tabelas
+    #    (só trabalha na primeira execução do processo; nos reruns é um teste em memória)
     init_db()
+    #    e os CSVs de data/ no formato atual (idem: uma vez por arquivo e por processo)
+    atualizar_formato_csv()
 
     # 2) Aplica o CSS global (tema liquid glass)
     inject_global_css()
@@ -0,0 +1,36 @@
+# tests/conftest.py
+# Os testes importam o pacote `modules` a partir da raiz do projeto.
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+import pytest
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    """gac.db vazio e já migrado, só deste teste."""
+    from modules import database
+
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "gac.db"))
+    database.init_db()
+    return database
+
+
+@pytest.fixture
+def dados(tmp_path, monkeypatch):
+    """data/ vazio, só deste teste, com as telas lendo os CSVs."""
+    from modules import armazenamento
+
+    pasta = tmp_path / "data"
+    pasta.mkdir()
+    monkeypatch.setenv("GAC_ARMAZENAMENTO", "csv")
+    monkeypatch.setattr(armazenamento, "DATA_DIR", str(pasta))
+    monkeypatch.setattr(armazenamento, "ARQUIVO_FORMATO", str(pasta / "formato_csv.json"))
+    monkeypatch.setattr(armazenamento, "_CACHE_CSV", {})
+    monkeypatch.setattr(armazenamento, "_CACHE_TEXTOS", {})
+    monkeypatch.setattr(armazenamento, "_FORMATO_CONFERIDO", set())
+    return armazenamento
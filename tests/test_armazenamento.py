@@ -0,0 +1,113 @@
+# tests/test_armazenamento.py
+import os
+
+import pandas as pd
+import pytest
+
+from modules.arquivos import ConflitoDeVersao
+
+
+def _vinculos(dados, linhas):
+    with open(dados.caminho_csv("vaga_candidatos"), "w", encoding="utf-8") as f:
+        f.write(";".join(dados.STORES["vaga_candidatos"]["colunas"]) + "\n")
+        for id_vaga, id_candidato, etapa in linhas:
+            f.write(f"{id_vaga};{id_candidato};2026-01-01;;{etapa};;\n")
+    dados.atualizar_formato_csv(["vaga_candidatos"])
+
+
+def test_log_de_alteracoes_aplicado_na_leitura(dados):
+    _vinculos(dados, [(1, 10, "Triagem"), (1, 11, "Triagem"), (2, 10, "Triagem")])
+    dados.atualizar("vaga_candidatos", (1, 11), {"status_etapa": "Entrevista"})
+    dados.atualizar("vaga_candidatos", (2, 10), {"status_etapa": "Entrevista", "motivo_decline": "x"})
+    dados.atualizar("vaga_candidatos", (2, 10), {"status_etapa": "Proposta"})
+
+    df = dados.carregar("vaga_candidatos")
+    assert df["status_etapa"].tolist() == ["Triagem", "Entrevista", "Proposta"]
+    assert df["motivo_decline"].tolist() == ["", "", "x"]
+    # o CSV não foi regravado: as alterações estão só no log
+    assert os.path.getsize(dados.caminho_alteracoes("vaga_candidatos")) > 0
+
+
+def test_log_de_alteracoes_com_chave_repetida(dados):
+    _vinculos(dados, [(1, 10, "Triagem"), (1, 10, "Triagem"), (1, 11, "Triagem"), (1, 12, "Triagem")])
+    dados.atualizar("vaga_candidatos", (1, 11), {"status_etapa": "Entrevista"})
+
+    df = dados.carregar("vaga_candidatos")
+    assert len(df) == 4
+    assert df["id_candidato"].tolist() == ["10", "10", "11", "12"]
+    assert df["status_etapa"].tolist() == ["Triagem", "Triagem", "Entrevista", "Triagem"]
+
+    dados.atualizar("vaga_candidatos", (1, 10), {"status_etapa": "Proposta"})
+    df = dados.carregar("vaga_candidatos")
+    assert df["status_etapa"].tolist() == ["Proposta", "Proposta", "Entrevista", "Triagem"]
+
+
+def test_compactar_grava_o_log_no_csv(dados):
+    _vinculos(dados, [(1, 10, "Triagem"), (1, 11, "Triagem")])
+    dados.atualizar("vaga_candidatos", (1, 11), {"status_etapa": "Entrevista"})
+    antes = dados.carregar("vaga_candidatos")
+
+    dados.BACKEND_CSV.compactar("vaga_candidatos")
+
+    assert not os.path.exists(dados.caminho_alteracoes("vaga_candidatos"))
+    depois = dados.carregar("vaga_candidatos")
+    assert depois.equals(antes)
+    assert depois["status_etapa"].tolist() == ["Triagem", "Entrevista"]
+
+
+def _parecer(nome):
+    return {
+        "data_hora": "2026-01-01 10:00:00", "nome": nome, "cliente": "ACME",
+        "resumo_profissional": f"resumo de {nome}", "analise_perfil": "análise", "conclusao_texto": "",
+    }
+
+
+def test_textos_longos_lidos_uma_vez_e_depois_so_o_acrescimo(dados, monkeypatch):
+    parses = []
+    loads = dados.json.loads
+    monkeypatch.setattr(dados.json, "loads", lambda s, *a, **k: (isinstance(s, bytes) and parses.append(s)) or loads(s, *a, **k))
+
+    dados.registrar("pareceres", _parecer("Ana"))
+    dados.registrar("pareceres", _parecer("Bruno"))
+    df = dados.carregar("pareceres")
+    assert df["resumo_profissional"].tolist() == ["resumo de Ana", "resumo de Bruno"]
+    assert len(parses) == 2
+
+    dados.carregar("pareceres")
+    assert len(parses) == 2
+
+    dados.registrar("pareceres", _parecer("Carla"))
+    df = dados.carregar("pareceres")
+    assert df["resumo_profissional"].tolist() == ["resumo de Ana", "resumo de Bruno", "resumo de Carla"]
+    assert df["analise_perfil"].tolist() == ["análise"] * 3
+    assert len(parses) == 3
+
+
+def test_salvar_do_editor_recusa_versao_antiga(dados):
+    dados.registrar("fin_os", {"id_cliente": "1", "descricao": "Triagem", "valor": "100"})
+    lido = dados.carregar("fin_os")
+    # outra sessão grava depois da leitura
+    dados.atualizar("fin_os", lido["id_os"].iloc[0], {"status": "Paga"})
+
+    # como o st.data_editor: DataFrame novo, sem attrs
+    editado = pd.DataFrame(lido.to_dict("list"))
+    assert "versao" not in editado.attrs
+    editado.attrs["versao"] = lido.attrs.get("versao")
+    with pytest.raises(ConflitoDeVersao):
+        dados.salvar("fin_os", editado)
+
+    antigo = lido.copy()
+    antigo.attrs["versao"] = lido.attrs["versao"]
+    with pytest.raises(ConflitoDeVersao):
+        dados.salvar("fin_os", antigo)
+    assert dados.carregar("fin_os")["status"].tolist() == ["Paga"]
+
+
+def test_atualizar_chave_inexistente_nao_anexa_ao_log(dados):
+    _vinculos(dados, [(1, 10, "Triagem"), (1, 10, "Triagem")])
+    log = dados.caminho_alteracoes("vaga_candidatos")
+
+    assert dados.atualizar("vaga_candidatos", (9, 99), {"status_etapa": "Proposta"}) == 0
+    assert not os.path.exists(log) or os.path.getsize(log) == 0
+    # mesma contagem do caminho sem log: uma por linha alterada
+    assert dados.atualizar("vaga_candidatos", (1, 10), {"status_etapa": "Proposta"}) == 2
@@ -0,0 +1,46 @@
+# tests/test_arquivos.py
+import csv
+import multiprocessing
+import threading
+
+from modules.arquivos import anexar_linha_com_id
+
+CABECALHO = ["id_cliente", "nome_cliente", "origem"]
+
+
+def _anexar_varios(caminho: str, origem: str, n: int):
+    for i in range(n):
+        anexar_linha_com_id(caminho, CABECALHO, lambda novo_id: [novo_id, f"{origem}-{i}", origem])
+
+
+def _ids(caminho: str) -> list[int]:
+    with open(caminho, newline="", encoding="utf-8") as f:
+        linhas = list(csv.reader(f, delimiter=";"))
+    assert linhas[0] == CABECALHO
+    return [int(linha[0]) for linha in linhas[1:]]
+
+
+def test_ids_unicos_entre_threads_e_processos(tmp_path):
+    caminho = str(tmp_path / "clientes.csv")
+    contexto = multiprocessing.get_context("spawn")
+    processos = [contexto.Process(target=_anexar_varios, args=(caminho, f"p{n}", 30)) for n in range(2)]
+    threads = [threading.Thread(target=_anexar_varios, args=(caminho, f"t{n}", 30)) for n in range(3)]
+    for t in (*processos, *threads):
+        t.start()
+    for t in (*processos, *threads):
+        t.join()
+    assert all(p.exitcode == 0 for p in processos)
+
+    ids = _ids(caminho)
+    assert sorted(ids) == list(range(1, 151))
+
+
+def test_id_segue_o_maior_do_csv_editado_por_fora(tmp_path):
+    caminho = str(tmp_path / "clientes.csv")
+    _anexar_varios(caminho, "a", 2)
+    # linha colada por fora (planilha) com id alto
+    with open(caminho, "a", newline="", encoding="utf-8") as f:
+        csv.writer(f, delimiter=";").writerow([40, "externo", "x"])
+
+    _anexar_varios(caminho, "b", 1)
+    assert _ids(caminho) == [1, 2, 40, 41]
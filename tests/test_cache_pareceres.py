@@ -0,0 +1,92 @@
+# tests/test_cache_pareceres.py
+import os
+
+import pytest
+
+from modules import cache_pareceres, renderizacao
+
+REGISTRO = {
+    "cliente": "ACME", "cargo": "Dev", "nome": "Ana", "localidade": "Curitiba", "idade": "30",
+    "pretensao": "R$ 5.000", "resumo_profissional": "Resumo", "analise_perfil": "Análise",
+    "conclusao_texto": "Conclusão", "linkedin": "",
+}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_pareceres, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(renderizacao, "MODELO_DOCX", str(tmp_path / "sem_modelo.docx"))
+    monkeypatch.setattr(cache_pareceres, "_HASHES_ANEXO", {})
+    return cache_pareceres
+
+
+def test_chave_muda_com_campos_formato_modelo_e_anexos(cache, tmp_path, monkeypatch):
+    cv = tmp_path / "cv.pdf"
+    cv.write_bytes(b"%PDF-1 versao 1")
+    base = cache.chave_parecer(REGISTRO, "PDF", [str(cv)])
+
+    assert cache.chave_parecer(dict(REGISTRO), "pdf", [str(cv)]) == base
+    # campo que não é do parecer não entra na chave
+    assert cache.chave_parecer({**REGISTRO, "id_vaga": 7}, "PDF", [str(cv)]) == base
+
+    assert cache.chave_parecer({**REGISTRO, "conclusao_texto": "Outra"}, "PDF", [str(cv)]) != base
+    assert cache.chave_parecer(REGISTRO, "DOCX", [str(cv)]) != base
+    assert cache.chave_parecer(REGISTRO, "PDF", []) != base
+
+    # mesmo caminho, conteúdo novo
+    cv.write_bytes(b"%PDF-1 versao 2, maior")
+    nova = cache.chave_parecer(REGISTRO, "PDF", [str(cv)])
+    assert nova != base
+
+    monkeypatch.setattr(renderizacao, "VERSAO_MODELO_PDF", renderizacao.VERSAO_MODELO_PDF + 1)
+    monkeypatch.setitem(cache.VERSOES_MODELO, "PDF", lambda: renderizacao.VERSAO_MODELO_PDF)
+    assert cache.chave_parecer(REGISTRO, "PDF", [str(cv)]) != nova
+
+
+def test_anexos_nao_entram_na_chave_do_docx(cache, tmp_path):
+    cv = tmp_path / "cv.pdf"
+    cv.write_bytes(b"%PDF-1")
+    assert cache.chave_parecer(REGISTRO, "DOCX", [str(cv)]) == cache.chave_parecer(REGISTRO, "DOCX")
+
+
+def test_gerar_parecer_reaproveita_o_arquivo_do_cache(cache):
+    caminho, chave, do_cache = cache.gerar_parecer(REGISTRO, "DOCX")
+    assert not do_cache and os.path.isfile(caminho)
+    caminho2, chave2, do_cache2 = cache.gerar_parecer(dict(REGISTRO), "DOCX")
+    assert (caminho2, chave2, do_cache2) == (caminho, chave, True)
+
+    _, chave3, do_cache3 = cache.gerar_parecer({**REGISTRO, "nome": "Bia"}, "DOCX")
+    assert chave3 != chave and not do_cache3
+
+
+def test_limite_remove_os_menos_usados(cache):
+    caminhos = []
+    for i, nome in enumerate(("A", "B", "C")):
+        caminho, _, _ = cache.gerar_parecer({**REGISTRO, "nome": nome}, "DOCX")
+        os.utime(caminho, ns=(i * 10**9, i * 10**9))
+        caminhos.append(caminho)
+    os.utime(caminhos[0])  # "A" acabou de ser usado
+    tamanho = os.path.getsize(caminhos[0])
+
+    removidos = cache.limpar_excedente(limite=2 * tamanho + tamanho // 2)
+    assert removidos == 1
+    assert [os.path.exists(c) for c in caminhos] == [True, False, True]
+
+
+def test_cv_pulado_nao_fica_sob_a_chave_com_o_cv(cache, tmp_path):
+    cv = tmp_path / "cv.pdf"
+    cv.write_bytes(b"nao e um pdf")
+    avisos = []
+
+    def ao_falhar(fonte, erro):
+        avisos.append(fonte)
+
+    caminho, chave, do_cache = cache.gerar_parecer(REGISTRO, "PDF", [str(cv)], ao_falhar=ao_falhar)
+    assert not do_cache and os.path.isfile(caminho)
+    assert chave == cache.chave_parecer(REGISTRO, "PDF", [])
+    assert cache.obter(cache.chave_parecer(REGISTRO, "PDF", [str(cv)]), "PDF") is None
+
+    # o pedido igual tenta anexar de novo e avisa de novo
+    _, _, do_cache = cache.gerar_parecer(REGISTRO, "PDF", [str(cv)], ao_falhar=ao_falhar)
+    assert not do_cache
+    assert avisos == [str(cv), str(cv)]
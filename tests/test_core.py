@@ -0,0 +1,70 @@
+# tests/test_core.py
+import io
+
+import pytest
+from PyPDF2 import PdfReader
+from reportlab.pdfgen import canvas
+
+from modules.core import merge_pdfs, merge_pdfs_bytes
+
+
+def _pdf(*rotulos) -> bytes:
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer)
+    for rotulo in rotulos:
+        c.drawString(72, 720, rotulo)
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def _rotulos(pdf) -> list[str]:
+    leitor = PdfReader(io.BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
+    return [p.extract_text().strip() for p in leitor.pages]
+
+
+class _SoEscrita:
+    """Stream sem tell()/seek() (ex.: resposta de download)."""
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, dados):
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+
+def test_merge_bytes_caminho_e_arquivo_na_ordem(tmp_path):
+    cv = tmp_path / "cv.pdf"
+    cv.write_bytes(_pdf("cv1", "cv2"))
+    extra = tmp_path / "extra.pdf"
+    extra.write_bytes(_pdf("extra"))
+
+    with open(extra, "rb") as f:
+        juntado = merge_pdfs([_pdf("parecer"), None, b"", str(cv), f])
+    assert _rotulos(juntado) == ["parecer", "cv1", "cv2", "extra"]
+
+
+def test_merge_grava_em_caminho_e_em_stream_sem_tell(tmp_path):
+    fontes = [_pdf("a"), _pdf("b", "c")]
+    destino = tmp_path / "saida.pdf"
+    assert merge_pdfs(fontes, str(destino)) is None
+    assert _rotulos(destino.read_bytes()) == ["a", "b", "c"]
+
+    stream = _SoEscrita()
+    merge_pdfs(fontes, stream)
+    assert _rotulos(b"".join(stream.partes)) == ["a", "b", "c"]
+
+
+def test_merge_fonte_com_problema(tmp_path):
+    ausente = str(tmp_path / "nao_existe.pdf")
+    with pytest.raises(FileNotFoundError):
+        merge_pdfs_bytes(_pdf("parecer"), ausente)
+
+    falhas = []
+    juntado = merge_pdfs(
+        [_pdf("parecer"), b"isto nao e um pdf", ausente, _pdf("fim")],
+        ao_falhar=lambda fonte, e: falhas.append(fonte),
+    )
+    assert _rotulos(juntado) == ["parecer", "fim"]
+    assert falhas == [b"isto nao e um pdf", ausente]
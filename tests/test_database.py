@@ -0,0 +1,208 @@
+# tests/test_database.py
+import threading
+
+
+def _em_threads(funcao, n):
+    for _ in range(n):
+        t = threading.Thread(target=funcao)
+        t.start()
+        t.join()
+
+
+def test_conexoes_de_threads_encerradas_voltam_ao_pool(banco):
+    banco.fechar_conexoes()
+    antes = banco.estatisticas_conexoes()
+
+    def rerun():
+        banco.conexao().execute("SELECT COUNT(*) FROM candidatos;").fetchone()
+
+    _em_threads(rerun, 50)
+    depois = banco.estatisticas_conexoes()
+    # uma thread por vez: a mesma conexão passa de uma para a outra
+    assert depois["abertas"] - antes["abertas"] <= 1
+    assert depois["reaproveitadas"] - antes["reaproveitadas"] >= 49
+
+
+def test_pool_limitado_e_fechado_explicitamente(banco):
+    barreira = threading.Barrier(20)
+
+    def rerun():
+        banco.conexao().execute("SELECT 1;").fetchone()
+        barreira.wait()
+
+    threads = [threading.Thread(target=rerun) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    banco.fechar_conexoes()
+    estado = banco.estatisticas_conexoes()
+    assert estado["livres"] == 0
+    assert estado["fechadas"] >= 20 - banco.MAX_CONEXOES_LIVRES
+
+
+def test_limpar_dados_principais_com_financeiro_e_tarefas(banco):
+    id_cliente = banco.inserir_cliente("ACME")
+    id_candidato = banco.inserir_candidato("Ana")
+    id_vaga = banco.inserir_vaga(id_cliente, "Dev", "Remoto", "2026-01-01", None, "Aberta", "")
+    banco.vincular_vaga_candidato(id_vaga, id_candidato)
+    conn = banco.conexao()
+    for tabela in ("fin_os", "fin_orc", "fin_nf"):
+        conn.execute(f"INSERT INTO {tabela} (id_cliente, nome_cliente) VALUES (?, 'ACME');", (id_cliente,))
+    conn.execute(
+        "INSERT INTO tarefas (tipo, status, parametros, criado_em, atualizado_em) "
+        "VALUES ('parecer', 'concluida', '{}', '', '');"
+    )
+    conn.commit()
+
+    banco.limpar_dados_principais(confirmar=True)
+
+    for tabela in banco.TABELAS_DADOS_PRINCIPAIS:
+        assert conn.execute(f"SELECT COUNT(*) FROM {tabela};").fetchone()[0] == 0, tabela
+
+
+def _parecer(banco, nome, resumo):
+    banco.registrar_parecer_db(
+        id_vaga=None, id_candidato=None, cliente="ACME", cargo="Dev", nome=nome,
+        localidade="", idade="", pretensao="", linkedin="", resumo_prof=resumo,
+        analise_prof="", conclusao_txt="", formato="PDF", caminho_arquivo="",
+    )
+
+
+def test_busca_ignora_acentos_e_maiusculas(banco):
+    banco.inserir_candidato("José Conceição")
+    banco.inserir_candidato("Joana Silva")
+    _parecer(banco, "Ana", "Experiência em GESTÃO de operações")
+
+    assert [r["titulo"] for r in banco.buscar_texto("jose conceicao")] == ["José Conceição"]
+    assert [r["titulo"] for r in banco.buscar_texto("CONCEI")] == ["José Conceição"]
+    achados = banco.buscar_pareceres("experiencia gestao")
+    assert [r["nome_candidato"] for r in achados] == ["Ana"]
+    assert "<mark>GESTÃO</mark>" in achados[0]["trecho"]
+
+
+def test_trecho_da_busca_escapa_html(banco):
+    _parecer(banco, "Ana", 'Perfil técnico <script>alert("x")</script> <b>sólido</b>')
+
+    (achado,) = banco.buscar_pareceres("tecnico")
+    trecho = achado["trecho"]
+    assert "<script>" not in trecho and "<b>" not in trecho
+    assert "&lt;script&gt;" in trecho
+    assert trecho.replace("<mark>", "").replace("</mark>", "").count("<") == 0
+    assert "<mark>técnico</mark>" in trecho
+
+
+def test_consultar_df_tipa_colunas_numericas(banco):
+    banco.inserir_candidato("Ana", idade=30, cidade="Curitiba")
+    banco.inserir_candidato("Bruno")
+    banco.inserir_candidato("Carla", idade=41)
+
+    df = banco.consultar_df("SELECT id_candidato, nome, idade, telefone, cidade FROM candidatos ORDER BY id_candidato;")
+    assert str(df["id_candidato"].dtype) == "Int64"
+    assert str(df["idade"].dtype) == "Int64"
+    assert df["idade"].isna().tolist() == [False, True, False]
+    assert df["telefone"].tolist() == ["", "", ""]
+    assert df["nome"].tolist() == ["Ana", "Bruno", "Carla"]
+    assert str(df["cidade"].dtype) == "category"
+    assert [banco.texto_celula(v) for v in df["idade"]] == ["30", "", "41"]
+
+    misto = banco.consultar_df("SELECT COALESCE(idade, '') AS idade_txt FROM candidatos ORDER BY id_candidato;")
+    assert misto["idade_txt"].tolist() == ["30", "", "41"]
+
+    vazio = banco.consultar_df("SELECT idade FROM candidatos WHERE 0;")
+    assert vazio.empty and list(vazio.columns) == ["idade"]
+
+
+def _todas_as_paginas(banco, entidade, limite, **filtros):
+    ids, apos, totais = [], None, set()
+    while True:
+        pagina = banco.listar_pagina(entidade, apos=apos, limite=limite, **filtros)
+        totais.add(pagina["total"])
+        ids += [item[f"id_{entidade[:-1]}"] for item in pagina["itens"]]
+        apos = pagina["proximo"]
+        if apos is None:
+            return ids, totais
+
+
+def test_paginacao_keyset_sem_repetir_nem_pular(banco):
+    cidades = ["Curitiba", None, "curitiba", "Araucária", "", None, "Londrina"]
+    nomes = ["Ana", "ana", "Bruno", "bruno", "Carla", "Ana"]
+    for i in range(45):
+        banco.inserir_candidato(nomes[i % len(nomes)], cidade=cidades[i % len(cidades)])
+    conn = banco.conexao()
+
+    for order_by, desc in (("nome", False), ("nome", True), ("cidade", False), ("cidade", True),
+                           ("id_candidato", True)):
+        ordem = banco._LISTAGENS["candidatos"]["ordens"][order_by]
+        direcao = "DESC" if desc else "ASC"
+        esperado = [r[0] for r in conn.execute(
+            f"SELECT id_candidato FROM candidatos ORDER BY {ordem} {direcao}, id_candidato {direcao};"
+        )]
+        ids, totais = _todas_as_paginas(banco, "candidatos", 7, order_by=order_by, desc=desc)
+        assert ids == esperado, (order_by, desc)
+        assert totais == {45}
+
+
+def test_paginacao_keyset_com_filtro(banco):
+    for nome in ("Ana", "André", "ana_b", "Bruno", "Anabela", "an%"):
+        banco.inserir_candidato(nome)
+    ids, totais = _todas_as_paginas(banco, "candidatos", 2, order_by="nome", prefixo="an")
+    esperado = [r[0] for r in banco.conexao().execute(
+        "SELECT id_candidato FROM candidatos WHERE nome LIKE 'an%' ORDER BY nome COLLATE NOCASE, id_candidato;"
+    )]
+    assert ids == esperado and len(ids) == 5
+    assert totais == {5}
+    # % e _ digitados valem como texto, não como curinga
+    assert _todas_as_paginas(banco, "candidatos", 2, prefixo="an%")[0] == [6]
+    assert _todas_as_paginas(banco, "candidatos", 2, prefixo="ana_")[0] == [3]
+
+
+def _resolvidos(futuros):
+    erros = []
+    for f in futuros:
+        try:
+            f.result(timeout=5)
+        except TimeoutError:
+            raise AssertionError("Future do lote ficou sem resposta")
+        except Exception as e:
+            erros.append(e)
+    return erros
+
+
+def test_lote_com_commit_falho_resolve_todos(banco, monkeypatch):
+    original = banco._com_retentativa
+
+    def commit_falha(acao):
+        if getattr(acao, "__name__", "") == "commit":
+            raise banco.sqlite3.OperationalError("disk I/O error")
+        return original(acao)
+
+    monkeypatch.setattr(banco, "_com_retentativa", commit_falha)
+    futuros = [banco.enfileirar_escrita(lambda: 1) for _ in range(5)]
+    erros = _resolvidos(futuros)
+    assert len(erros) == 5
+
+
+def test_lote_com_rollback_to_falho_resolve_todos(banco):
+    rodando, pronto = threading.Event(), threading.Event()
+
+    def trava():
+        rodando.set()
+        pronto.wait(5)
+
+    def quebra_savepoint():
+        # some com o savepoint do item: o ROLLBACK TO do tratamento falha
+        banco.conexao().execute("RELEASE item_lote;")
+        raise ValueError("falha do item")
+
+    # segura o escritor para os itens seguintes caírem no mesmo lote
+    primeiro = banco.enfileirar_escrita(trava)
+    assert rodando.wait(5)
+    futuros = [banco.enfileirar_escrita(lambda: 1),
+               banco.enfileirar_escrita(quebra_savepoint),
+               banco.enfileirar_escrita(lambda: 2)]
+    pronto.set()
+    primeiro.result(timeout=5)
+    erros = _resolvidos(futuros)
+    assert len(erros) == 3
@@ -0,0 +1,125 @@
+# tests/test_migracoes.py
+# Banco criado pela versão antiga do sistema (schema sem schema_version),
+# com dados, passando pelo init_db atual.
+import sqlite3
+
+import pytest
+
+from modules import database
+
+SCHEMA_ANTIGO = """
+CREATE TABLE clientes (
+    id_cliente INTEGER PRIMARY KEY AUTOINCREMENT, nome_cliente TEXT NOT NULL,
+    contato TEXT, telefone TEXT, email TEXT, cidade TEXT, created_at TEXT DEFAULT (datetime('now'))
+);
+CREATE TABLE candidatos (
+    id_candidato INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT NOT NULL, idade INTEGER, cidade TEXT,
+    telefone TEXT, email TEXT, linkedin TEXT, pretensao TEXT, caminho_cv TEXT,
+    created_at TEXT DEFAULT (datetime('now'))
+);
+CREATE TABLE vagas (
+    id_vaga INTEGER PRIMARY KEY AUTOINCREMENT, id_cliente INTEGER, cargo TEXT NOT NULL, modalidade TEXT,
+    data_abertura TEXT, data_fechamento TEXT, status TEXT, descricao TEXT,
+    FOREIGN KEY (id_cliente) REFERENCES clientes(id_cliente)
+);
+CREATE TABLE vaga_candidato (
+    id_vinculo INTEGER PRIMARY KEY AUTOINCREMENT, id_vaga INTEGER NOT NULL, id_candidato INTEGER NOT NULL,
+    data_vinculo TEXT DEFAULT (datetime('now')), observacao TEXT, UNIQUE (id_vaga, id_candidato),
+    FOREIGN KEY(id_vaga) REFERENCES vagas(id_vaga), FOREIGN KEY(id_candidato) REFERENCES candidatos(id_candidato)
+);
+CREATE TABLE status_pipeline (
+    id_status INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT NOT NULL, tipo TEXT NOT NULL DEFAULT 'ETAPA'
+);
+CREATE TABLE pareceres (
+    id_parecer INTEGER PRIMARY KEY AUTOINCREMENT, id_vaga INTEGER, id_candidato INTEGER,
+    data_hora TEXT NOT NULL, cliente TEXT, cargo TEXT, nome_candidato TEXT, localidade TEXT, idade TEXT,
+    pretensao TEXT, linkedin TEXT, resumo_profissional TEXT, analise_perfil TEXT, conclusao_texto TEXT,
+    formato TEXT, caminho_arquivo TEXT, status_etapa TEXT, status_contratacao TEXT, motivo_decline TEXT,
+    FOREIGN KEY(id_vaga) REFERENCES vagas(id_vaga), FOREIGN KEY(id_candidato) REFERENCES candidatos(id_candidato)
+);
+CREATE TABLE acessos (
+    id_acesso INTEGER PRIMARY KEY AUTOINCREMENT, id_cliente INTEGER, nome_cliente TEXT, id_candidato INTEGER,
+    nome_usuario TEXT, sistema TEXT, tipo_acesso TEXT, data_inicio TEXT, data_fim TEXT, status TEXT,
+    observacoes TEXT,
+    FOREIGN KEY(id_cliente) REFERENCES clientes(id_cliente), FOREIGN KEY(id_candidato) REFERENCES candidatos(id_candidato)
+);
+CREATE TABLE usuarios (
+    id_usuario INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL UNIQUE, nome TEXT,
+    senha_hash TEXT NOT NULL, perfil TEXT NOT NULL DEFAULT 'MASTER', ativo INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT DEFAULT (datetime('now'))
+);
+INSERT INTO usuarios (username, nome, senha_hash, perfil) VALUES ('admin', 'Admin', 'x', 'MASTER');
+INSERT INTO clientes (nome_cliente, cidade) VALUES ('ACME', 'Curitiba');
+INSERT INTO candidatos (nome, idade) VALUES ('José Conceição', 30);
+INSERT INTO vagas (id_cliente, cargo, status, descricao) VALUES (1, 'Analista Fiscal', 'Aberta', 'Apuração de tributos');
+INSERT INTO vaga_candidato (id_vaga, id_candidato) VALUES (1, 1);
+INSERT INTO pareceres (id_vaga, id_candidato, data_hora, nome_candidato, resumo_profissional)
+VALUES (1, 1, '2024-05-01 10:00:00', 'José Conceição', 'Experiência em apuração de ICMS');
+"""
+
+
+@pytest.fixture
+def banco_antigo(tmp_path, monkeypatch):
+    caminho = tmp_path / "gac.db"
+    conn = sqlite3.connect(caminho)
+    conn.executescript(SCHEMA_ANTIGO)
+    conn.close()
+    monkeypatch.setattr(database, "DB_PATH", str(caminho))
+    return caminho
+
+
+def _indices(conn) -> set[str]:
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index';")}
+
+
+def _colunas(conn, tabela) -> set[str]:
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({tabela});")}
+
+
+def test_banco_antigo_migrado_ate_a_ultima_versao(banco_antigo):
+    database.init_db()
+
+    relatorio = database.relatorio_inicializacao()
+    assert relatorio["versao_antes"] == 0
+    assert relatorio["migracoes"] == [v for v, *_ in database.MIGRACOES]
+    conn = database.conexao()
+    assert database.versao_schema(conn) == database.MIGRACOES[-1][0]
+
+    # dados antigos intactos
+    assert conn.execute("SELECT COUNT(*) FROM usuarios;").fetchone()[0] == 1
+    assert conn.execute("SELECT nome FROM candidatos;").fetchone()[0] == "José Conceição"
+    assert conn.execute("SELECT COUNT(*) FROM pareceres;").fetchone()[0] == 1
+
+    # colunas, tabelas e índices novos
+    assert {"razao_social", "observacoes"} <= _colunas(conn, "clientes")
+    assert {"status_etapa", "status_contratacao", "motivo_decline"} <= _colunas(conn, "vaga_candidato")
+    assert {"idx_pareceres_resumo", "idx_candidatos_nome", "idx_tarefas_status"} <= _indices(conn)
+    for tabela in ("fin_os", "fin_orc", "fin_nf", "tarefas", "migracao_csv"):
+        assert _colunas(conn, tabela), tabela
+
+    # o que já existia entrou na busca (carga inicial da migração 3)
+    assert [r["titulo"] for r in database.buscar_texto("conceicao", origens=("candidato",))] == ["José Conceição"]
+    assert [r["nome_candidato"] for r in database.buscar_pareceres("icms")] == ["José Conceição"]
+    assert [r["titulo"] for r in database.buscar_texto("tributos")] == ["Analista Fiscal"]
+
+
+def test_banco_parcialmente_migrado_aplica_so_o_que_falta(banco_antigo):
+    conn = sqlite3.connect(banco_antigo)
+    conn.execute(
+        "CREATE TABLE schema_version (versao INTEGER PRIMARY KEY, descricao TEXT, "
+        "aplicada_em TEXT DEFAULT (datetime('now')));"
+    )
+    for versao, descricao, comandos, _ in database.MIGRACOES[:2]:
+        for sql in comandos:
+            conn.execute(sql)
+        conn.execute("INSERT INTO schema_version (versao, descricao) VALUES (?, ?);", (versao, descricao))
+    conn.commit()
+    conn.close()
+
+    database.init_db()
+
+    relatorio = database.relatorio_inicializacao()
+    assert relatorio["versao_antes"] == 2
+    assert relatorio["migracoes"] == [v for v, *_ in database.MIGRACOES[2:]]
+    versoes = [r[0] for r in database.conexao().execute("SELECT versao FROM schema_version ORDER BY versao;")]
+    assert versoes == [v for v, *_ in database.MIGRACOES]
@@ -0,0 +1,103 @@
+# tests/test_renderizacao.py
+import io
+
+import pytest
+from docx import Document
+from lxml import etree
+
+from PyPDF2 import PdfReader
+
+from modules import renderizacao
+from modules.core import build_parecer_docx_to_bytes, build_parecer_pdf_to_bytes
+
+CAMPOS = ("ACME", "Dev", "Fulano", "Curitiba", "30", "R$ 5.000")
+
+
+def _paginas(pdf: bytes) -> int:
+    return len(PdfReader(io.BytesIO(pdf)).pages)
+
+
+def test_pdf_multipagina_repetido_na_mesma_thread():
+    longo = ("texto longo " * 400 + "\n\n") * 5
+    paginas = [
+        _paginas(build_parecer_pdf_to_bytes(*CAMPOS, longo, "Análise", "Conclusão", ""))
+        for _ in range(3)
+    ]
+    assert paginas[0] > 1
+    assert paginas == [paginas[0]] * 3
+    # um parecer curto depois de um longo continua saindo numa página
+    assert _paginas(build_parecer_pdf_to_bytes(*CAMPOS, "curto", "a", "c", "")) == 1
+
+
+# --- DOCX ------------------------------------------------------------------
+
+def _docx_baseline(cliente, cargo, nome, localidade, idade, pretensao, resumo, analise, conclusao, linkedin=""):
+    """O parecer DOCX como era montado antes do modelo compilado (python-docx direto)."""
+    doc = Document()
+    doc.add_heading("PARECER DE TRIAGEM – CANDIDATO", level=1)
+    doc.add_paragraph(f"Cliente: {cliente}")
+    doc.add_paragraph(f"Cargo: {cargo}")
+    doc.add_paragraph(f"Nome: {nome}")
+    doc.add_paragraph(f"Localidade: {localidade}")
+    linkedin_url = renderizacao.normalizar_linkedin(linkedin)
+    if linkedin_url:
+        doc.add_paragraph(f"LinkedIn: {linkedin_url}")
+    for titulo, texto in (("Resumo Profissional", resumo), ("Análise de Perfil", analise), ("Conclusão", conclusao)):
+        doc.add_heading(titulo, level=2)
+        for bloco in texto.split("\n\n"):
+            doc.add_paragraph(bloco)
+    doc.add_heading("Informações de Remuneração", level=2)
+    doc.add_paragraph(f"Idade: {idade}")
+    doc.add_paragraph(f"Pretensão Salarial: {pretensao}")
+    return doc
+
+
+def _paragrafos_docx(doc):
+    return [(p.style.name, p.text) for p in doc.paragraphs]
+
+
+@pytest.mark.parametrize("linkedin", ["", "linkedin.com/in/fulano"])
+def test_docx_igual_ao_montado_com_python_docx(linkedin, monkeypatch):
+    monkeypatch.setattr(renderizacao, "MODELO_DOCX", "/nao/existe/parecer.docx")
+    textos = (" Resumo com <tags> & espaço \n\nSegundo bloco", "Análise", "Conclusão\nem duas linhas")
+    gerado = Document(io.BytesIO(build_parecer_docx_to_bytes(*CAMPOS, *textos, linkedin)))
+    esperado = _docx_baseline(*CAMPOS, *textos, linkedin)
+    assert _paragrafos_docx(gerado) == _paragrafos_docx(esperado)
+
+
+_NS_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _xml(corpo: str) -> str:
+    return f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<w:document {_NS_W}><w:body>{corpo}</w:body></w:document>'
+
+
+def _preencher(xml: str, valores: dict) -> str:
+    saida = []
+    renderizacao.ModeloDocx._preencher(renderizacao._compilar_xml(xml), valores, saida)
+    return "".join(saida)
+
+
+def test_docx_marcador_em_caixa_de_texto():
+    caixa = (
+        "<w:p><w:r><w:t>Fixo</w:t></w:r><w:r><w:txbxContent>"
+        "<w:p><w:r><w:t>LinkedIn: {{linkedin}}</w:t></w:r></w:p>"
+        "<w:p><w:r><w:t>{{resumo_profissional}}</w:t></w:r></w:p>"
+        "<w:p><w:r><w:t>Nome: {{nome}}</w:t></w:r></w:p>"
+        "</w:txbxContent></w:r></w:p>"
+        "<w:p><w:r><w:t>Depois</w:t></w:r></w:p>"
+    )
+    saida = _preencher(_xml(caixa), {"nome": "Ana & Bia", "linkedin": "", "resumo_profissional": "um\n\ndois"})
+    raiz = etree.fromstring(saida.encode("utf-8"))  # XML continua bem formado
+    w = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    textos = ["".join(t.text or "" for t in p.iter(w + "t")) for p in raiz.iter(w + "p")]
+    assert textos == ["FixoumdoisNome: Ana & Bia", "um", "dois", "Nome: Ana & Bia", "Depois"]
+
+
+def test_docx_marcador_em_paragrafo_com_caixa_de_texto_e_recusado():
+    xml = _xml(
+        "<w:p><w:r><w:t>{{nome}}</w:t></w:r><w:r><w:txbxContent>"
+        "<w:p><w:r><w:t>dentro</w:t></w:r></w:p></w:txbxContent></w:r></w:p>"
+    )
+    with pytest.raises(ValueError, match="caixa de texto"):
+        renderizacao._compilar_xml(xml)
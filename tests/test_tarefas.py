@@ -0,0 +1,90 @@
+# tests/test_tarefas.py
+import time
+from datetime import datetime, timedelta
+
+from modules import tarefas
+from modules.database import conexao, estatisticas_escrita
+
+
+def test_fila_vazia_nao_passa_pelo_escritor(banco):
+    antes = estatisticas_escrita()["itens"]
+    for _ in range(5):
+        assert tarefas._pegar_proxima("t1") is None
+    assert estatisticas_escrita()["itens"] == antes
+
+
+def test_reserva_uma_vez_so(banco):
+    id_tarefa = tarefas._inserir_tarefa("parecer", "{}")
+    tarefa = tarefas._pegar_proxima("t1")
+    assert tarefa["id_tarefa"] == id_tarefa
+    assert tarefas._pegar_proxima("t2") is None
+    assert tarefas.obter_tarefa(id_tarefa)["status"] == "executando"
+    assert tarefas.obter_tarefa(id_tarefa)["trabalhador"] == "t1"
+
+
+def _envelhecer(id_tarefa, tentativas):
+    antigo = (datetime.now() - timedelta(seconds=tarefas.TAREFA_PARADA_S + 60)).strftime("%Y-%m-%d %H:%M:%S")
+    tarefas._atualizar_tarefa(id_tarefa, tentativas=tentativas)
+    conn = conexao()
+    conn.execute("UPDATE tarefas SET atualizado_em = ? WHERE id_tarefa = ?;", (antigo, id_tarefa))
+    conn.commit()
+
+
+def test_tarefa_parada_volta_para_fila_ou_termina_em_erro(banco):
+    id_tarefa = tarefas._inserir_tarefa("parecer", "{}")
+    tarefas._pegar_proxima("t1")
+
+    _envelhecer(id_tarefa, 1)
+    assert tarefas._pegar_proxima("t2")["id_tarefa"] == id_tarefa
+
+    _envelhecer(id_tarefa, tarefas.MAX_TENTATIVAS)
+    assert tarefas._pegar_proxima("t3") is None
+    tarefa = tarefas.obter_tarefa(id_tarefa)
+    assert tarefa["status"] == "erro"
+    assert tarefa["concluido_em"]
+
+
+def test_batida_mantem_tarefa_longa_viva(banco, tmp_path, monkeypatch):
+    monkeypatch.setattr(tarefas, "PASTA_TAREFAS", str(tmp_path / "tarefas"))
+    monkeypatch.setattr(tarefas, "BATIDA_S", 0.05)
+    vistos = []
+
+    @tarefas.tipo_tarefa("_teste_lento")
+    def _lenta(ctx):
+        inicio = tarefas.obter_tarefa(ctx.id_tarefa)["atualizado_em"]
+        time.sleep(1.2)
+        vistos.append((inicio, tarefas.obter_tarefa(ctx.id_tarefa)["atualizado_em"]))
+        return {}
+
+    try:
+        tarefas._inserir_tarefa("_teste_lento", "{}")
+        tarefas.executar_tarefa(tarefas._pegar_proxima("t1"))
+    finally:
+        tarefas.TIPOS.pop("_teste_lento", None)
+    inicio, depois = vistos[0]
+    assert depois > inicio
+
+
+def test_lote_de_pareceres_na_fila(banco, tmp_path, monkeypatch):
+    import zipfile
+    from modules import cache_pareceres
+
+    monkeypatch.setattr(tarefas, "PASTA_TAREFAS", str(tmp_path / "tarefas"))
+    monkeypatch.setattr(cache_pareceres, "CACHE_DIR", str(tmp_path / "cache"))
+    id_cliente = banco.inserir_cliente("ACME")
+    id_vaga = banco.inserir_vaga(id_cliente, "Dev", "Remoto", "2026-01-01", None, "Aberta", "")
+    ids = [banco.inserir_candidato(nome) for nome in ("Ana", "Bruno")]
+    for id_candidato in ids:
+        banco.vincular_vaga_candidato(id_vaga, id_candidato)
+
+    id_tarefa = tarefas._inserir_tarefa(
+        "lote_pareceres",
+        f'{{"id_vaga": {id_vaga}, "ids_candidatos": {ids}, "formato": "PDF", "anexar_cv": false}}',
+    )
+    tarefas.executar_tarefa(tarefas._pegar_proxima("t1"))
+
+    tarefa = tarefas.obter_tarefa(id_tarefa)
+    assert tarefa["status"] == "concluida"
+    resultado = tarefas.resultado_tarefa(tarefa)
+    with zipfile.ZipFile(resultado["caminho"]) as zf:
+        assert sorted(zf.namelist()) == [f"Parecer_Ana_{ids[0]}.pdf", f"Parecer_Bruno_{ids[1]}.pdf"]